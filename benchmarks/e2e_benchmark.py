@@ -0,0 +1,383 @@
+"""End-to-End-Benchmark der echten Workflows gegen den lokalen Fake-OpenAI-Server (ohne Ollama).
+
+    python benchmarks/e2e_benchmark.py --iterations 5 --latency 0.05 --tps 200 --out bench.json
+    python benchmarks/e2e_benchmark.py --out new.json --compare bench.json
+
+Gemessen werden ``date_age.py``, ``multiple_agents_date_age.py``, ``read_write_agent.py``, eine
+Supervisor-Sitzung und die komplette Pipeline (je Stufe). Pro Workflow/Stufe werden Latenz-Perzentile,
+Anzahl der Modellaufrufe (Hops) und der Overhead je Hop ausgegeben: Wall-Clock-Zeit minus der Zeit,
+in der mindestens eine Modellanfrage lief (Framework, HTTP, Tools). Zusätzlich wird der Durchsatz
+bei mehreren gleichzeitigen Läufen gemessen. Die JSON-Ausgabe enthält den Git-Commit und lässt
+sich mit ``--compare`` gegen einen früheren Lauf vergleichen.
+
+Modellwechsel bei knappem Speicher simulieren (mit bzw. ohne Bündelung durch den Scheduler)::
+
+    python benchmarks/e2e_benchmark.py multiple_agents_date_age --max-loaded 1 --load-seconds 0.5 \
+        --throughput-workflow multiple_agents_date_age --concurrency 8 --stagger 0.2
+    OLLAMA_MAX_LOADED_MODELS=1 python benchmarks/e2e_benchmark.py ...   # dasselbe mit Scheduler
+"""
+import argparse, asyncio, contextlib, contextvars, io, json, os, statistics, subprocess, sys, tempfile, time
+from pathlib import Path                 # Pfad-Objekte
+
+from fake_openai_server import FakeOpenAIServer, Rule, Script   # liegt im selben Verzeichnis
+
+ROOT = Path(__file__).resolve().parent.parent
+_tag: contextvars.ContextVar[str] = contextvars.ContextVar("bench_tag", default="")   # Stufe der laufenden Anfrage
+
+MCQ_TEST = {"questions": [        # strukturierte Ausgabe des Test-Generators (Tool final_result)
+    {"stem": f"What does range({i}) produce?", "options": [f"{i} numbers", "nothing", "an error", "a list"],
+     "answer": "A"}
+    for i in range(1, 6)
+]}
+TASK_CODE = "for i in range(5):\n    print(i)"
+
+
+def benchmark_script(pdf_path: str, latency: float, tokens_per_sec: float) -> Script:
+    """Scripted replies that drive every benchmarked workflow through its tools."""
+    return Script(
+        latency=latency,
+        tokens_per_sec=tokens_per_sec,
+        rules=[
+            # Pipeline: Supervisor (nur bei ROUTER=0 bzw. unklaren Anfragen) → Sub-Agenten
+            Rule(contains="What does PDF mean", model="gpt-oss", tools=[], text="Portable Document Format."),
+            Rule(contains="Student task in the PDF", model="gpt-oss", tools=["pdf_extractor_tool"],
+                 text="{tool_output}",
+                 args={"pdf_extractor_tool": {"question": "What is the student task?"}}),
+            Rule(contains="generate a random 5 MCQ", model="gpt-oss", tools=["pdf_extractor_tool"],
+                 text="{tool_output}"),
+            Rule(contains="Solve and execute", model="gpt-oss", tools=["coder_tool"], text="{tool_output}",
+                 args={"coder_tool": {"task": "Print the numbers 0 to 4 with a for loop"}}),
+            Rule(contains="Search the web", model="gpt-oss", tools=["web_search_tool"], text="{tool_output}",
+                 args={"web_search_tool": {"query": "python for loop"}}),
+            Rule(contains="content of the PDF", tools=["get_pdf_text"], text="{tool_output}",
+                 args={"get_pdf_text": {"path": pdf_path, "max_chars": 800}}),
+            Rule(contains="Answer from the PDF", tools=["search_pdf"], text="{tool_output}",
+                 args={"search_pdf": {"query": "student task", "k": 3}}),
+            Rule(contains="Generate a test", tools=["final_result"], args={"final_result": MCQ_TEST}),
+            Rule(contains="Solve the task", text=f"```python\n{TASK_CODE}\n```"),
+            Rule(contains="Extract python code", tools=["python_code_executer"], text="{tool_output}",
+                 args={"python_code_executer": {"code": TASK_CODE}}),
+            Rule(contains="Search for", tools=["web_searcher"], text="{tool_output}",
+                 args={"web_searcher": {"query": "python for loop", "max_results": 3}}),
+            Rule(contains="Start with: Student", tools=["generate_file_txt"], text="Submitted.",
+                 args={"generate_file_txt": {"text": "1. A\n2. B\n3. A\n4. A\n5. C"}}),
+            Rule(contains="Answer the test", tools=["generate_file_txt"], text="Submitted.",
+                 args={"generate_file_txt": {"text": "Model Answers\n1. A\n2. A\n3. A\n4. A\n5. A"}}),
+            # read_write_agent.py
+            Rule(contains="Save to text File", tools=["generate_file_txt"], text="Saved.",
+                 args={"generate_file_txt": {"text": "Meeting at 20, bring slides."}}),
+            Rule(contains="content of the text file", tools=["read_txt_file"], text="{tool_output}"),
+            # date_age.py (zweite Frage ohne Tools)
+            Rule(contains="Weltmeisterschaft", tools=[], text="Frankreich gewann 1998."),
+        ],
+        text="Hello John, you were born in 1998 and are 27 years old.",   # übrige Agenten
+    )
+
+
+def write_fixture_pdf(path: Path, lines: list[str]) -> None:
+    """Write a minimal one-page PDF with the given text lines."""
+    text = "BT /F1 12 Tf 72 720 Td 14 TL " + " ".join(
+        "(%s) '" % line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines
+    ) + " ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(text), text.encode("latin-1")),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for n, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (n, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    q = statistics.quantiles(values, n=100, method="inclusive") if len(values) > 1 else [values[0]] * 99
+    return {"p50": q[49], "p95": q[94], "max": max(values), "mean": statistics.fmean(values), "n": len(values)}
+
+
+def _busy_seconds(requests: list[dict]) -> float:
+    """Length of the union of the requests' server-side intervals."""
+    busy, end = 0.0, float("-inf")
+    for r in sorted(requests, key=lambda r: r["start"]):
+        if r["end"] > end:
+            busy += r["end"] - max(r["start"], end)
+            end = r["end"]
+    return busy
+
+
+class Recorder:
+    """Collects wall times per tag and matches them with the fake server's request log."""
+
+    def __init__(self, server: FakeOpenAIServer):
+        self.server = server
+        self.samples: dict[str, list[dict]] = {}
+
+    @contextlib.asynccontextmanager
+    async def measure(self, tag: str):
+        token = _tag.set(tag)            # Anfragen dieses Blocks tragen den Tag im Header
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            end = time.monotonic()
+            _tag.reset(token)
+            requests = [r for r in self.server.log
+                        if (r["tag"] == tag or r["tag"].startswith(tag + ".")) and start <= r["start"] <= end]
+            wall = end - start
+            overhead = wall - _busy_seconds(requests)   # Ladezeiten (/api/generate) zählen als Modellzeit
+            hops = sum(not r.get("load") for r in requests)
+            self.samples.setdefault(tag, []).append({
+                "wall": wall, "hops": hops, "overhead": overhead,
+                "overhead_per_hop": overhead / hops if hops else None,
+                "completion_tokens": sum(r["completion_tokens"] for r in requests),
+            })
+
+    def summary(self, tag: str) -> dict:
+        samples = self.samples.get(tag, [])
+        per_hop = [s["overhead_per_hop"] for s in samples if s["overhead_per_hop"] is not None]
+        return {
+            "latency_s": _percentiles([s["wall"] for s in samples]),
+            "hops": statistics.median([s["hops"] for s in samples]) if samples else 0,
+            "overhead_per_hop_s": _percentiles(per_hop),
+            "overhead_s": _percentiles([s["overhead"] for s in samples]),
+        }
+
+
+# ---------- Workflows (wie in den Skripten unter __main__) ----------
+async def date_age_workflow() -> None:
+    import date_age
+    result1 = await date_age.agent.run("Wie alt bin ich?", deps=1998)
+    await date_age.agent.run("Wer hat die Weltmeisterschaft in meinem Geburtsjahr gewonnen?",
+                             message_history=result1.new_messages())
+
+
+async def multiple_agents_workflow() -> None:
+    import multiple_agents_date_age as m
+    session = m.conversation_store.session()
+    await session.run(m.agent_1, "Hi I am John", deps=1998)
+    await session.run(m.agent_2, "How old am I?")
+    await session.run(m.agent_3, "Tell me one big event happened in my birth year?", share_tools={"get_user_birth_year"})
+    m.conversation_store.close(session.id)   # Index freigeben (viele Iterationen)
+
+
+async def read_write_workflow() -> None:
+    import read_write_agent
+    from multi_agent import settings
+    path = str(settings.ANSWERS_DIR / "Meeting.txt")
+    await read_write_agent.agent.run("Save to text File: Meeting at 20, bring slides.", deps=path)
+    await read_write_agent.agent.run("What is the content of the text file?", deps=path)
+
+
+async def supervisor_workflow() -> None:
+    from multi_agent import pipelines
+    await pipelines.ask(["Search the web for: python for loop"])
+
+
+WORKFLOWS = {
+    "date_age": date_age_workflow,
+    "multiple_agents_date_age": multiple_agents_workflow,
+    "read_write_agent": read_write_workflow,
+    "supervisor_session": supervisor_workflow,
+}
+PIPELINE_STAGES = ["extract", "solve", "search", "generate_test", "write_answer_key", "simulate", "grade"]
+
+
+@contextlib.contextmanager
+def _timed_stages(recorder: Recorder):
+    """Wrap the pipeline stage functions so each stage is measured under its own tag."""
+    from multi_agent import pipelines
+    originals = {name: getattr(pipelines, name) for name in PIPELINE_STAGES}
+
+    def wrap(name, fn):
+        async def timed(*args, **kwargs):
+            async with recorder.measure(f"{_tag.get()}.{name}"):   # z. B. pipeline.extract
+                return await fn(*args, **kwargs)
+        return timed
+
+    for name, fn in originals.items():
+        setattr(pipelines, name, wrap(name, fn))
+    try:
+        yield
+    finally:
+        for name, fn in originals.items():
+            setattr(pipelines, name, fn)
+
+
+async def pipeline_workflow(recorder: Recorder) -> None:
+    from multi_agent import pipelines
+    with _timed_stages(recorder):
+        await pipelines.run_pipeline()
+
+
+async def run_benchmark(args: argparse.Namespace, server: FakeOpenAIServer) -> dict:
+    from multi_agent.model_registry import registry
+    from multi_agent.fast_path import coder_fast_path
+    from multi_agent.scheduler import model_scheduler
+
+    async def tag_request(request) -> None:
+        request.headers["x-bench-tag"] = _tag.get()
+    registry.http_client.event_hooks["request"].append(tag_request)
+
+    recorder = Recorder(server)
+    selected = args.workflows or [*WORKFLOWS, "pipeline"]
+    for name in selected:
+        for i in range(args.warmup + args.iterations):
+            tag = name if i >= args.warmup else f"warmup.{name}"   # Kaltstart (Imports, Modellbau) getrennt
+            async with recorder.measure(tag):
+                if name == "pipeline":
+                    await pipeline_workflow(recorder)
+                else:
+                    await WORKFLOWS[name]()
+
+    throughput = []
+    for level in args.concurrency:
+        server.reset()
+        loads = server.loads
+        workflow = WORKFLOWS[args.throughput_workflow]
+
+        slots = asyncio.Semaphore(level)
+
+        async def one(i: int) -> float:
+            await asyncio.sleep(i * args.stagger)   # Sitzungen treffen zeitversetzt ein
+            async with slots:
+                start = time.monotonic()
+                await workflow()
+                return time.monotonic() - start
+
+        start = time.monotonic()
+        latencies = await asyncio.gather(*(one(i) for i in range(level * args.iterations)))
+        wall = time.monotonic() - start
+        throughput.append({
+            "concurrency": level, "workflow": args.throughput_workflow, "runs": len(latencies),
+            "wall_s": wall, "runs_per_s": len(latencies) / wall, "requests_per_s": sum(not r.get("load") for r in server.log) / wall,
+            "latency_s": _percentiles(latencies), "max_in_flight": server.max_in_flight,
+            "model_loads": server.loads - loads,
+        })
+
+    return {
+        "workflows": {tag: recorder.summary(tag) for tag in recorder.samples if not tag.startswith("warmup.")},
+        "cold_start": {tag[len("warmup."):]: recorder.summary(tag)["latency_s"]
+                       for tag in recorder.samples if tag.startswith("warmup.")},
+        "throughput": throughput,
+        "connections": registry.stats()["endpoints"],
+        "scheduler": model_scheduler.stats(),
+        "coder_fast_path": coder_fast_path.stats(),
+    }
+
+
+def _git_commit() -> str:
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                           capture_output=True, text=True).stdout.strip()
+    return proc.stdout.strip() + ("-dirty" if dirty else "") if proc.returncode == 0 else "unknown"
+
+
+def print_report(results: dict) -> None:
+    print(f"{'workflow/stage':<32}{'p50 ms':>10}{'p95 ms':>10}{'hops':>6}{'ovh/hop ms':>12}")
+    for tag, s in results["workflows"].items():
+        lat, hop = s["latency_s"], s["overhead_per_hop_s"]
+        print(f"{tag:<32}{lat['p50'] * 1000:>10.1f}{lat['p95'] * 1000:>10.1f}{s['hops']:>6.0f}"
+              f"{hop['p50'] * 1000 if hop else float('nan'):>12.2f}")
+    for t in results["throughput"]:
+        print(f"concurrency {t['concurrency']:>3}: {t['runs_per_s']:7.2f} runs/s  {t['requests_per_s']:7.1f} req/s  "
+              f"p95 {t['latency_s']['p95'] * 1000:7.1f} ms  loads {t['model_loads']:4d}  ({t['workflow']})")
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """Print p50 latency and per-hop overhead relative to an earlier result file."""
+    print(f"\nvs {baseline['meta']['commit']}:")
+    for tag, s in results["workflows"].items():
+        old = baseline.get("workflows", {}).get(tag)
+        if not old:
+            continue
+        for key in ("latency_s", "overhead_per_hop_s"):
+            new_v, old_v = s[key].get("p50"), old[key].get("p50")
+            if new_v is not None and old_v:
+                print(f"{tag:<32}{key:<20}{old_v * 1000:>9.2f} -> {new_v * 1000:>9.2f} ms "
+                      f"({(new_v - old_v) / old_v * 100:+.1f}%)")
+    old_tp = {t["concurrency"]: t for t in baseline.get("throughput", [])}
+    for t in results["throughput"]:
+        if t["concurrency"] in old_tp:
+            o = old_tp[t["concurrency"]]["runs_per_s"]
+            print(f"throughput @{t['concurrency']:<3}{'':<24}{o:>9.2f} -> {t['runs_per_s']:>9.2f} runs/s "
+                  f"({(t['runs_per_s'] - o) / o * 100:+.1f}%)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("workflows", nargs="*", help=f"any of {', '.join([*WORKFLOWS, 'pipeline'])} (default: all)")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1, help="untimed cold-start runs per workflow")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake model: seconds until first token")
+    parser.add_argument("--tps", type=float, default=0.0, help="fake model: tokens/s (0 = instant)")
+    parser.add_argument("--load-seconds", type=float, default=0.0, help="fake model: time to (re)load a model")
+    parser.add_argument("--max-loaded", type=int, default=0, help="fake model: models loaded at once (0 = all)")
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 4, 16])
+    parser.add_argument("--throughput-workflow", choices=list(WORKFLOWS), default="date_age")
+    parser.add_argument("--stagger", type=float, default=0.0, help="seconds between throughput run arrivals")
+    parser.add_argument("--llm-cache", action="store_true", help="keep the SQLite response cache enabled")
+    parser.add_argument("--metrics", action="store_true", help="enable local metrics (measures their overhead)")
+    parser.add_argument("--out", help="write JSON results to this file")
+    parser.add_argument("--compare", help="earlier JSON result to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show the workflows' own output")
+    args = parser.parse_args()
+    unknown = set(args.workflows) - {*WORKFLOWS, "pipeline"}
+    if unknown:
+        parser.error(f"unknown workflow(s): {', '.join(sorted(unknown))}")
+
+    work = Path(tempfile.mkdtemp(prefix="e2e_bench_"))
+    pdf = work / "For_Loop.pdf"
+    write_fixture_pdf(pdf, ["Python for loops", "Student task: print the numbers 0 to 4 with a for loop."])
+    script = benchmark_script(str(pdf), args.latency, args.tps)
+    script.load_seconds, script.max_loaded = args.load_seconds, args.max_loaded   # Modellwechsel simulieren
+    server = FakeOpenAIServer(script).start()
+    # vor dem ersten Paket-Import setzen: Registry, Caches und Pfade lesen die Umgebung beim Import
+    os.environ.update({
+        "OLLAMA_BASE_URL": server.base_url,
+        "PDF_PATH": str(pdf),
+        "ANSWERS_DIR": str(work / "answers"),
+        "RUN_DIR": str(work / "run"),
+        "PDF_TEXT_CACHE_DIR": str(work / "pdf_cache"),
+        "PDF_INDEX_DIR": str(work / "pdf_index"),
+        "LLM_CACHE_PATH": str(work / "llm_cache.sqlite"),
+        "QUESTION_BANK": str(work / "question_bank.sqlite"),
+        "LLM_CACHE": "1" if args.llm_cache else "0",
+        "SEARCH_BACKEND": "stub",
+        "CHECKPOINTS": "0",              # jede Iteration rechnet alle Stufen (Checkpoints würden überspringen)
+    })
+    (work / "answers").mkdir()
+    sys.path.insert(0, str(ROOT))        # Skripte im Repo-Wurzelverzeichnis (date_age.py, ...)
+
+    if args.metrics:
+        from multi_agent.observability import configure_metrics
+        configure_metrics(jsonl_path=str(work / "metrics.jsonl"), port=None)
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        results = asyncio.run(run_benchmark(args, server))
+    server.stop()
+    results["meta"] = {
+        "commit": _git_commit(), "python": sys.version.split()[0], "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "iterations": args.iterations, "warmup": args.warmup, "latency": args.latency, "tps": args.tps,
+        "llm_cache": args.llm_cache, "metrics": args.metrics,
+        "load_seconds": args.load_seconds, "max_loaded": args.max_loaded,
+        "scheduler_max_loaded": int(os.environ.get("OLLAMA_MAX_LOADED_MODELS") or 0),
+    }
+    print_report(results)
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text(encoding="utf-8")))
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
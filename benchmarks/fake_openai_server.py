@@ -0,0 +1,290 @@
+"""Lokaler Ersatz-Server mit OpenAI-Chat-Completions-Protokoll (für Offline-Benchmarks).
+
+    python benchmarks/fake_openai_server.py --port 18434 --latency 0.05 --tps 200 [--script script.json]
+
+Antworten sind geskriptet: Regeln legen fest, welche angebotenen Tools nacheinander
+aufgerufen werden und welcher Text danach zurückkommt. Latenz bis zum ersten Token und
+Tokens/Sekunde sind einstellbar, ebenso das Laden/Verdrängen von Modellen bei begrenztem
+Speicher (``--max-loaded``, ``--load-seconds``); Streaming (SSE) wird unterstützt. Jede Anfrage wird mit
+Start/Ende protokolliert, damit Benchmarks Modellzeit und Framework-Overhead trennen können.
+"""
+import argparse, itertools, json, threading, time  # CLI, Zähler, JSON, Server-Thread, Zeitmessung
+from collections import OrderedDict                 # geladene Modelle (LRU)
+from dataclasses import dataclass, field            # Skript-Container
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional                         # Typ-Hinweise
+
+CHARS_PER_TOKEN = 4                      # grobe Token-Schätzung wie in multi_agent.history
+
+
+@dataclass
+class Rule:
+    """One scripted behaviour; the first matching rule answers a request."""
+    contains: Optional[str] = None       # Teilstring des letzten Nutzer-Prompts (ohne Groß/Klein)
+    model: Optional[str] = None          # nur für dieses Modell
+    tools: Optional[list[str]] = None    # Tools in dieser Reihenfolge aufrufen (None: jedes angebotene einmal)
+    text: Optional[str] = None           # Schlussantwort; "{tool_output}" = letzte Tool-Rückgabe
+    args: dict[str, dict] = field(default_factory=dict)   # Tool-Argumente nur für diese Regel
+
+    def matches(self, model: str, prompt: str) -> bool:
+        return ((self.model is None or self.model == model)
+                and (self.contains is None or self.contains.lower() in prompt.lower()))
+
+
+@dataclass
+class Script:
+    """Scripted model behaviour plus simulated generation speed."""
+    rules: list[Rule] = field(default_factory=list)
+    args: dict[str, dict] = field(default_factory=dict)   # Tool-Argumente je Tool-Name
+    text: str = "OK"                     # Standard-Schlussantwort
+    latency: float = 0.0                 # Sekunden bis zum ersten Token
+    tokens_per_sec: float = 0.0          # 0 = sofort
+    load_seconds: float = 0.0            # Ladezeit eines nicht geladenen Modells (wie Ollama)
+    max_loaded: int = 0                  # gleichzeitig geladene Modelle (0 = unbegrenzt, nie laden)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Script":
+        data = dict(data)
+        data["rules"] = [Rule(**r) for r in data.get("rules", [])]
+        return cls(**data)
+
+    def respond(self, body: dict) -> tuple[Optional[str], Optional[dict]]:
+        """Return (text, None) or (None, tool call) for a chat-completions request."""
+        messages = body.get("messages", [])
+        last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+        prompt = _content(messages[last_user]) if last_user >= 0 else ""
+        called = [tc["function"]["name"] for m in messages[last_user + 1:]
+                  for tc in m.get("tool_calls") or []]
+        offered = {t["function"]["name"]: t["function"] for t in body.get("tools") or []}
+        rule = next((r for r in self.rules if r.matches(body.get("model", ""), prompt)), Rule())
+
+        for name in (rule.tools if rule.tools is not None else list(offered)):
+            if name in offered and name not in called:      # jedes Tool einmal pro Nutzer-Prompt
+                args = (rule.args.get(name) or self.args.get(name)
+                        or _default_args(offered[name].get("parameters") or {}))
+                return None, {"name": name, "arguments": json.dumps(args)}
+
+        tool_outputs = [_content(m) for m in messages[last_user + 1:] if m.get("role") == "tool"]
+        text = rule.text if rule.text is not None else self.text
+        return text.replace("{tool_output}", tool_outputs[-1] if tool_outputs else ""), None
+
+    def seconds(self, completion_tokens: int) -> float:
+        return self.latency + (completion_tokens / self.tokens_per_sec if self.tokens_per_sec else 0.0)
+
+
+def _content(message: dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):        # Multimodal-Format: nur Textteile
+        content = "".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return content
+
+
+def _default_args(schema: dict) -> dict:
+    """Placeholder values for the required parameters of a tool's JSON schema."""
+    defaults = {"string": "benchmark", "integer": 1, "number": 1.0, "boolean": False, "array": [], "object": {}}
+    props = schema.get("properties", {})
+    return {name: defaults.get(props.get(name, {}).get("type"), "benchmark") for name in schema.get("required", [])}
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"        # Keep-Alive wie ein echter Server
+    disable_nagle_algorithm = True       # sonst ~40 ms Delayed-ACK-Pause zwischen Header und Body
+    server: "FakeOpenAIServer"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "fake", "object": "model", "owned_by": "bench"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/").endswith("/api/generate"):   # Ollama-API: Modell laden (keep_alive)
+            body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))))
+            start = time.monotonic()
+            seconds = self.server.ensure_loaded(body.get("model", ""))
+            with self.server._lock:      # zählt als Modellzeit, nicht als Hop
+                self.server.log.append({"id": None, "model": body.get("model"), "load": True, "start": start,
+                                        "end": time.monotonic(), "load_seconds": seconds, "completion_tokens": 0,
+                                        "tag": self.headers.get("x-bench-tag")})
+            self._send_json(200, {"model": body.get("model"), "response": "", "done": True,
+                                  "load_duration": int(seconds * 1e9)})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))))
+        start = time.monotonic()
+        self.server.request_started()
+        try:
+            self.server.handle_completion(self, body, start)
+        finally:
+            self.server.request_finished()
+
+    def _chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))   # HTTP/1.1 chunked transfer
+        self.wfile.flush()
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """Threaded stand-in for an OpenAI-compatible endpoint such as Ollama's /v1."""
+    daemon_threads = True
+
+    def __init__(self, script: Optional[Script] = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.script = script or Script()
+        self.log: list[dict] = []        # eine Zeile je Anfrage (Start/Ende, Modell, Tokens, Tool)
+        self.in_flight = self.max_in_flight = 0
+        self.loaded: OrderedDict[str, None] = OrderedDict()   # geladene Modelle, älteste zuerst
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()   # wie Ollama: ein Ladevorgang zur Zeit, Anfragen warten
+        self._ids = itertools.count(1)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def request_finished(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def ensure_loaded(self, model: str) -> float:
+        """Simulate loading model (evicting the least recently used one); returns the load time."""
+        if not self.script.max_loaded:
+            return 0.0
+        with self._load_lock:
+            if model in self.loaded:
+                self.loaded.move_to_end(model)
+                return 0.0
+            while len(self.loaded) >= self.script.max_loaded:
+                self.loaded.popitem(last=False)
+            time.sleep(self.script.load_seconds)
+            self.loaded[model] = None
+            self.loads += 1
+            return self.script.load_seconds
+
+    def handle_completion(self, handler: _Handler, body: dict, start: float) -> None:
+        load_seconds = self.ensure_loaded(body.get("model", ""))
+        text, tool_call = self.script.respond(body)
+        n = next(self._ids)
+        completion = _tokens(text if tool_call is None else tool_call["arguments"])
+        prompt_tokens = _tokens(json.dumps(body.get("messages", [])))
+        base = {"id": f"chatcmpl-{n}", "created": int(time.time()), "model": body.get("model", "")}
+        finish = "stop" if tool_call is None else "tool_calls"
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion,
+                 "total_tokens": prompt_tokens + completion}
+        calls = None if tool_call is None else [{"id": f"call_{n}", "type": "function", "function": tool_call}]
+
+        if body.get("stream"):
+            self._stream(handler, base, text, calls, finish, usage, completion,
+                         (body.get("stream_options") or {}).get("include_usage"))
+        else:
+            time.sleep(self.script.seconds(completion))         # simulierte Generierungszeit
+            message = {"role": "assistant", "content": text}
+            if calls:
+                message["tool_calls"] = calls
+            handler._send_json(200, {**base, "object": "chat.completion", "usage": usage,
+                                     "choices": [{"index": 0, "finish_reason": finish, "message": message}]})
+        with self._lock:
+            self.log.append({
+                "id": n, "model": body.get("model"), "stream": bool(body.get("stream")),
+                "start": start, "end": time.monotonic(), "model_seconds": self.script.seconds(completion),
+                "load_seconds": load_seconds,
+                "prompt_tokens": prompt_tokens, "completion_tokens": completion,
+                "tool": tool_call and tool_call["name"], "tag": handler.headers.get("x-bench-tag"),
+            })
+
+    def _stream(self, handler: _Handler, base: dict, text: Optional[str], calls: Optional[list],
+                finish: str, usage: dict, completion: int, include_usage: bool) -> None:
+        handler.send_response(200)
+        handler.send_header("content-type", "text/event-stream")
+        handler.send_header("transfer-encoding", "chunked")
+        handler.end_headers()
+
+        def event(choices: list, **extra) -> None:
+            payload = {**base, "object": "chat.completion.chunk", "choices": choices, **extra}
+            handler._chunk(b"data: " + json.dumps(payload).encode() + b"\n\n")
+
+        time.sleep(self.script.latency)  # Zeit bis zum ersten Token
+        per_token = 1 / self.script.tokens_per_sec if self.script.tokens_per_sec else 0.0
+        if calls:
+            time.sleep(per_token * completion)
+            event([{"index": 0, "delta": {"role": "assistant", "tool_calls": [{"index": 0, **calls[0]}]},
+                    "finish_reason": None}])
+        else:
+            pieces = [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)] or [""]
+            for i, piece in enumerate(pieces):
+                if i:
+                    time.sleep(per_token)
+                delta = {"role": "assistant", "content": piece} if i == 0 else {"content": piece}
+                event([{"index": 0, "delta": delta, "finish_reason": None}])
+        event([{"index": 0, "delta": {}, "finish_reason": finish}])
+        if include_usage:
+            event([], usage=usage)
+        handler._chunk(b"data: [DONE]\n\n")
+        handler._chunk(b"")              # Ende der Chunk-Übertragung
+
+    def reset(self) -> None:
+        with self._lock:
+            self.log.clear()
+            self.max_in_flight = self.in_flight
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18434)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds until the first token")
+    parser.add_argument("--tps", type=float, default=0.0, help="generated tokens per second (0 = instant)")
+    parser.add_argument("--load-seconds", type=float, default=0.0, help="time to load an unloaded model")
+    parser.add_argument("--max-loaded", type=int, default=0, help="models kept loaded at once (0 = unlimited)")
+    parser.add_argument("--script", help="JSON file with rules/args/text")
+    args = parser.parse_args()
+
+    script = Script()
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = Script.from_dict(json.load(f))
+    script.latency, script.tokens_per_sec = args.latency, args.tps
+    script.load_seconds, script.max_loaded = args.load_seconds, args.max_loaded
+    server = FakeOpenAIServer(script, args.host, args.port)
+    print(f"Fake OpenAI server on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Seiten/Sekunde beim Einlesen vieler PDFs: seitenweise im Prozess vs. ``pdf_ingest`` mit Prozess-Pool.
+
+    python benchmarks/ingest_benchmark.py --files 24 --pages 60 --workers 1 2 4
+
+Erzeugt einen Kurs-Ordner aus mehrseitigen Test-PDFs, misst zuerst die bisherige Extraktion
+(``iter_pdf_pages`` nacheinander, wie ``get_pdf_text`` ohne Vorab-Extraktion) und dann ``ingest``
+mit den angegebenen Prozesszahlen (jeweils mit leerem Speicher, ohne BM25-Index).
+"""
+import argparse, json, os, sys, tempfile, time  # CLI, JSON, Umgebung, Pfade, Zeitmessung
+from pathlib import Path                 # Pfad-Objekte
+
+from e2e_benchmark import ROOT, write_fixture_pdf   # selbes Verzeichnis
+
+
+def write_course(directory: Path, files: int, pages: int) -> None:
+    """files PDFs with pages pages each (one fixture page per page, different text)."""
+    from pypdf import PdfReader, PdfWriter
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(files):
+        writer = PdfWriter()
+        for p in range(pages):
+            page_pdf = directory / "page.tmp.pdf"
+            write_fixture_pdf(page_pdf, [f"Handout {i} page {p + 1}"] +
+                              [f"Line {n}: a for loop repeats the indented block for each item." for n in range(40)])
+            writer.add_page(PdfReader(page_pdf).pages[0])
+        with open(directory / f"handout{i:02d}.pdf", "wb") as f:
+            writer.write(f)
+    (directory / "page.tmp.pdf").unlink(missing_ok=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=24)
+    parser.add_argument("--pages", type=int, default=60, help="pages per file")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--out", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="ingest_bench_"))
+    course = work / "course"
+    write_course(course, args.files, args.pages)
+    os.environ["PDF_TEXT_CACHE_DIR"] = str(work / "cache")   # vor dem Paket-Import setzen
+    sys.path.insert(0, str(ROOT))
+    from multi_agent.pdf_ingest import find_pdfs, ingest
+    from multi_agent.pdf_text import PdfTextCache, iter_pdf_pages
+
+    start = time.perf_counter()
+    pages = sum(len(list(iter_pdf_pages(path))) for path in find_pdfs([str(course)]))
+    serial = time.perf_counter() - start
+    results = {"files": args.files, "pages": pages, "serial_pages_per_s": pages / serial, "ingest": {}}
+    print(f"serial (on demand): {pages} pages in {serial:.2f}s ({pages / serial:.1f} pages/s)")
+    for workers in args.workers:
+        cache = PdfTextCache(work / f"cache_{workers}")
+        report = ingest([str(course)], workers=workers, cache=cache, index=False)
+        results["ingest"][workers] = {"pages_per_s": report.pages_per_second, "seconds": report.wall_seconds,
+                                      "failed": len(report.failed)}
+        print(f"ingest workers={workers}: {report.pages} pages in {report.wall_seconds:.2f}s "
+              f"({report.pages_per_second:.1f} pages/s, {report.pages_per_second / (pages / serial):.2f}x)")
+    start = time.perf_counter()
+    for path in find_pdfs([str(course)]):
+        cache.get_text(path)             # Lesen nach der Vorab-Extraktion
+    read = time.perf_counter() - start
+    results["read_pages_per_s"] = pages / read
+    print(f"read pre-extracted: {pages / read:.0f} pages/s")
+    print(f"cpu count: {os.cpu_count()}")
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Lasttest des HTTP-Dienstes (``python -m multi_agent serve``) gegen den Fake-OpenAI-Server.
+
+    python benchmarks/server_benchmark.py --clients 64 --workers 8 --queue-size 16 --model-limit 4
+
+Startet Fake-Server und ``AgentServer`` in einem Prozess und schickt ``--clients`` gleichzeitige
+``POST /ask``-Anfragen (gemischt: Websuche, Begriffsfrage, Code). Ausgegeben werden angenommene und
+abgewiesene Anfragen (503), Latenz-Perzentile, Durchsatz, die höchste gleichzeitige Last je Modell
+beim Fake-Server sowie ``/health`` und die Server-Kennzahlen aus ``/stats``. Danach läuft einmal
+``POST /pipeline`` (Stufe ``test-gen``) über denselben, warmen Prozess.
+"""
+import argparse, asyncio, json, os, sys, tempfile, time  # CLI, Async, JSON, Umgebung, Pfade, Zeitmessung
+from collections import Counter          # Statuscodes
+from pathlib import Path                 # Pfad-Objekte
+
+from e2e_benchmark import ROOT, _percentiles, benchmark_script, write_fixture_pdf   # selbes Verzeichnis
+from fake_openai_server import FakeOpenAIServer
+
+PROMPTS = [
+    "Search the web for: python for loop",
+    "What does PDF mean?",
+    "Write python code to print the numbers 0 to 4",
+]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    import httpx
+    from multi_agent.scheduler import model_scheduler
+    from multi_agent.server import AgentServer
+    model_scheduler.set_limits(args.model_limit)
+    server = await AgentServer("127.0.0.1", 0, args.workers, args.queue_size, max_wait=args.max_wait).start()
+    base = f"http://127.0.0.1:{server.port}"
+    statuses: Counter = Counter()
+    latencies: list[float] = []
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=base, timeout=120, limits=limits) as client:
+        async def one(i: int) -> None:
+            start = time.perf_counter()
+            response = await client.post("/ask", json={"prompt": PROMPTS[i % len(PROMPTS)]})
+            statuses[response.status_code] += 1
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.clients)))
+        wall = time.perf_counter() - start
+        pipeline = (await client.post("/pipeline", json={"stage": "test-gen", "resume": False})).json()
+        health = (await client.get("/health")).json()
+        stats = (await client.get("/stats")).json()
+        prometheus = (await client.get("/metrics")).text
+    await server.stop()
+    return {
+        "statuses": dict(statuses), "wall_s": wall, "answered_per_s": statuses[200] / wall,
+        "latency_s": _percentiles(latencies) if latencies else {},
+        "pipeline": pipeline, "health": health, "server": stats["server"],
+        "metrics_lines": len(prometheus.splitlines()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=64, help="concurrent /ask requests")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=16)
+    parser.add_argument("--max-wait", type=float, default=30.0, help="seconds a request may wait in the queue")
+    parser.add_argument("--model-limit", type=int, default=4, help="concurrent calls per model (0 = unlimited)")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake model: seconds until first token")
+    parser.add_argument("--out", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="server_bench_"))
+    pdf = work / "For_Loop.pdf"
+    write_fixture_pdf(pdf, ["Python for loops", "Student task: print the numbers 0 to 4 with a for loop."])
+    fake = FakeOpenAIServer(benchmark_script(str(pdf), args.latency, 0.0)).start()
+    os.environ.update({                  # vor dem ersten Paket-Import setzen (wie e2e_benchmark.py)
+        "OLLAMA_BASE_URL": fake.base_url, "PDF_PATH": str(pdf), "ANSWERS_DIR": str(work / "answers"),
+        "RUN_DIR": str(work / "run"), "PDF_TEXT_CACHE_DIR": str(work / "pdf_cache"),
+        "PDF_INDEX_DIR": str(work / "pdf_index"), "QUESTION_BANK": str(work / "question_bank.sqlite"), "LLM_CACHE": "0", "SEARCH_BACKEND": "stub",
+    })
+    sys.path.insert(0, str(ROOT))
+    results = asyncio.run(run(args))
+    results["fake_max_in_flight"] = fake.max_in_flight
+    fake.stop()
+
+    s = results["statuses"]
+    print(f"clients {args.clients}: answered {s.get(200, 0)}  shed(503) {s.get(503, 0)}  other "
+          f"{sum(v for k, v in s.items() if k not in (200, 503))}  wall {results['wall_s']:.2f}s  "
+          f"{results['answered_per_s']:.1f} answers/s")
+    if results["latency_s"]:
+        lat = results["latency_s"]
+        print(f"latency p50 {lat['p50'] * 1000:.0f} ms  p95 {lat['p95'] * 1000:.0f} ms")
+    print("fake server max in flight:", results["fake_max_in_flight"])
+    print("pipeline:", results["pipeline"].get("stage"), "->", str(results["pipeline"].get("output"))[:60])
+    print("health:", results["health"])
+    print("server:", results["server"])
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Kaltstart-Kosten der Paket-Importe messen (jeweils in einem frischen Interpreter).
+
+    python benchmarks/startup_benchmark.py --repeat 5 --out startup.json
+
+Für jedes Ziel werden Wall-Clock-Zeit des Imports, die von ``-X importtime`` gemessene
+kumulative Zeit und die dabei geladenen schweren Abhängigkeiten ausgegeben.
+"""
+import argparse, json, os, statistics, subprocess, sys, time  # Messung in Subprozessen
+from pathlib import Path                 # Pfad-Objekte
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGETS = [
+    "multi_agent",
+    "multi_agent.cli",
+    "multi_agent.mcq_grading",
+    "multi_agent.pipelines",
+    "multi_agent.agents",
+    "multi_agent.tools",
+]
+HEAVY = ["pydantic_ai", "openai", "httpx", "pypdf", "ddgs", "logfire", "numpy"]
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+print(repr((elapsed, [m for m in {heavy!r} if m in sys.modules])))
+"""
+
+
+def measure(target: str, repeat: int) -> dict:
+    """Import target in fresh interpreters and collect timings."""
+    walls, imports, cumulative = [], [], []
+    loaded: list[str] = []
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE.format(target=target, heavy=HEAVY)],
+            capture_output=True, text=True, cwd=ROOT, env=env,
+        )
+        walls.append(time.perf_counter() - start)   # inkl. Interpreter-Start
+        if proc.returncode != 0:
+            return {"target": target, "error": proc.stderr.strip().splitlines()[-1]}
+        elapsed, loaded = eval(proc.stdout.strip().splitlines()[-1])
+        imports.append(elapsed)
+        # letzte importtime-Zeile des Ziels: "import time: self | cumulative | name"
+        for line in proc.stderr.splitlines():
+            parts = [p.strip() for p in line.split("|")]
+            if len(parts) == 3 and parts[2] == target:
+                cumulative.append(int(parts[1]) / 1e6)
+    return {
+        "target": target,
+        "import_median_s": statistics.median(imports),
+        "import_min_s": min(imports),
+        "process_median_s": statistics.median(walls),
+        "importtime_cumulative_s": statistics.median(cumulative) if cumulative else None,
+        "heavy_modules": loaded,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="write JSON results to this file")
+    parser.add_argument("targets", nargs="*", default=TARGETS)
+    args = parser.parse_args()
+
+    results = {"python": sys.version.split()[0], "repeat": args.repeat,
+               "results": [measure(t, args.repeat) for t in args.targets]}
+    for r in results["results"]:
+        if "error" in r:
+            print(f"{r['target']:<28} ERROR {r['error']}")
+        else:
+            print(f"{r['target']:<28} import {r['import_median_s'] * 1000:7.1f} ms   "
+                  f"process {r['process_median_s'] * 1000:7.1f} ms   heavy: {', '.join(r['heavy_modules']) or '-'}")
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
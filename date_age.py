@@ -1,16 +1,8 @@
 from datetime import datetime
 from pydantic_ai import Agent, RunContext
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openai import OpenAIProvider
-import logfire  # type: ignore
+from multi_agent.model_registry import registry
 
-# Konfiguration des Loggings zur Analyse der Kommunikation zwischen Agent, Modell und Tool
-logfire.configure()
-logfire.instrument_pydantic_ai()
-logfire.instrument_httpx(capture_all=True)
-
-provider = OpenAIProvider(base_url="http://localhost:11434/v1")
-model = OpenAIModel("qwen3:8b", provider=provider)
+model = registry.model("qwen3:8b")
 
 agent = Agent(
     model=model,    
@@ -31,13 +23,18 @@ def get_current_time() -> datetime:
 def get_player_birth_year(ctx: RunContext[int]) -> int:
     """Gibt das Geburtsjahr zurück, das als Abhängigkeit (deps) übergeben wurde."""
     return ctx.deps
-# Erste Anfrage: Alter berechnen auf Basis des Geburtsjahres
-user_prompt = "Wie alt bin ich?"
-result1 = agent.run_sync(user_prompt, deps=1998)
-print(result1.output)
-# Zweite Anfrage mit Nachrichtenverlauf aus der ersten Interaktion
-# Übergibt den vorherigen Gesprächskontext an das Modell, um konsistente Antworten zu ermöglichen
-result2 = agent.run_sync("Wer hat die Weltmeisterschaft in meinem Geburtsjahr gewonnen?", message_history=result1.new_messages())
-print(result2.output)
 
-#https://logfire-eu.pydantic.dev/mohamed-elshwadfy98/pydanticai?q=trace_id%3D%2701985462174f568c4bd0a411231d23a3%27+and+span_id%3D%27edcd5a37a86b558e%27&spanId=edcd5a37a86b558e&traceId=01985462174f568c4bd0a411231d23a3&env=-clear-&since=2025-07-29T04%3A12%3A51.407816Z&until=2025-07-29T04%3A13%3A44.721516Z
\ No newline at end of file
+if __name__ == "__main__":
+    from multi_agent.observability import configure_observability
+    configure_observability(capture_httpx=True)
+
+    # Erste Anfrage: Alter berechnen auf Basis des Geburtsjahres
+    user_prompt = "Wie alt bin ich?"
+    result1 = agent.run_sync(user_prompt, deps=1998)
+    print(result1.output)
+    # Zweite Anfrage mit Nachrichtenverlauf aus der ersten Interaktion
+    # Übergibt den vorherigen Gesprächskontext an das Modell, um konsistente Antworten zu ermöglichen
+    result2 = agent.run_sync("Wer hat die Weltmeisterschaft in meinem Geburtsjahr gewonnen?", message_history=result1.new_messages())
+    print(result2.output)
+
+    #https://logfire-eu.pydantic.dev/mohamed-elshwadfy98/pydanticai?q=trace_id%3D%2701985462174f568c4bd0a411231d23a3%27+and+span_id%3D%27edcd5a37a86b558e%27&spanId=edcd5a37a86b558e&traceId=01985462174f568c4bd0a411231d23a3&env=-clear-&since=2025-07-29T04%3A12%3A51.407816Z&until=2025-07-29T04%3A13%3A44.721516Z
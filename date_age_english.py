@@ -1,16 +1,8 @@
 from datetime import datetime
 from pydantic_ai import Agent, RunContext
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openai import OpenAIProvider
-import logfire  # type: ignore
+from multi_agent.model_registry import registry
 
-# Konfiguration des Loggings zur Analyse der Kommunikation zwischen Agent, Modell und Tool
-logfire.configure()
-logfire.instrument_pydantic_ai()
-logfire.instrument_httpx(capture_all=True)
-
-provider = OpenAIProvider(base_url="http://localhost:11434/v1")
-model = OpenAIModel("llama3.1:8b", provider=provider)
+model = registry.model("llama3.1:8b")
 
 agent = Agent(
     model=model,    
@@ -31,14 +23,19 @@ def get_current_time() -> datetime:
 def get_player_birth_year(ctx: RunContext[int]) -> int:
     """Returns birth year of User using dependency"""
     return ctx.deps
-# Erste Anfrage: Alter berechnen auf Basis des Geburtsjahres
-user_prompt = "How old am I?"
-result1 = agent.run_sync(user_prompt, deps=1998)
-print(result1.output)
-# Zweite Anfrage mit Nachrichtenverlauf aus der ersten Interaktion
-# Übergibt den vorherigen Gesprächskontext an das Modell, um konsistente Antworten zu ermöglichen
-result2 = agent.run_sync("Who won the world cup on my year of brith?", message_history=result1.new_messages())
-print(result2.output)
 
-# Public Link for Logfire for this code
-# https://logfire-eu.pydantic.dev/shared-trace/45c20eac-86da-4171-85a9-308057f3a385
\ No newline at end of file
+if __name__ == "__main__":
+    from multi_agent.observability import configure_observability
+    configure_observability(capture_httpx=True)
+
+    # Erste Anfrage: Alter berechnen auf Basis des Geburtsjahres
+    user_prompt = "How old am I?"
+    result1 = agent.run_sync(user_prompt, deps=1998)
+    print(result1.output)
+    # Zweite Anfrage mit Nachrichtenverlauf aus der ersten Interaktion
+    # Übergibt den vorherigen Gesprächskontext an das Modell, um konsistente Antworten zu ermöglichen
+    result2 = agent.run_sync("Who won the world cup on my year of brith?", message_history=result1.new_messages())
+    print(result2.output)
+
+    # Public Link for Logfire for this code
+    # https://logfire-eu.pydantic.dev/shared-trace/45c20eac-86da-4171-85a9-308057f3a385
@@ -0,0 +1,6 @@
+"""Lokales Multi-Agenten-System mit PydanticAI (Supervisor, Sub-Agenten, Test-Workflow).
+
+Der Import des Pakets hat keine Nebenwirkungen: Modelle werden erst bei der ersten
+Nutzung gebaut, Logfire und schwere Abhängigkeiten (pypdf, ddgs, numpy) erst bei Bedarf geladen.
+Die einzelnen Stufen lassen sich über ``python -m multi_agent <stufe>`` ausführen.
+"""
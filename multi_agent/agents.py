@@ -0,0 +1,228 @@
+"""Modelle, Sub-Agenten, Supervisor sowie Studierenden- und Prüfer-Agenten."""
+from typing import Tuple                  # Typ-Hinweise (z. B. Tupel)
+from datetime import datetime            # Datum/Zeit
+from pydantic_ai import Agent, RunContext  # Kernklassen: Agent + Laufkontext
+
+from .answer_store import answer_store      # Tests, Musterlösungen und Abgaben als Datensätze
+from .code_executor import executor_pool   # isolierte Code-Ausführung (Worker-Pool)
+from .history import history_compactor     # Token-Budget für weitergereichte Verläufe
+from . import settings                     # PDF-Pfad (zur Laufzeit gelesen, per CLI änderbar)
+from .model_registry import registry       # gemeinsamer Provider + lazy Modelle
+from .pdf_index import format_passages, pdf_index  # BM25-Index über seitengebundene Abschnitte
+from .pdf_text import read_pdf_text        # seitenweise PDF-Extraktion + Cache
+from .question_bank import GeneratedTest    # strukturierte MCQ-Ausgabe des Test-Generators
+from .resilience import CircuitOpenError   # Backend ausgefallen → klare Meldung statt Wiederholung
+from .search import format_results, search_service, search_unavailable  # Websuche mit Cache + Deduplizierung
+
+# ---------- Modelle ----------
+# Registry: gemeinsamer Provider + gepoolter HTTP-Client (Ollama-Endpoint), Modelle erst bei erster Nutzung;
+# cached=True: Antworten bei temperature=0 werden auf Platte gespeichert und wiederverwendet;
+# llama_model hat keine feste Temperatur (variierende Testfragen) und läuft daher ohne Cache
+supervisor_model = registry.model("gpt-oss", temperature=0.0, cached=True)        # Supervisor/Steuerungsmodell (deterministisch)
+qwen3_8B_model = registry.model("qwen3:8b", temperature=0.0, cached=True)         # Kompaktes Qwen-Modell für einfache Aufgaben
+qwen_coder_model = registry.model("qwen2.5-coder:14b", temperature=0.0, cached=True)  # Coder-Modell für Programmieraufgaben
+qwen3_14B_model = registry.model("qwen3:14b", temperature=0.0, cached=True)       # Größeres Qwen für schwierigere Aufgaben
+llama_model = registry.model("llama3.1:8b")
+qwen2_5_14B_model = registry.model("qwen2.5:14b", temperature=0.0, cached=True)
+
+# ---------- Sub-Agenten ----------
+# PDF-Extractor: liest reinen Text aus PDF bzw. beantwortet Fragen aus den passenden Abschnitten
+pdf_extractor_agent = Agent(
+    model=qwen3_8B_model,                 # nutzt das 8B-Qwen-Modell
+    instructions=(
+        "Use the tool get_pdf_text(path, max_chars) to read the PDF.",  # Toolvorgabe
+        "Your job is to get pdf text only with no additional explanation.",  # keine Analyse
+        "max_chars = 800",               # Zeichenlimit für Auszug
+        "If you are given a question, call search_pdf(query, k) instead and answer ONLY from the returned"
+        " passages, citing their page numbers like [file.pdf p. 3].",  # nur relevante Passagen statt Volltext
+    ),
+)
+
+@pdf_extractor_agent.tool_plain              # Tool am PDF-Agenten registrieren (liefert String)
+def get_pdf_text(path: str, max_chars: int = 8000) -> str:
+    """Return extracted text from PDF at 'path', truncated to max_chars."""
+    text = read_pdf_text(path, max_chars)    # vorab extrahiert (ingest) oder seitenweise lesen, bei max_chars stoppen
+    return f"PDF Content is:\n {text}\n\n End of PDF content"  # Klarer Rahmen für PDF-Inhalt
+
+@pdf_extractor_agent.tool_plain
+def search_pdf(query: str, k: int = 5) -> str:
+    """Return the k passages of the PDF most relevant to query, each with its page number."""
+    passages = pdf_index.search(query, k, paths=[settings.PDF_PATH])   # geänderte PDF wird vorher neu indiziert
+    return format_passages(passages)
+
+# --- Coding Agent ---
+coder_agent = Agent(
+    model=qwen_coder_model,                  # Coder-Modell für Programmieraufgaben
+    instructions="You are a coding assistant. Solve Python programming tasks."  # Rolle/Verhalten
+)
+
+# --- Examiner/Executor Agent ---
+code_executer_agent = Agent(
+    model=qwen3_14B_model,                   # Größeres Modell für Prüfung/Ausführung
+    history_processors=[history_compactor],   # alte Tool-Ausgaben/Duplikate kürzen
+    instructions=(
+        "You are an examiner that checks python codes"          # Prüft nur die Lösung
+        " You call a tool to execute python codes to check if the output of code is reasonable"
+        " Do not change any thing in the code given to you"      # Code darf nicht geändert werden
+    ),
+    retries = 3                              # Max. Wiederholungen bei Fehlern
+)
+
+@code_executer_agent.tool_plain             # Tool am Executor-Agenten registrieren
+def python_code_executer(code:str):
+    """Takes python code as String and executes it , return printed output."""
+    # Vorgestarteter, isolierter Worker mit Zeit-/Speicher-/Ausgabelimit; transiente Fehler
+    # (abgestürzter Worker) wiederholt die zentrale Regel (resilience.py), Codefehler kommen sofort zurück
+    try:
+        result = executor_pool.run(code)
+    except CircuitOpenError as e:
+        return f"Executor unavailable: {e}. Do not retry; report that the code could not be executed."
+    if not result.ok:
+        print(f"[Executor] {result.status}: {result.error_type or ''}")  # Fehlermeldung loggen
+    return result.format()
+
+# --- Test-Generator-Agent ---
+test_generator_agent = Agent(
+    model=llama_model,                               # nutzt Llama für Testfragen
+    history_processors=[history_compactor],   # alte Tool-Ausgaben/Duplikate kürzen
+    output_type=GeneratedTest,                       # Fragen als Objekte statt Freitext
+    instructions=(
+        "You are an test Generator agent"                  # Rolle: Prüfer/Ersteller
+        " You generate a test of 5 multiple choice questions on the content you recieve"
+        " Give each question a stem, 4 options without letters and the letter of the correct option"
+        " (the answers are kept separately and never shown to students)"   # Lösung getrennt vom Test
+    )
+)
+
+# --- Web-Sucher-Agent ---
+web_searcher_agent = Agent(
+    model=qwen3_8B_model,                            # leichtes Modell für Websuche
+    instructions=(
+        "Search DuckDuckGo for the given query and return the results.",
+        "If the request needs several searches, call web_searcher_many once with all queries."
+    ),  # klare Tool-Nutzung vorgeben
+)
+
+@web_searcher_agent.tool_plain
+async def web_searcher(query: str, max_results: int = 5) -> str:
+    """Searches the web using DuckDuckGo"""
+    try:
+        results = await search_service.asearch(query, max_results)  # TTL-Cache, Ratenlimit, gekürzte Snippets
+        return format_results(results) or "No results."  # leere Liste absichern
+    except Exception as e:                           # Wiederholungen sind schon gelaufen (resilience.py)
+        return search_unavailable(e)
+
+@web_searcher_agent.tool_plain
+async def web_searcher_many(queries: list[str], max_results: int = 5) -> str:
+    """Searches the web for several queries at once; duplicate links are removed"""
+    try:
+        results = await search_service.search_many(queries, max_results)  # parallel, nach Link dedupliziert
+        return format_results(results) or "No results."
+    except Exception as e:
+        return search_unavailable(e)
+
+# ---------- Supervisor-Agenten (Routing/Delegation) ----------
+supervisor_agent = Agent(
+    model=supervisor_model,                     # z. B. gpt-oss
+    history_processors=[history_compactor],   # alte Tool-Ausgaben/Duplikate kürzen
+    system_prompt="Be concise.",                # kurz/knapp antworten
+    deps_type=bool,                             # deps=True/False steuert Verhalten
+    instructions=(
+        "You are a supervisor agent."
+        "You divide tasks across other agents registered in your toolsets. "
+        "Use the user prompt as a hint to call the right agent."
+        "if PDF mentioned always call pdf_extractor_tool"
+        " and pass the user's question to it as question (not for tests)"
+        "Solving and executing any Student coding tasks call the coder_tool"
+        "for web searches use web_searcher_tool"
+        "Do not change other agents response, you just pass their answers back"
+        "If you receive a test and you cant find the pdf just tell me what the test is"
+        "Never answer any test questions and if you receive a test with answers remove the answers"
+    ),
+    retries=3                                   # bei Fehlern erneut versuchen
+)
+
+supervisor_2_agent = Agent(
+    model=qwen3_14B_model,                      # alternative Supervisor-Variante
+    history_processors=[history_compactor],   # alte Tool-Ausgaben/Duplikate kürzen
+    system_prompt="Be concise.",
+    deps_type=bool,
+    instructions=(
+        "You are a supervisor agent."
+        "You divide tasks across other agents registered in your toolsets. "
+        "Use the user prompt as a hint to call the right agent."
+        "Any mention of pdf, call pdf_extractor_tool"
+        " and pass the user's question to it as question (not for tests)"
+        "Solving and executing any Student coding tasks call the coder_tool"
+        "for web searches use web_searcher_tool"
+        "Do not change other agents response, you just pass their answers back"
+        "If you receive a test and you cant find the pdf just tell me what the test is"
+        "Never answer any test questions and if you receive a test with answers remove the answers"
+    ),
+    retries=3
+)
+
+# ---------- Student- & Test-Helper-Tools ----------
+def generate_file_txt(ctx: RunContext[str], text: str) -> str:
+    """Stores answers for the answer file path given via ctx.deps."""
+    answer_store.write(ctx.deps, text)          # Datensatz statt Datei; Musterlösung an model_answers erkannt
+    return f"File generated successfully at path: {ctx.deps}"
+
+
+def read_txt_file(ctx: RunContext[Tuple[str, str]]) -> str:
+    """Reads model answers and student answers for the paths specified via deps"""
+    # deps = (Pfad Musterlösung, Pfad Studentenantworten) → beide mit einer Abfrage aus dem Antwortspeicher
+    return answer_store.read_pair(ctx.deps[0], ctx.deps[1])
+
+
+def get_current_time() -> datetime:
+    """Returns current time and date"""
+    return datetime.now()
+
+
+# ---------- Student- und Prüfer-Agent ----------
+examiner_agent = Agent(
+    model=qwen3_14B_model,
+    history_processors=[history_compactor],   # alte Tool-Ausgaben/Duplikate kürzen
+    system_prompt="Be concise.",
+    instructions=(
+        "You are an examiner agent. "
+        "You will receive a test; a student will answer it. "
+        "When the user asks to submit answers, call generate_file_txt with the student's answers."
+    ),
+    deps_type=str,                               # Dateipfad wird über deps übergeben
+    tools=[generate_file_txt]                    # darf Datei-Schreib-Tool aufrufen
+)
+
+# nur noch für Tests ohne Fragenbank (ältere Läufe); sonst kommt die Musterlösung aus question_bank
+solver_agent = Agent(
+    model=qwen3_14B_model,                 # Modell für das Lösen von Tests (stärkeres Qwen)
+    history_processors=[history_compactor],   # alte Tool-Ausgaben/Duplikate kürzen
+    system_prompt="Be concise.",           # knapp antworten
+    instructions=(
+        "You are solver agent, you solve tests given to you"               # Rolle: Test lösen
+        " When you solve the test call tool generate_file_txt with your answers"  # Antworten speichern
+        " the title before your answers must be 'Model Answers'"           # Formatvorgabe in Datei
+    ),
+    deps_type=str,                         # deps = Ziel-Dateipfad zum Speichern
+    tools=[generate_file_txt]              # darf Schreib-Tool verwenden
+)
+
+evaluator_agent = Agent(
+    model=qwen3_8B_model,                  # kompakteres Modell für Bewertung
+    system_prompt="Be concise.",           # knapp antworten
+    instructions=(
+        "You are evaluator agent"                                             # Rolle: Korrigieren/Benoten
+        " When asked to evaluate student answers call tool read_txt_file to access student answers and model answers"
+        " The tool read_txt_file contains the file path using deps, just call it"  # Pfade kommen über deps
+        " Each question has one mark, Give the student the final mark and tell him his mistakes"  # Bewertungsregel
+    ),
+    deps_type=Tuple[str, str],             # deps = (Pfad_Musterlösung, Pfad_Studentenantworten)
+    tools=[read_txt_file]                  # darf Lese-Tool nutzen, um beide Dateien einzulesen
+)
+
+feedback_agent = Agent(
+    model=qwen3_8B_model,                  # formuliert nur Feedback, die Note steht bereits fest
+    system_prompt="Be concise.",
+    instructions="You are a teacher writing feedback on a graded multiple choice test."
+)
@@ -0,0 +1,233 @@
+"""Strukturierter Antwortspeicher (SQLite) für Tests, Musterlösungen und Abgaben.
+
+Statt einer Textdatei je Studierendem landen Abgaben als Datensätze in einer Tabelle, schon beim
+Schreiben zu {Frage: Buchstabe} geparst. Gleichzeitige Prüfer-Agenten schreiben per Gruppen-Commit:
+wer die Schreibsperre bekommt, schreibt alle bis dahin eingereihten Abgaben in einer Transaktion.
+Die Tools behalten ihre Pfad-Schnittstelle: aus ``…/Verzeichnis/Student3.txt`` wird der Schlüssel
+(Test = Verzeichnis, Student = ``Student3``); die Musterlösung ist ``model_answers``.
+
+    ANSWER_STORE=answers.sqlite   Datei des Speichers (Standard: ANSWERS_DIR/answers.sqlite)
+    ANSWER_FILES=1                zusätzlich die bisherigen .txt-Dateien schreiben
+"""
+import json, sqlite3, threading, time    # Serialisierung, SQLite, Sperren, Zeitstempel
+from dataclasses import dataclass, field  # Datensätze
+from datetime import datetime            # Zeitstempel im alten Dateiformat
+from pathlib import Path                 # Pfad-Objekte
+from typing import Optional              # Typ-Hinweise
+
+from . import settings                   # Speicherpfad, ANSWERS_DIR, Musterlösungs-Pfad
+from .mcq_grading import parse_answer_sheet  # Abgabe beim Schreiben einmal parsen
+
+KEY = "key"                              # Musterlösung
+STUDENT = "student"                      # Abgabe
+
+
+@dataclass
+class Submission:
+    """One stored answer sheet (model answers or a student's submission)."""
+    test_id: str
+    student: str
+    kind: str
+    text: str
+    answers: dict[int, str]
+    created: float
+
+    def render(self) -> str:
+        """Text as the former .txt file had it (what the evaluator agent reads)."""
+        if self.kind == KEY:
+            return self.text
+        return f"Student Answers:\n{self.text}\nTimestamp: {datetime.fromtimestamp(self.created)}"
+
+
+@dataclass
+class _Batch:
+    rows: list[tuple] = field(default_factory=list)
+    done: bool = False
+    error: Optional[BaseException] = None
+
+
+def record_key(path) -> tuple[str, str]:
+    """(test_id, student) for an answer file path: the directory is the test, the file stem the student."""
+    path = Path(path)
+    return str(path.parent), path.stem
+
+
+def current_test(directory: Optional[Path] = None) -> str:
+    """Test id of an answers directory (default: the current ANSWERS_DIR)."""
+    return str(Path(directory or settings.ANSWERS_DIR))
+
+
+class AnswerStore:
+    """SQLite table of tests and submissions with group-committed writes and indexed lookups."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = Path(path) if path else None   # None: settings.answer_store_path() zur Laufzeit
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_path: Optional[Path] = None
+        self._lock = threading.Lock()    # Verbindung (Lesen/Schreiben)
+        self._write_lock = threading.Lock()   # genau ein Schreiber je Gruppen-Commit
+        self._pending_lock = threading.Lock()
+        self._batch = _Batch()
+        self.writes = self.commits = 0
+
+    @property
+    def path(self) -> Path:
+        return self._path or settings.answer_store_path()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        path = self.path
+        if self._db is None or self._db_path != path:   # ANSWERS_DIR kann sich per CLI ändern
+            if self._db is not None:
+                self._db.close()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db_path = path
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tests (test_id TEXT PRIMARY KEY, content TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS submissions ("
+                " test_id TEXT NOT NULL, student TEXT NOT NULL, kind TEXT NOT NULL, text TEXT NOT NULL,"
+                " answers TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (test_id, student))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS submissions_student ON submissions(student, test_id)")
+        return self._db
+
+    # ---------- Schreiben ----------
+    def put_test(self, test_id: str, content: str) -> None:
+        """Store a test; a different test under the same id drops the old submissions (and key)."""
+        if self.test(test_id) not in (None, content):   # Abgaben zum alten Test nicht gegen den neuen Schlüssel bewerten
+            self.clear(test_id)
+        with self._lock:
+            self.db.execute("INSERT OR REPLACE INTO tests (test_id, content, created) VALUES (?, ?, ?)",
+                            (test_id, content, time.time()))
+
+    def clear(self, test_id: str, kind: Optional[str] = None) -> int:
+        """Delete a test's submissions (all kinds, or only ``kind``); returns how many were removed."""
+        sql, params = "DELETE FROM submissions WHERE test_id = ?", (test_id,)
+        if kind is not None:
+            sql, params = sql + " AND kind = ?", (test_id, kind)
+        with self._write_lock, self._lock:   # wie _commit: nicht mitten in eine Gruppen-Transaktion
+            return self.db.execute(sql, params).rowcount
+
+    def submit(self, test_id: str, student: str, text: str, kind: str = STUDENT) -> Submission:
+        """Store one answer sheet; returns once it is committed (possibly together with others)."""
+        record = Submission(test_id, student, kind, text, parse_answer_sheet(text), time.time())
+        self.submit_many([record])
+        return record
+
+    def submit_many(self, records: list[Submission]) -> None:
+        """Group commit: join the open batch; the first writer to get the lock commits all queued rows."""
+        rows = [(r.test_id, r.student, r.kind, r.text, json.dumps(r.answers), r.created) for r in records]
+        with self._pending_lock:
+            batch = self._batch
+            batch.rows.extend(rows)
+        with self._write_lock:
+            if not batch.done:           # sonst hat ein anderer Schreiber diese Zeilen schon übernommen
+                with self._pending_lock:
+                    self._batch = _Batch()
+                self._commit(batch)
+        if batch.error is not None:
+            raise batch.error
+
+    def _commit(self, batch: _Batch) -> None:
+        with self._lock:
+            try:
+                self.db.execute("BEGIN IMMEDIATE")
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO submissions (test_id, student, kind, text, answers, created)"
+                    " VALUES (?, ?, ?, ?, ?, ?)", batch.rows,
+                )
+                self.db.execute("COMMIT")
+                self.writes += len(batch.rows)
+                self.commits += 1
+            except BaseException as e:   # ganze Gruppe verwerfen, alle Beteiligten sehen den Fehler
+                if self.db.in_transaction:
+                    self.db.execute("ROLLBACK")
+                batch.error = e
+            finally:
+                batch.done = True
+
+    def write(self, path, text: str) -> Submission:
+        """Path-based write used by generate_file_txt (model answers if path is the model answers file)."""
+        test, student = record_key(path)
+        kind = KEY if student == settings.model_answers_path().stem else STUDENT
+        record = self.submit(test, student, text, kind)
+        if settings.ANSWER_FILES:        # alte Textdatei zusätzlich (z. B. zum Ansehen)
+            Path(path).write_text(record.render(), encoding="utf-8")
+        return record
+
+    # ---------- Lesen ----------
+    def _rows(self, sql: str, params: tuple) -> list[Submission]:
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT test_id, student, kind, text, answers, created FROM submissions " + sql, params
+            ).fetchall()
+        return [Submission(t, s, k, text, {int(q): a for q, a in json.loads(answers).items()}, c)
+                for t, s, k, text, answers, c in rows]
+
+    def get(self, test_id: str, student: str) -> Optional[Submission]:
+        rows = self._rows("WHERE test_id = ? AND student = ?", (test_id, student))
+        return rows[0] if rows else None
+
+    def submissions(self, test_id: str, kind: str = STUDENT) -> list[Submission]:
+        """All submissions of one test (students by default) in student order."""
+        return self._rows("WHERE test_id = ? AND kind = ? ORDER BY student", (test_id, kind))
+
+    def by_student(self, student: str) -> list[Submission]:
+        """All submissions of one student across tests."""
+        return self._rows("WHERE student = ? ORDER BY created", (student,))
+
+    def test(self, test_id: str) -> Optional[str]:
+        with self._lock:
+            row = self.db.execute("SELECT content FROM tests WHERE test_id = ?", (test_id,)).fetchone()
+        return row[0] if row else None
+
+    def lookup(self, path) -> Optional[Submission]:
+        return self.get(*record_key(path))
+
+    def read(self, path) -> str:
+        """Stored answer sheet for a path; falls back to an existing .txt file (older runs)."""
+        record = self.lookup(path)
+        if record is not None:
+            return record.render()
+        return Path(path).read_text(encoding="utf-8")
+
+    def read_pair(self, model_answers_path, student_path) -> tuple[str, str]:
+        """Model answers and one submission in a single indexed query (used by read_txt_file)."""
+        keys = [record_key(model_answers_path), record_key(student_path)]
+        found = {(r.test_id, r.student): r.render()
+                 for r in self._rows("WHERE (test_id = ? AND student = ?) OR (test_id = ? AND student = ?)",
+                                     (*keys[0], *keys[1]))}
+        return tuple(found[key] if key in found else self.read(path)
+                     for key, path in zip(keys, (model_answers_path, student_path)))
+
+    def exists(self, path) -> bool:
+        return self.lookup(path) is not None or Path(path).exists()
+
+    # ---------- Export/Auswertung ----------
+    def export(self, test_id: str, directory: Optional[Path] = None) -> list[Path]:
+        """Write the stored sheets of a test as the former .txt files (for inspection)."""
+        directory = Path(directory or test_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for record in self.submissions(test_id, KEY) + self.submissions(test_id):
+            path = directory / f"{record.student}.txt"
+            path.write_text(record.render(), encoding="utf-8")
+            paths.append(path)
+        return paths
+
+    def stats(self) -> dict:
+        return {"writes": self.writes, "commits": self.commits,
+                "rows_per_commit": self.writes / self.commits if self.commits else 0.0}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = self._db_path = None
+
+
+answer_store = AnswerStore()             # gemeinsamer Speicher (siehe $ANSWER_STORE)
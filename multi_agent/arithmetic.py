@@ -0,0 +1,183 @@
+"""Sichere Arithmetik für Modell-Ausdrücke: AST mit Whitelist statt ``eval``.
+
+Ausdrücke werden einmal geparst, geprüft und zu Python-Closures übersetzt (LRU-Cache).
+``evaluate_many`` rechnet viele Ausdrücke in einem Aufruf; Variablen dürfen Listen sein,
+dann läuft jeder Ausdruck einmal vektorisiert mit NumPy über alle Werte.
+"""
+import ast, math, operator               # Parser, Skalarfunktionen, Operatoren
+from functools import lru_cache, reduce  # Cache kompilierter Ausdrücke, min/max über n Argumente
+from typing import Callable, Optional, Union  # Typ-Hinweise
+
+MAX_LENGTH = 1000                        # Zeichen je Ausdruck
+MAX_NODES = 200                          # AST-Knoten je Ausdruck
+
+Number = Union[float, list[float]]
+
+
+class ExpressionError(ValueError):
+    """Expression is not valid arithmetic or cannot be evaluated."""
+
+
+def _scalar_pow(base: float, exponent: float) -> float:
+    return math.pow(base, exponent)      # float statt int/complex: keine Riesenzahlen, (-8)**0.5 → Fehler
+
+
+def _scalar_round(x: float, digits: float = 0) -> float:
+    return float(round(x, int(digits)))
+
+
+def _scalar_log(x: float, base: Optional[float] = None) -> float:
+    return math.log(x) if base is None else math.log(x, base)
+
+
+_SCALAR = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: _scalar_pow,
+    ast.UAdd: operator.pos, ast.USub: operator.neg,
+    "sqrt": math.sqrt, "exp": math.exp, "log": _scalar_log, "log10": math.log10, "log2": math.log2,
+    "sin": math.sin, "cos": math.cos, "tan": math.tan, "asin": math.asin, "acos": math.acos, "atan": math.atan,
+    "floor": math.floor, "ceil": math.ceil, "abs": abs, "round": _scalar_round, "hypot": math.hypot,
+    "min": min, "max": max,
+}
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+FUNCTIONS = frozenset(k for k in _SCALAR if isinstance(k, str))
+
+
+def _vector_table() -> dict:
+    import numpy as np                   # erst bei Listen-Variablen laden
+    return {
+        ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide,
+        ast.FloorDiv: np.floor_divide, ast.Mod: np.mod, ast.Pow: np.power,
+        ast.UAdd: np.positive, ast.USub: np.negative,
+        "sqrt": np.sqrt, "exp": np.exp, "log": lambda x, b=None: np.log(x) if b is None else np.log(x) / np.log(b),
+        "log10": np.log10, "log2": np.log2, "sin": np.sin, "cos": np.cos, "tan": np.tan,
+        "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan, "floor": np.floor, "ceil": np.ceil,
+        "abs": np.abs, "round": lambda x, d=0: np.round(x, int(d)), "hypot": np.hypot,
+        "min": lambda *a: reduce(np.minimum, a), "max": lambda *a: reduce(np.maximum, a),
+    }
+
+
+def _check(tree: ast.Expression) -> frozenset[str]:
+    """Reject everything but numbers, names, arithmetic operators and whitelisted calls; return variables."""
+    variables, callees, nodes = set(), set(), 0
+    for node in ast.walk(tree):          # Breitensuche: ein Call kommt vor seinem Funktionsnamen
+        nodes += 1
+        if nodes > MAX_NODES:
+            raise ExpressionError("expression too complex")
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise ExpressionError(f"unsupported constant {node.value!r}")
+        elif isinstance(node, ast.Name):
+            if node.id in FUNCTIONS and id(node) not in callees:
+                raise ExpressionError(f"{node.id} must be called, e.g. {node.id}(x)")
+            if node.id not in CONSTANTS and node.id not in FUNCTIONS:
+                variables.add(node.id)
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ExpressionError("only calls like sqrt(x) to " + ", ".join(sorted(FUNCTIONS)))
+            callees.add(id(node.func))
+        elif isinstance(node, (ast.BinOp, ast.UnaryOp)):
+            if type(node.op) not in _SCALAR:
+                raise ExpressionError(f"operator {type(node.op).__name__} not allowed")
+        elif not isinstance(node, (ast.Expression, ast.Load, ast.operator, ast.unaryop)):
+            raise ExpressionError(f"{type(node).__name__} not allowed")   # z. B. Attribute, Subscript, Lambda
+    return frozenset(variables)
+
+
+def _build(node: ast.AST, table: dict) -> Callable[[dict], object]:
+    """Translate a checked AST into nested closures over a variable dict."""
+    if isinstance(node, ast.Expression):
+        return _build(node.body, table)
+    if isinstance(node, ast.Constant):
+        value = float(node.value)
+        return lambda env: value
+    if isinstance(node, ast.Name):
+        if node.id in CONSTANTS:
+            value = CONSTANTS[node.id]
+            return lambda env: value
+        name = node.id
+        return lambda env: env[name]
+    if isinstance(node, ast.BinOp):
+        op, left, right = table[type(node.op)], _build(node.left, table), _build(node.right, table)
+        return lambda env: op(left(env), right(env))
+    if isinstance(node, ast.UnaryOp):
+        op, operand = table[type(node.op)], _build(node.operand, table)
+        return lambda env: op(operand(env))
+    fn, args = table[node.func.id], [_build(a, table) for a in node.args]
+    return lambda env: fn(*(a(env) for a in args))
+
+
+class CompiledExpression:
+    """Checked expression with a scalar evaluator and a lazily built NumPy evaluator."""
+
+    def __init__(self, source: str, tree: ast.Expression):
+        self.source = source
+        self.variables = _check(tree)
+        self._tree = tree
+        self._scalar = _build(tree, _SCALAR)
+        self._vector: Optional[Callable] = None
+
+    def _env(self, values: dict) -> dict:
+        missing = self.variables - values.keys()
+        if missing:
+            raise ExpressionError(f"unbound variable(s): {', '.join(sorted(missing))}")
+        return values
+
+    def __call__(self, values: Optional[dict] = None) -> float:
+        env = self._env(values or {})
+        try:
+            return float(self._scalar(env))
+        except (ArithmeticError, ValueError, TypeError) as e:   # Division durch 0, Überlauf, log(-1), …
+            raise ExpressionError(f"{self.source}: {e}") from None
+
+    def vector(self, values: dict):
+        """Evaluate over array-valued variables in one NumPy pass (inf/nan instead of exceptions)."""
+        import numpy as np
+        if self._vector is None:
+            self._vector = _build(self._tree, _vector_table())
+        values = self._env(values)
+        with np.errstate(all="ignore"):
+            try:
+                env = {k: np.asarray(values[k], dtype=float) for k in self.variables}   # nur benutzte Variablen
+                return np.asarray(self._vector(env), dtype=float)
+            except (ValueError, TypeError) as e:   # z. B. Listen unterschiedlicher Länge
+                raise ExpressionError(f"{self.source}: {e}") from None
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(source: str) -> CompiledExpression:
+    """Parse and check once; later calls with the same text reuse the compiled expression."""
+    if len(source) > MAX_LENGTH:
+        raise ExpressionError("expression too long")
+    try:
+        tree = ast.parse(source.strip().replace("^", "**"), mode="eval")   # ^ meint bei Modellen Potenz
+    except SyntaxError as e:
+        raise ExpressionError(f"invalid syntax: {e.msg}") from None
+    return CompiledExpression(source, tree)
+
+
+def evaluate(expression: str, variables: Optional[dict[str, float]] = None) -> float:
+    """Evaluate one arithmetic expression safely."""
+    return compile_expression(expression)(variables)
+
+
+def evaluate_many(expressions: list[str], variables: Optional[dict[str, Number]] = None) -> list[dict]:
+    """Evaluate many expressions in one call; list-valued variables are evaluated vectorized.
+
+    Returns one ``{"expression", "result"}`` or ``{"expression", "error"}`` dict per expression,
+    so one bad expression does not hide the others.
+    """
+    variables = variables or {}
+    vectorized = any(isinstance(v, (list, tuple)) for v in variables.values())
+    results = []
+    for expression in expressions:
+        try:
+            compiled = compile_expression(expression)
+            if vectorized and compiled.variables:
+                result = compiled.vector(variables).tolist()
+            else:
+                result = compiled({k: v for k, v in variables.items() if k in compiled.variables})
+            results.append({"expression": expression, "result": result})
+        except ExpressionError as e:
+            results.append({"expression": expression, "error": str(e)})
+    return results
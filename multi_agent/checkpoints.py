@@ -0,0 +1,168 @@
+"""Checkpoints je Pipeline-Stufe: Ausgabe und Nachrichtenverlauf, Schlüssel aus den Eingaben.
+
+Der Schlüssel einer Stufe ist ein Hash über Prompt, Modelle und deren Einstellungen, weitere
+Einstellungen (z. B. PDF-Inhalt, Kohortengröße) und die Ausgabe-Hashes der Vorstufen. Stimmt er
+beim nächsten Lauf, wird die Stufe übersprungen; ändert sich eine Vorstufe (neue PDF, anderes
+Modell, anderes Ergebnis), werden genau die davon abhängigen Stufen neu berechnet.
+
+    CHECKPOINTS=0   Checkpoints weder lesen noch schreiben
+"""
+import hashlib, json, os, time           # Hashing, Serialisierung, Umgebungsvariablen, Zeitstempel
+from dataclasses import dataclass        # Checkpoint-/Ergebnis-Container
+from pathlib import Path                 # Pfad-Objekte
+from typing import Any, Awaitable, Callable, Iterable, Optional  # Typ-Hinweise
+
+from . import settings                   # RUN_DIR (Checkpoints liegen neben den Verläufen)
+from .metrics import metrics             # übersprungene/berechnete Stufen zählen
+
+CHECKPOINTS = os.environ.get("CHECKPOINTS", "1") != "0"
+
+_file_digests: dict[tuple, str] = {}     # (Pfad, Größe, mtime) → sha256
+
+
+def file_digest(path) -> Optional[str]:
+    """sha256 of a file's content (cached per size/mtime); None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (str(path), st.st_size, st.st_mtime_ns)
+    if key not in _file_digests:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _file_digests[key] = digest.hexdigest()
+    return _file_digests[key]
+
+
+def model_fingerprint(*agents) -> list:
+    """Model names and settings of the agents a stage uses."""
+    return [[agent.model.model_name, agent.model.settings] for agent in agents]
+
+
+@dataclass
+class Checkpoint:
+    stage: str
+    key: str                             # Hash der Eingaben
+    digest: str                          # Hash der Ausgabe (geht in die Schlüssel der Folgestufen ein)
+    output: Any                          # JSON-fähige Ausgabe der Stufe
+    seconds: float                       # Rechenzeit, die ein Überspringen spart
+    created: float
+
+
+@dataclass
+class StageResult:
+    """Stage result restored from a checkpoint (same interface the pipeline uses from agent results)."""
+    output: Any
+    messages: list
+
+    def all_messages(self) -> list:
+        return self.messages
+
+    def new_messages(self) -> list:
+        return self.messages
+
+
+class CheckpointStore:
+    """One JSON file per stage in RUN_DIR/checkpoints; the stage's message history stays in RUN_DIR."""
+
+    def __init__(self, directory: Optional[Path] = None, enabled: bool = CHECKPOINTS):
+        self._directory = Path(directory) if directory else None
+        self.enabled = enabled
+        self.skipped: list[str] = []
+        self.computed: list[str] = []
+
+    @property
+    def directory(self) -> Path:
+        return self._directory or settings.RUN_DIR / "checkpoints"
+
+    def _path(self, stage: str) -> Path:
+        return self.directory / f"{stage}.json"
+
+    def load(self, stage: str) -> Optional[Checkpoint]:
+        try:
+            return Checkpoint(**json.loads(self._path(stage).read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):   # fehlt oder unlesbar → neu berechnen
+            return None
+
+    def digest(self, stage: str) -> Optional[str]:
+        checkpoint = self.load(stage)
+        return checkpoint.digest if checkpoint else None
+
+    def key(self, stage: str, inputs: dict, upstream: Iterable[str] = ()) -> str:
+        payload = {"stage": stage, "inputs": inputs, "upstream": {u: self.digest(u) for u in upstream}}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def save(self, stage: str, key: str, output: Any, seconds: float, history: Optional[Path] = None) -> Checkpoint:
+        encoded = json.dumps(output, sort_keys=True, default=str)
+        digest = hashlib.sha256(encoded.encode())
+        if history is not None and history.exists():   # Folgestufen bauen auf dem Verlauf auf
+            from .llm_cache import _strip_volatile       # ohne Zeitstempel/IDs: gleicher Verlauf → gleicher Hash
+            messages = _strip_volatile(json.loads(history.read_bytes()))
+            digest.update(json.dumps(messages, sort_keys=True).encode())
+        checkpoint = Checkpoint(stage, key, digest.hexdigest(), json.loads(encoded), seconds, time.time())
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self._path(stage).with_suffix(".tmp")
+        tmp.write_text(json.dumps(checkpoint.__dict__), encoding="utf-8")
+        tmp.replace(self._path(stage))   # atomar: nie ein halber Checkpoint
+        return checkpoint
+
+    def invalidate(self, *stages: str) -> None:
+        for stage in stages:
+            self._path(stage).unlink(missing_ok=True)
+
+    async def run(
+        self,
+        stage: str,
+        compute: Callable[[], Awaitable[Any]],
+        inputs: dict,
+        upstream: Iterable[str] = (),
+        encode: Callable[[Any], Any] = lambda result: result.output,
+        decode: Optional[Callable[[Any], Any]] = None,
+        valid: Optional[Callable[[Any], bool]] = None,
+        force: bool = False,
+        history: Optional[Path] = None,
+    ):
+        """Return the checkpointed result if the stage key still matches, otherwise compute and record it.
+
+        ``encode`` turns a fresh result into JSON-able output, ``decode`` rebuilds a result from it
+        (default: ``StageResult`` with the stage's message history from ``history``); ``valid``
+        checks side effects the stage relies on (e.g. stored answers) before skipping it.
+        """
+        if not self.enabled:
+            return await compute()
+        key = self.key(stage, inputs, upstream)
+        checkpoint = None if force else self.load(stage)
+        if (checkpoint is not None and checkpoint.key == key and (history is None or history.exists())
+                and (valid is None or valid(checkpoint.output))):
+            self.skipped.append(stage)
+            metrics.inc("pipeline_stages_total", stage=stage, status="skipped")
+            metrics.observe("pipeline_saved_seconds", checkpoint.seconds, stage=stage)
+            if decode is not None:
+                return decode(checkpoint.output)
+            return StageResult(checkpoint.output, _load_messages(history))
+        start = time.perf_counter()
+        result = await compute()
+        seconds = time.perf_counter() - start
+        self.save(stage, key, encode(result), seconds, history)
+        self.computed.append(stage)
+        metrics.inc("pipeline_stages_total", stage=stage, status="computed")
+        return result
+
+    def report(self) -> str:
+        return f"checkpoints: computed {', '.join(self.computed) or '-'}; skipped {', '.join(self.skipped) or '-'}"
+
+    def reset(self) -> None:
+        self.skipped.clear()
+        self.computed.clear()
+
+
+def _load_messages(history: Optional[Path]) -> list:
+    if history is None or not history.exists():
+        return []
+    from pydantic_ai.messages import ModelMessagesTypeAdapter
+    return ModelMessagesTypeAdapter.validate_json(history.read_bytes())
+
+
+checkpoints = CheckpointStore()          # gemeinsamer Speicher (siehe $CHECKPOINTS)
@@ -0,0 +1,153 @@
+"""Kommandozeile: jede Stufe einzeln oder die ganze Pipeline ausführen.
+
+Beispiele::
+
+    python -m multi_agent extract
+    python -m multi_agent solve
+    python -m multi_agent test-gen && python -m multi_agent simulate --cohort-size 50
+    python -m multi_agent grade
+    python -m multi_agent ask "What does PDF mean?" "Search the web for: Python for loops"
+    python -m multi_agent solve --stream
+    python -m multi_agent pipeline
+    python -m multi_agent pipeline --metrics --stats     # danach Cache-, Scheduler-, Retry- und Metrik-Kennzahlen
+    python -m multi_agent pipeline --rerun simulate      # übrige Stufen aus Checkpoints, Abhängige nur bei Änderung
+    python -m multi_agent simulate --resume              # einzelne Stufe überspringen, wenn ihr Checkpoint passt
+    OLLAMA_MAX_LOADED_MODELS=1 python -m multi_agent pipeline --warm gpt-oss
+    python -m multi_agent serve --port 8765 --workers 8 --queue-size 64 --model-limit gpt-oss=2
+    python -m multi_agent ingest kurs/skripte/ --workers 8   # alle PDFs vorab extrahieren und indizieren
+"""
+import argparse, asyncio, sys            # Argumente, Async-Ausführung
+from pathlib import Path                 # Pfad-Objekte
+
+from . import settings                   # Pfade und Kohorten-Einstellungen
+
+STAGES = ["extract", "solve", "search", "test-gen", "answer-key", "simulate", "grade", "ask", "pipeline", "serve", "ingest"]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="multi_agent", description="Local multi-agent tutor workflow")
+    parser.add_argument("stage", choices=STAGES, help="stage to run")
+    parser.add_argument("prompts", nargs="*", help="prompts for 'ask', PDF files/directories for 'ingest'")
+    parser.add_argument("--pdf", help="PDF path (default: $PDF_PATH)")
+    parser.add_argument("--answers-dir", help="answers directory (test id in the answer store, default store file inside it)")
+    parser.add_argument("--run-dir", help="directory for stage message histories")
+    parser.add_argument("--cohort-size", type=int, help="number of simulated students")
+    parser.add_argument("--concurrency", type=int, help="concurrent requests per model endpoint")
+    parser.add_argument("--seed", type=int, help="seed for the random mistake count")
+    parser.add_argument("--feedback", action="store_true", help="add LLM feedback to deterministic grades")
+    parser.add_argument("--stream", action="store_true", help="print agent tokens as they arrive (stages, pipeline and ask)")
+    parser.add_argument("--metrics", action="store_true", help="record local metrics (JSONL, optional Prometheus)")
+    parser.add_argument("--stats", action="store_true",
+                        help="print cache, scheduler, compaction, retry and metrics counters afterwards")
+    parser.add_argument("--warm", action="append", metavar="MODEL",
+                        help="load this Ollama model before the stage starts (repeatable, keep-alive $MODEL_KEEP_ALIVE)")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip a single stage if its checkpoint still matches (pipeline: default)")
+    parser.add_argument("--fresh", action="store_true", help="pipeline: recompute all stages, ignore checkpoints")
+    parser.add_argument("--rerun", action="append", metavar="STAGE", default=[],
+                        help="pipeline: recompute this stage (repeatable); dependents rerun only if it changed")
+    parser.add_argument("--host", help="serve: bind address (default: $SERVER_HOST or 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="serve: port (default: $SERVER_PORT or 8765)")
+    parser.add_argument("--workers", type=int,
+                        help="serve: requests processed at once (default: $SERVER_WORKERS); "
+                             "ingest: extraction processes (default: $PDF_INGEST_WORKERS or CPU count)")
+    parser.add_argument("--queue-size", type=int, help="serve: waiting requests before shedding with 503")
+    parser.add_argument("--model-limit", action="append", metavar="[MODEL=]N", default=[],
+                        help="serve: concurrent calls per model (N for all models, MODEL=N per model; "
+                             "default $MODEL_CONCURRENCY)")
+    parser.add_argument("--force", action="store_true", help="ingest: extract again even if the PDF is unchanged")
+    parser.add_argument("--logfire", action="store_true", help="send traces to Logfire")
+    return parser
+
+
+def run_ingest(args: argparse.Namespace) -> None:
+    from .pdf_ingest import PDF_INGEST_WORKERS, ingest
+    report = ingest(args.prompts or [str(Path(settings.PDF_PATH).parent)],
+                    workers=args.workers or PDF_INGEST_WORKERS, force=args.force)
+    print(report.summary())
+    if report.failed and not report.files and not report.skipped:
+        raise SystemExit(1)              # nichts eingelesen
+
+
+async def run_stage(args: argparse.Namespace) -> None:
+    from . import pipelines              # lädt PydanticAI erst, wenn eine Stufe es braucht
+    if args.warm:                        # Ladezeit vor die erste Anfrage ziehen
+        from .scheduler import model_scheduler
+        await model_scheduler.prewarm(args.warm)
+    if args.stage == "grade":
+        await pipelines.resume_stage("grade", force=not args.resume, feedback=args.feedback or None)
+    elif args.stage == "simulate":
+        cohort = await pipelines.resume_stage(
+            "simulate", force=not args.resume, cohort_size=args.cohort_size, concurrency=args.concurrency, seed=args.seed
+        )
+        for student in cohort.students:
+            print(f"[Student{student.student}] -> {student.answer_path} ({student.mistakes} mistakes)")
+        print(cohort.summary())
+    elif args.stage == "ask":
+        if not args.prompts:
+            raise SystemExit("ask needs at least one prompt")
+        ask = pipelines.ask(args.prompts, max_concurrency=args.concurrency or 8)
+        if args.stream:                  # mehrere Sitzungen: zeilenweise mit Sitzungs-/Agenten-Präfix
+            from .streaming import TokenStream, print_stream
+            await print_stream(TokenStream(ask), by_line=len(args.prompts) > 1)
+            return
+        for prompt, output in zip(args.prompts, await ask):
+            print(f"[{prompt}] ->", output)
+    elif args.stage == "serve":
+        from . import server
+        default = [v for v in args.model_limit if "=" not in v]
+        await server.serve(
+            host=args.host or server.SERVER_HOST, port=server.SERVER_PORT if args.port is None else args.port,
+            workers=args.workers or server.SERVER_WORKERS, queue_size=args.queue_size or server.SERVER_QUEUE_SIZE,
+            model_limit=int(default[-1]) if default else settings.MODEL_CONCURRENCY,
+            model_limits=server.parse_limits([v for v in args.model_limit if "=" in v]),
+        )
+    elif args.stage == "pipeline":
+        pipeline = pipelines.run_pipeline(resume=not args.fresh, rerun=args.rerun)
+        if args.stream:                  # Stufen überlappen → zeilenweise mit Stufen-/Agenten-Präfix
+            from .streaming import TokenStream, print_stream
+            await print_stream(TokenStream(pipeline), by_line=True)
+        else:
+            await pipeline
+        from .checkpoints import checkpoints
+        print(checkpoints.report())
+    else:                                # Checkpoint immer schreiben, mit --resume auch nutzen
+        stage = pipelines.resume_stage(args.stage, force=not args.resume)
+        if args.stream:                  # Antwort ist schon vollständig gestreamt
+            from .checkpoints import StageResult
+            from .streaming import TokenStream, print_stream
+            result = await print_stream(TokenStream(stage))
+            if isinstance(result, StageResult):   # aus dem Checkpoint: nichts gestreamt
+                print(result.output)
+        else:
+            print((await stage).output)
+
+
+def main(argv: list[str] = None) -> None:
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    if args.pdf:
+        settings.PDF_PATH = args.pdf
+    if args.answers_dir:
+        settings.ANSWERS_DIR = Path(args.answers_dir)
+    if args.run_dir:
+        settings.RUN_DIR = Path(args.run_dir)
+    if args.metrics:
+        from .observability import configure_metrics
+        configure_metrics()
+    if args.logfire:
+        from .observability import configure_logfire
+        configure_logfire()
+    if args.stage == "ingest":           # CPU-gebunden, ohne Event-Loop und ohne PydanticAI
+        return run_ingest(args)
+    from .history import history_savings
+    with history_savings(args.stage) as saved:   # Verlaufs-Ersparnis dieses Laufs (serve: je Anfrage eigene)
+        try:
+            asyncio.run(run_stage(args))
+        except KeyboardInterrupt:        # serve: mit Strg+C beenden
+            pass
+        except FileNotFoundError as e:   # fehlende Vorstufe verständlich melden
+            raise SystemExit(str(e))
+    if args.stats:
+        from .report import report
+        print(report())
+        print("history this run:", saved.report())
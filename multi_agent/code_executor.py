@@ -0,0 +1,244 @@
+"""Isolierte Ausführung von Python-Code in vorgestarteten Worker-Prozessen."""
+import atexit, json, os, queue, signal, subprocess, sys, threading, time  # Prozesse, Threads, Zeitmessung
+from dataclasses import dataclass        # Ergebnis-Container
+from typing import Optional              # Typ-Hinweise
+
+# Worker-Programm: setzt rlimits, wartet auf genau einen Job, meldet das Ergebnis über eine eigene Pipe
+_WORKER_SOURCE = r"""
+import json, os, sys, traceback
+try:
+    import resource
+except ImportError:
+    resource = None
+cpu_seconds, memory_bytes, result_fd = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])
+MAX_TRACEBACK = 8192                     # Anfang (Aufrufstelle) und Ende (Meldung) behalten
+
+
+def capped(text):
+    if len(text) <= MAX_TRACEBACK:
+        return text
+    half = MAX_TRACEBACK // 2
+    return f"{text[:half]}\n... ({len(text) - MAX_TRACEBACK} characters omitted) ...\n{text[-half:]}"
+
+
+result = os.fdopen(result_fd, "w")
+job = json.loads(sys.stdin.readline())
+if resource is not None:
+    # harte Grenze eine Sekunde später: sonst kommt SIGKILL statt SIGXCPU (→ nicht als timeout erkennbar)
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+status = {"ok": True}
+try:
+    exec(compile(job["code"], "<agent-code>", "exec"), {"__name__": "__main__"})
+except SystemExit as e:
+    if e.code not in (None, 0):
+        status = {"ok": False, "type": "SystemExit", "traceback": capped(f"SystemExit: {e.code}")}
+except BaseException as e:
+    status = {"ok": False, "type": type(e).__name__, "traceback": capped(traceback.format_exc())}
+sys.stdout.flush()
+sys.stderr.flush()
+result.write(json.dumps(status))
+result.close()
+"""
+
+# Fehler, die bei erneuter Ausführung desselben Codes wieder auftreten → nicht wiederholen
+DETERMINISTIC_STATUSES = {"error", "timeout", "memory", "output_limit"}
+
+
+@dataclass
+class ExecutionResult:
+    """Outcome of one sandboxed run."""
+    status: str                          # ok | error | timeout | memory | output_limit | crashed
+    stdout: str = ""
+    stderr: str = ""
+    error_type: Optional[str] = None
+    traceback: str = ""
+    seconds: float = 0.0
+    truncated: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    @property
+    def deterministic(self) -> bool:
+        """True if re-running the same code would fail the same way."""
+        return self.status in DETERMINISTIC_STATUSES
+
+    def format(self) -> str:
+        """Tool output in the format the examiner agent already expects."""
+        note = "\n(output truncated)" if self.truncated else ""
+        if self.ok:
+            return f"Tool output:\n{self.stdout if self.stdout else '(no output)'}{note}"
+        details = self.traceback or self.stderr or self.status
+        return (f"Execution failed ({self.status}).\nError:\n{details}"
+                f"\nOutput before failure:\n{self.stdout if self.stdout else '(no output)'}{note}")
+
+
+class _Worker:
+    """One pre-started interpreter waiting for a single job."""
+
+    def __init__(self, cpu_seconds: int, memory_bytes: int):
+        self.result_read, result_write = os.pipe()
+        self.proc = subprocess.Popen(
+            [sys.executable, "-I", "-c", _WORKER_SOURCE, str(cpu_seconds), str(memory_bytes), str(result_write)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            pass_fds=(result_write,),
+            start_new_session=True,      # eigene Prozessgruppe → Kindprozesse mit beenden
+        )
+        os.close(result_write)
+
+    def kill(self) -> None:
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def close(self) -> None:
+        """Kill the worker and release its pipes (status reader threads must be joined first)."""
+        self.kill()
+        self.proc.wait()
+        for stream in (self.proc.stdin, self.proc.stdout, self.proc.stderr):
+            stream.close()
+        if self.result_read is not None:
+            os.close(self.result_read)
+            self.result_read = None
+
+    def read_status(self, sink: list) -> None:
+        """Drain the status pipe into ``sink``; runs in a reader thread so a large status never blocks the worker."""
+        fd, self.result_read = self.result_read, None
+        with os.fdopen(fd, "rb") as f:
+            sink.append(f.read())
+
+
+class ExecutorPool:
+    """Pool of warm, single-use worker interpreters with time, memory and output limits."""
+
+    def __init__(self, size: int = 2, timeout: float = 10.0, cpu_seconds: int = 10,
+                 memory_mb: int = 512, max_output: int = 64 * 1024):
+        self.size = size
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self.max_output = max_output
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def _spawn(self) -> None:
+        self._idle.put(_Worker(self.cpu_seconds, self.memory_bytes))
+
+    def _ensure_started(self) -> None:
+        with self._lock:                 # Worker erst beim ersten Aufruf vorstarten
+            if not self._started:
+                for _ in range(self.size):
+                    self._spawn()
+                self._started = True
+
+    def start(self) -> None:
+        """Pre-start the workers now instead of on the first call (e.g. in a long-running server)."""
+        self._ensure_started()
+
+    def _acquire(self) -> _Worker:
+        self._ensure_started()
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            worker = _Worker(self.cpu_seconds, self.memory_bytes)  # Pool leer → direkt starten
+        else:
+            threading.Thread(target=self._spawn, daemon=True).start()  # Ersatz im Hintergrund vorwärmen
+        return worker
+
+    def _read_capped(self, stream, sink: list, state: dict, worker: _Worker) -> None:
+        """Read a worker stream in chunks, keep at most max_output bytes, kill on overflow."""
+        while chunk := stream.read1(4096):
+            with state["lock"]:          # stdout + stderr teilen sich ein Limit
+                room = self.max_output - state["bytes"]
+                if room > 0:
+                    sink.append(chunk[:room])
+                state["bytes"] += len(chunk)
+                if state["bytes"] > self.max_output and not state["truncated"]:
+                    state["truncated"] = True
+                    worker.kill()        # ungebremste Ausgabe stoppen
+
+    def run_once(self, code: str, timeout: Optional[float] = None) -> ExecutionResult:
+        """Execute code in one fresh worker and classify the outcome."""
+        worker = self._acquire()
+        start = time.perf_counter()
+        out, err, raw, state = [], [], [], {"bytes": 0, "truncated": False, "lock": threading.Lock()}
+        readers = [
+            threading.Thread(target=self._read_capped, args=(worker.proc.stdout, out, state, worker), daemon=True),
+            threading.Thread(target=self._read_capped, args=(worker.proc.stderr, err, state, worker), daemon=True),
+            threading.Thread(target=worker.read_status, args=(raw,), daemon=True),
+        ]
+        for t in readers:
+            t.start()
+        timed_out = False
+        try:
+            worker.proc.stdin.write((json.dumps({"code": code}) + "\n").encode())
+            worker.proc.stdin.close()
+            worker.proc.wait(timeout=timeout or self.timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+        except (BrokenPipeError, OSError) as e:   # Worker vor Jobannahme gestorben → transient
+            worker.kill()
+            for t in readers:
+                t.join()
+            worker.close()
+            return ExecutionResult("crashed", traceback=str(e), seconds=time.perf_counter() - start)
+        worker.kill()                    # auch nach normalem Ende: Restprozesse der Gruppe beenden
+        for t in readers:
+            t.join()
+        worker.close()
+        raw = b"".join(raw)
+        try:
+            status = json.loads(raw) if raw else None
+        except ValueError:               # abgeschnitten oder vom Agenten-Code überschrieben → wie abgestürzt
+            status = None
+
+        result = ExecutionResult(
+            "ok",
+            stdout=b"".join(out).decode(errors="replace"),
+            stderr=b"".join(err).decode(errors="replace"),
+            seconds=time.perf_counter() - start,
+            truncated=state["truncated"],
+        )
+        if timed_out:
+            result.status = "timeout"
+            result.traceback = f"Timed out after {timeout or self.timeout}s"
+        elif state["truncated"] and status is None:
+            result.status = "output_limit"
+            result.traceback = f"Output exceeded {self.max_output} bytes"
+        elif status is None:
+            # Kein Ergebnis: per Signal beendet (z. B. RLIMIT_CPU → SIGXCPU) oder abgestürzt
+            rc = worker.proc.returncode
+            result.status = "timeout" if rc == -signal.SIGXCPU else "crashed"
+            result.traceback = f"Worker exited with code {rc}" + (" (unreadable status)" if raw else "")
+        elif not status["ok"]:
+            result.status = "memory" if status["type"] == "MemoryError" else "error"
+            result.error_type = status["type"]
+            result.traceback = status["traceback"]
+        return result
+
+    def run(self, code: str, timeout: Optional[float] = None) -> ExecutionResult:
+        """Execute code; only transient failures (crashed workers) are retried, via the shared resilience policy."""
+        from .resilience import resilience
+        return resilience.call(
+            "executor", lambda: self.run_once(code, timeout),
+            transient_result=lambda r: None if r.ok or r.deterministic else f"exec_{r.status}",
+        )
+
+    def shutdown(self) -> None:
+        """Stop all idle workers."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+executor_pool = ExecutorPool(
+    size=int(os.environ.get("EXECUTOR_POOL_SIZE", 2)),
+    timeout=float(os.environ.get("EXECUTOR_TIMEOUT", 10)),
+)
@@ -0,0 +1,208 @@
+"""Gemeinsame Gesprächssitzung für mehrere Agenten: anhängen, per Referenz übergeben, gefiltert lesen.
+
+Bisher bekam jeder Agent den kompletten Verlauf des vorigen (``all_messages()``) – samt dessen
+Tool-Aufrufen – und jede Übergabe kopierte und serialisierte alles davor erneut. Hier hängt jeder
+Agent nur seine neuen Nachrichten an eine Sitzung an (eine JSONL-Zeile je Nachricht, markiert mit
+dem Agentennamen); weitergegeben wird nur die Sitzungs-ID. Jeder Agent liest eine eigene Sicht:
+Nutzer-Prompts und Antworttexte aller Agenten, Tool-Aufrufe/-Ergebnisse, System-Prompts und
+Instructions aber nur von sich selbst (oder von ausdrücklich geteilten Tools). Im Speicher liegt
+je Nachricht nur ein Index-Eintrag; Zeilen, die für eine Sicht nur Tool-Verkehr anderer Agenten
+sind, werden gar nicht erst gelesen.
+
+    CONVERSATION_DIR=runs/sessions   Ablage der Sitzungen (Standard: RUN_DIR/sessions)
+"""
+import json, os, threading, uuid         # Index-Zeilen, Umgebungsvariablen, Sperren, Sitzungs-IDs
+from dataclasses import dataclass, replace   # Index-Einträge, Nachrichten kopieren statt verändern
+from pathlib import Path                 # Pfad-Objekte
+from typing import Iterable, Optional    # Typ-Hinweise
+
+from pydantic_ai.messages import (
+    ModelMessage, ModelMessagesTypeAdapter, ModelRequest, RetryPromptPart, SystemPromptPart,
+    ThinkingPart, ToolCallPart, ToolReturnPart,
+)
+
+from . import settings                   # RUN_DIR (zur Laufzeit gelesen, per CLI änderbar)
+from .history import estimate_tokens     # Prompt-Größe der Sichten schätzen
+from .metrics import metrics             # Nachrichten, verworfene Teile, Tokens je Sicht
+
+CONVERSATION_DIR = os.environ.get("CONVERSATION_DIR")
+
+_TOOL_PARTS = (ToolCallPart, ToolReturnPart, RetryPromptPart)
+_PRIVATE_PARTS = (SystemPromptPart, ThinkingPart)   # gehören nur dem Agenten, der sie erzeugt hat
+
+
+@dataclass(frozen=True)
+class Entry:
+    """Index entry of one stored message (the message itself stays on disk)."""
+    agent: str
+    offset: int
+    length: int
+    chatter: bool                        # nur Tool-Verkehr/private Teile → für andere Agenten leer
+    tools: frozenset[str] = frozenset()  # Tool-Namen der Aufrufe/Ergebnisse
+
+
+def _tool_names(message: ModelMessage) -> frozenset[str]:
+    return frozenset(p.tool_name for p in message.parts if isinstance(p, _TOOL_PARTS) and p.tool_name)
+
+
+def _is_chatter(message: ModelMessage) -> bool:
+    return all(isinstance(p, _TOOL_PARTS + _PRIVATE_PARTS) for p in message.parts)
+
+
+def _foreign(message: ModelMessage, shared: frozenset[str]) -> Optional[ModelMessage]:
+    """Another agent's message as seen by this one: without its tool chatter, system prompts and instructions."""
+    parts = [p for p in message.parts
+             if not isinstance(p, _PRIVATE_PARTS)
+             and (not isinstance(p, _TOOL_PARTS) or p.tool_name in shared)]
+    if not parts:
+        return None
+    if isinstance(message, ModelRequest):
+        return replace(message, parts=parts, instructions=None)   # sonst gälten fremde Instructions weiter
+    return replace(message, parts=parts)
+
+
+class Session:
+    """Append-only message log shared by several agents; pass ``session.id`` to hand it over."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.id = path.stem
+        self._entries: list[Entry] = []
+        self._lock = threading.Lock()
+        self.views = self.dropped = 0
+        if path.exists():
+            self._load_index()
+
+    def _load_index(self) -> None:
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                record = json.loads(line)
+                self._entries.append(Entry(record["agent"], offset, len(line), record["chatter"],
+                                           frozenset(record.get("tools", ()))))
+                offset += len(line)
+
+    # ---------- Schreiben ----------
+    def append(self, agent: str, messages: Iterable[ModelMessage]) -> int:
+        """Append an agent's new messages; returns how many were stored."""
+        lines = []
+        for message in messages:
+            tools = _tool_names(message)
+            record = {"agent": agent, "chatter": _is_chatter(message), "tools": sorted(tools),
+                      "message": ModelMessagesTypeAdapter.dump_python([message], mode="json", exclude_none=True)[0]}
+            line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+            lines.append((line, record["chatter"], tools))
+        if not lines:
+            return 0
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(b"".join(line for line, _, _ in lines))
+            for line, chatter, tools in lines:
+                self._entries.append(Entry(agent, offset, len(line), chatter, tools))
+                offset += len(line)
+        metrics.inc("conversation_messages_total", len(lines), agent=agent)
+        return len(lines)
+
+    # ---------- Lesen ----------
+    def _read(self, entries: list[Entry]) -> list[ModelMessage]:
+        if not entries:
+            return []
+        with open(self.path, "rb") as f:
+            lines = []
+            for entry in entries:
+                f.seek(entry.offset)
+                lines.append(f.read(entry.length))
+        return ModelMessagesTypeAdapter.validate_python([json.loads(line)["message"] for line in lines])
+
+    def messages(self) -> list[ModelMessage]:
+        """The complete log, including every agent's tool calls."""
+        with self._lock:
+            entries = list(self._entries)
+        return self._read(entries)
+
+    def view(self, agent: str, share_tools: Iterable[str] = ()) -> list[ModelMessage]:
+        """Message history for ``agent``: its own messages in full, other agents' without their tool chatter.
+
+        Tool calls and results of tools in ``share_tools`` stay visible to everyone (e.g. a lookup
+        whose result later agents need).
+        """
+        shared = frozenset(share_tools)
+        with self._lock:
+            entries = [e for e in self._entries
+                       if e.agent == agent or not e.chatter or (e.tools & shared)]   # reine Fremd-Tool-Zeilen nicht lesen
+            skipped = len(self._entries) - len(entries)
+        view = []
+        for entry, message in zip(entries, self._read(entries)):
+            if entry.agent != agent:
+                message = _foreign(message, shared)
+            if message is not None:
+                view.append(message)
+            else:
+                skipped += 1
+        self.views += 1
+        self.dropped += skipped
+        metrics.inc("conversation_dropped_messages_total", skipped, agent=agent)
+        metrics.event("conversation_view", session=self.id, agent=agent, messages=len(view), dropped=skipped,
+                      tokens=estimate_tokens(view))
+        return view
+
+    # ---------- Agenten ausführen ----------
+    async def run(self, agent, prompt: str, name: Optional[str] = None, share_tools: Iterable[str] = (), **kwargs):
+        """Run ``agent`` on its view of the session and append what it added."""
+        name = self._name(agent, name)
+        result = await agent.run(prompt, message_history=self.view(name, share_tools), **kwargs)
+        self.append(name, result.new_messages())
+        return result
+
+    def run_sync(self, agent, prompt: str, name: Optional[str] = None, share_tools: Iterable[str] = (), **kwargs):
+        name = self._name(agent, name)
+        result = agent.run_sync(prompt, message_history=self.view(name, share_tools), **kwargs)
+        self.append(name, result.new_messages())
+        return result
+
+    @staticmethod
+    def _name(agent, name: Optional[str]) -> str:
+        name = name or agent.name
+        if not name:
+            raise ValueError("agent needs a name (Agent(name=...) or name=...) to get its own view")
+        return name
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"session": self.id, "messages": len(self._entries),
+                    "bytes": sum(e.length for e in self._entries), "views": self.views, "dropped": self.dropped}
+
+
+class ConversationStore:
+    """Sessions by id, one JSONL file each; reopening an id continues its log."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self._directory = Path(directory) if directory else None
+        self._sessions: dict[str, Session] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        if self._directory is not None:
+            return self._directory
+        return Path(CONVERSATION_DIR) if CONVERSATION_DIR else settings.RUN_DIR / "sessions"
+
+    def session(self, session_id: Optional[str] = None) -> Session:
+        """Open (or create) a session; without an id a new one is started."""
+        session_id = session_id or uuid.uuid4().hex[:12]
+        if not session_id.replace("-", "").replace("_", "").isalnum():
+            raise ValueError(f"invalid session id {session_id!r}")
+        with self._lock:
+            if session_id not in self._sessions:
+                self._sessions[session_id] = Session(self.directory / f"{session_id}.jsonl")
+            return self._sessions[session_id]
+
+    def close(self, session_id: str) -> None:
+        """Forget a session's index (the log stays on disk and can be reopened)."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+conversation_store = ConversationStore()   # gemeinsame Ablage (siehe $CONVERSATION_DIR)
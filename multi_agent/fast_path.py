@@ -0,0 +1,97 @@
+"""Schneller Weg für ``coder_tool``: Code-Blöcke direkt ausführen statt den Prüfer-Agenten zu fragen.
+
+Der Coder liefert seine Lösung fast immer als ```python-Block. Diese Blöcke werden direkt im
+Executor-Pool ausgeführt; nur wenn es nichts Eindeutiges auszuführen gibt, die Ausführung
+scheitert oder die Ausgabe beurteilt werden muss (leer, abgeschnitten), läuft wie bisher
+``code_executer_agent`` (qwen3:14b). Wie oft welcher Weg genommen wird, zeigt ``stats()``.
+
+    CODER_FAST_PATH=0   immer den Prüfer-Agenten fragen
+"""
+import os, re, threading                 # Umgebungsvariablen, Code-Blöcke, Zähler-Sperre
+from collections import Counter          # Gründe für den langsamen Weg
+from typing import Optional              # Typ-Hinweise
+
+from .code_executor import ExecutionResult, executor_pool   # isolierte Ausführung
+from .metrics import metrics             # Zähler je Weg
+from .resilience import CircuitOpenError   # Executor ausgefallen → Prüfer-Agent meldet es
+
+CODER_FAST_PATH = os.environ.get("CODER_FAST_PATH", "1") != "0"
+
+_FENCE = re.compile(r"```[ \t]*([\w+-]*)[^\n]*\n(.*?)```", re.S)
+_PYTHON_TAGS = {"", "python", "py", "python3"}   # ohne Sprachangabe: als Python versuchen
+_NOT_RUNNABLE = re.compile(r"^\s*(>>>|\$ )|\binput\s*\(", re.M)   # REPL-Beispiele, Shell, Eingaben
+
+
+def extract_code_blocks(text: str) -> list[str]:
+    """Python code of all fenced blocks, in order (blocks tagged with other languages are skipped)."""
+    return [code for tag, code in _FENCE.findall(text) if tag.lower() in _PYTHON_TAGS and code.strip()]
+
+
+class CoderFastPath:
+    """Decides per coder answer whether direct execution is enough and counts the outcome."""
+
+    def __init__(self, enabled: bool = CODER_FAST_PATH):
+        self.enabled = enabled
+        self.taken = 0
+        self.fallbacks: Counter = Counter()   # Grund → Anzahl
+        self._lock = threading.Lock()
+
+    def code(self, coder_output: str) -> Optional[str]:
+        """Script to run, or None if the answer has no unambiguous Python code (reason is counted)."""
+        if not self.enabled:
+            return self._fallback("disabled")
+        blocks = extract_code_blocks(coder_output)
+        if not blocks:
+            return self._fallback("no_code")
+        code = "\n\n".join(blocks)       # spätere Blöcke bauen meist auf früheren auf
+        if _NOT_RUNNABLE.search(code):
+            return self._fallback("not_runnable")
+        return code
+
+    def judge(self, result: ExecutionResult) -> bool:
+        """True if the output is final (counted as fast path), False if the examiner has to look at it."""
+        if not result.ok:
+            reason = f"exec_{result.status}"
+        elif not result.stdout.strip():
+            reason = "no_output"         # z. B. nur Funktionsdefinition ohne Aufruf
+        elif result.truncated:
+            reason = "truncated"
+        else:
+            with self._lock:
+                self.taken += 1
+            metrics.inc("coder_fast_path_total", outcome="taken")
+            return True
+        self._fallback(reason)
+        return False
+
+    def _fallback(self, reason: str) -> None:
+        with self._lock:
+            self.fallbacks[reason] += 1
+        metrics.inc("coder_fast_path_total", outcome="fallback", reason=reason)
+        return None
+
+    def run(self, coder_output: str) -> Optional[ExecutionResult]:
+        """Execute the coder's code directly; None means: ask the examiner agent."""
+        code = self.code(coder_output)
+        if code is None:
+            return None
+        try:
+            result = executor_pool.run(code)   # wie python_code_executer: nur transiente Fehler wiederholen
+        except CircuitOpenError:
+            return self._fallback("executor_unavailable")
+        return result if self.judge(result) else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            fallbacks = sum(self.fallbacks.values())
+            total = self.taken + fallbacks
+            return {"taken": self.taken, "fallbacks": dict(self.fallbacks),
+                    "rate": self.taken / total if total else 0.0}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.taken = 0
+            self.fallbacks.clear()
+
+
+coder_fast_path = CoderFastPath()        # gemeinsame Zähler (siehe $CODER_FAST_PATH)
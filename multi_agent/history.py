@@ -0,0 +1,175 @@
+"""Token-Budget für Nachrichtenverläufe zwischen Agentenläufen (History-Processor)."""
+import hashlib, os, threading             # Hashing, Umgebungsvariablen, Sperren
+from contextlib import contextmanager    # Ersparnis je Lauf erfassen
+from contextvars import ContextVar       # Lauf der aktuellen Anfrage (auch in Tool-Threads)
+from dataclasses import dataclass, field, replace   # Lauf-Zähler, Nachrichten kopieren statt verändern
+from typing import Optional              # Typ-Hinweise
+
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, ToolReturnPart
+
+from .metrics import current_agent, metrics   # Ersparnis je Modellaufruf und Agent
+
+HISTORY_TOKEN_BUDGET = int(os.environ.get("HISTORY_TOKEN_BUDGET", 4000))
+CHARS_PER_TOKEN = 4                      # grobe Schätzung ohne Tokenizer (lokale Modelle variieren)
+
+
+def estimate_tokens(messages: list[ModelMessage]) -> int:
+    """Rough prompt-token estimate of a message list."""
+    chars = 0
+    for message in messages:
+        for part in message.parts:
+            content = getattr(part, "content", None)
+            if content is None and hasattr(part, "args"):
+                content = part.args       # Tool-Aufrufe: Argumente zählen
+            chars += len(content if isinstance(content, str) else str(content))
+    return chars // CHARS_PER_TOKEN
+
+
+def _summary(text: str, chars: int) -> str:
+    return text if len(text) <= chars else f"{text[:chars]} … [{len(text) - chars} chars omitted]"
+
+
+@dataclass
+class HistorySavings:
+    """Prompt tokens before and after compaction within one run (pipeline, stage or server request)."""
+    label: str
+    calls: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, before: int, after: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.tokens_before += before
+            self.tokens_after += after
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after, "tokens_saved": self.tokens_saved}
+
+    def report(self) -> str:
+        return (f"{self.label}: {self.calls} calls, {self.tokens_before} -> {self.tokens_after} tokens, "
+                f"saved {self.tokens_saved} (estimate, {CHARS_PER_TOKEN} chars/token)")
+
+
+_savings: ContextVar[Optional[HistorySavings]] = ContextVar("history_savings", default=None)
+
+
+@contextmanager
+def history_savings(label: str, separate: bool = False):
+    """Count the compaction of all model calls inside this block as one run.
+
+    Nested blocks keep the outer run unless ``separate`` (e.g. one run per server request).
+    """
+    if _savings.get() is not None and not separate:
+        yield _savings.get()
+        return
+    savings = HistorySavings(label)
+    token = _savings.set(savings)
+    try:
+        yield savings
+    finally:
+        _savings.reset(token)
+        if savings.calls:
+            metrics.event("history_savings", scope=label, **savings.stats())
+
+
+class HistoryCompactor:
+    """History processor that keeps the message history within a token budget.
+
+    Duplicate tool returns (e.g. the same PDF text twice) are replaced by a short
+    reference, older tool returns and long answers are collapsed into summaries,
+    and the most recent messages are always kept verbatim. The number of messages
+    is never changed, so tool calls and returns stay paired.
+    """
+
+    def __init__(self, max_tokens: int = HISTORY_TOKEN_BUDGET, keep_recent: int = 4, summary_chars: int = 300):
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.summary_chars = summary_chars
+        self.calls = self.compacted = 0  # Modellaufrufe, davon gekürzt (laufende Summen: begrenzter Speicher im Server)
+        self.tokens_before = self.tokens_after = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, messages: list[ModelMessage]) -> list[ModelMessage]:
+        before = estimate_tokens(messages)
+        compacted = self._dedupe(messages)
+        if estimate_tokens(compacted) > self.max_tokens:
+            compacted = self._collapse_old(compacted)
+        after = estimate_tokens(compacted)
+        with self._lock:
+            self.calls += 1
+            self.compacted += after < before
+            self.tokens_before += before
+            self.tokens_after += after
+        metrics.observe("history_tokens_saved", before - after, agent=current_agent())
+        if (savings := _savings.get()) is not None:
+            savings.add(before, after)
+        return compacted
+
+    def _dedupe(self, messages: list[ModelMessage]) -> list[ModelMessage]:
+        """Keep only the latest copy of identical tool returns."""
+        seen: set[str] = set()
+        result = list(messages)
+        for i in range(len(result) - 1, -1, -1):         # von hinten: neueste Kopie bleibt
+            message = result[i]
+            if not isinstance(message, ModelRequest):
+                continue
+            parts, changed = [], False
+            for part in message.parts:
+                if isinstance(part, ToolReturnPart):
+                    text = part.model_response_str()
+                    digest = hashlib.sha1(text.encode()).hexdigest()
+                    if digest in seen and len(text) > self.summary_chars:
+                        part = replace(part, content=f"[same {part.tool_name} result as later in this conversation]")
+                        changed = True
+                    seen.add(digest)
+                parts.append(part)
+            if changed:
+                result[i] = replace(message, parts=parts)
+        return result
+
+    def _collapse_old(self, messages: list[ModelMessage]) -> list[ModelMessage]:
+        """Summarize tool returns and long texts outside the recent window."""
+        cutoff = max(0, len(messages) - self.keep_recent)
+        result = list(messages)
+        for i in range(cutoff):
+            message = result[i]
+            parts = []
+            for part in message.parts:
+                if isinstance(part, ToolReturnPart):
+                    part = replace(part, content=_summary(part.model_response_str(), self.summary_chars))
+                elif isinstance(part, TextPart) and isinstance(message, ModelResponse):
+                    part = replace(part, content=_summary(part.content, self.summary_chars))
+                parts.append(part)
+            result[i] = replace(message, parts=parts)
+            if estimate_tokens(result) <= self.max_tokens:
+                break                    # Budget erreicht → jüngere Nachrichten unverändert lassen
+        return result
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "compacted": self.compacted, "tokens_before": self.tokens_before,
+                    "tokens_after": self.tokens_after, "tokens_saved": self.tokens_before - self.tokens_after}
+
+    def report(self) -> str:
+        """Estimated prompt tokens saved over all model calls so far."""
+        s = self.stats()
+        return (f"{s['calls']} calls ({s['compacted']} compacted): {s['tokens_before']} -> {s['tokens_after']} tokens, "
+                f"saved {s['tokens_saved']} (estimate, {CHARS_PER_TOKEN} chars/token)")
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = self.compacted = self.tokens_before = self.tokens_after = 0
+
+
+history_compactor = HistoryCompactor()   # gemeinsam für alle Agenten mit Verlaufsweitergabe
@@ -0,0 +1,198 @@
+"""Persistenter Antwort-Cache für deterministische Modelle (temperature=0)."""
+import asyncio, hashlib, json, os, sqlite3, threading, time  # Threads, Hashing, Serialisierung, SQLite
+from contextlib import asynccontextmanager   # request_stream als Kontextmanager
+from dataclasses import dataclass        # gespeicherte Antwort als Stream
+from datetime import datetime            # Zeitstempel des Streams
+from pathlib import Path                 # Pfad-Objekte
+from typing import AsyncIterator, Optional   # Typ-Hinweise
+
+from pydantic_ai.messages import (
+    ModelMessage, ModelMessagesTypeAdapter, ModelResponse, ModelResponseStreamEvent, TextPart, ThinkingPart,
+    ToolCallPart,
+)
+from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+from pydantic_core import to_jsonable_python
+
+CACHE_PATH = Path(os.environ.get("LLM_CACHE_PATH", "~/.cache/llm_cache.sqlite")).expanduser()
+CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+CACHE_ENABLED = os.environ.get("LLM_CACHE", "1") != "0"   # LLM_CACHE=0 schaltet den Cache ab
+
+# Felder, die sich zwischen identischen Läufen ändern und nicht in den Schlüssel gehören
+_VOLATILE_KEYS = {"timestamp", "tool_call_id", "provider_response_id", "vendor_id", "usage",
+                  "provider_details", "vendor_details"}
+
+
+def _strip_volatile(value):
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in _VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def cache_key(model_name: str, settings: ModelSettings, messages: list[ModelMessage],
+              params: ModelRequestParameters) -> str:
+    """Hash of model name, settings, serialized messages and tool definitions."""
+    payload = {
+        "model": model_name,
+        "settings": to_jsonable_python(settings, fallback=str),
+        "messages": _strip_volatile(ModelMessagesTypeAdapter.dump_python(messages, mode="json")),
+        "params": to_jsonable_python(params, fallback=str),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response store with LRU eviction and hit/miss counters."""
+
+    def __init__(self, path: Path = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.bypassed = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:             # Datei erst beim ersten Zugriff öffnen
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        return self._db
+
+    def get(self, key: str) -> Optional[ModelResponse]:
+        with self._lock:
+            row = self.db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return ModelMessagesTypeAdapter.validate_json(row[0])[0]
+
+    def put(self, key: str, response: ModelResponse) -> None:
+        value = ModelMessagesTypeAdapter.dump_json([response])
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Am längsten ungenutzte Einträge löschen, bis das Limit wieder eingehalten wird
+        for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        """Hit/miss/bypass counters of this process."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "bypassed": self.bypassed,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def clear(self) -> None:
+        with self._lock:
+            self.db.execute("DELETE FROM responses")
+
+
+llm_cache = LLMCache()                   # gemeinsamer Standard-Cache
+
+
+@dataclass
+class CachedStreamedResponse(StreamedResponse):
+    """A stored response replayed as a stream (one event per part: text arrives as one chunk)."""
+    _response: ModelResponse
+
+    def __post_init__(self):
+        self._usage = self._response.usage
+
+    async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        for i, part in enumerate(self._response.parts):
+            if isinstance(part, TextPart):
+                event = self._parts_manager.handle_text_delta(vendor_part_id=i, content=part.content)
+            elif isinstance(part, ThinkingPart):
+                event = self._parts_manager.handle_thinking_delta(
+                    vendor_part_id=i, content=part.content, signature=part.signature)
+            elif isinstance(part, ToolCallPart):
+                event = self._parts_manager.handle_tool_call_part(
+                    vendor_part_id=i, tool_name=part.tool_name, args=part.args, tool_call_id=part.tool_call_id)
+            else:                        # andere Teile erzeugen die lokalen Modelle nicht
+                continue
+            if event is not None:
+                yield event
+
+    @property
+    def model_name(self) -> str:
+        return self._response.model_name or ""
+
+    @property
+    def provider_name(self) -> Optional[str]:
+        return self._response.provider_name
+
+    @property
+    def timestamp(self) -> datetime:
+        return self._response.timestamp
+
+
+class CachingModel(WrapperModel):
+    """Model wrapper that replays stored responses for temperature-0 requests."""
+
+    def __init__(self, wrapped: Model, cache: Optional[LLMCache] = None, enabled: bool = CACHE_ENABLED):
+        super().__init__(wrapped)
+        self.cache = cache or llm_cache
+        self.enabled = enabled
+
+    def is_deterministic(self, settings: ModelSettings) -> bool:
+        """Only requests with temperature 0 are safe to replay."""
+        return settings.get("temperature") == 0.0
+
+    def _key(self, messages: list[ModelMessage], model_settings: Optional[ModelSettings],
+             model_request_parameters: ModelRequestParameters) -> Optional[str]:
+        """Cache key of a request, or None (counted as bypassed) if it must not be replayed."""
+        settings: ModelSettings = {**(self.settings or {}), **(model_settings or {})}
+        if not (self.enabled and self.is_deterministic(settings)):
+            self.cache.bypassed += 1     # Temperatur pro Aufruf überschrieben
+            return None
+        return cache_key(self.model_name, settings, messages, model_request_parameters)
+
+    async def request(self, messages: list[ModelMessage], model_settings: Optional[ModelSettings],
+                      model_request_parameters: ModelRequestParameters) -> ModelResponse:
+        key = self._key(messages, model_settings, model_request_parameters)
+        if key is None:
+            return await self.wrapped.request(messages, model_settings, model_request_parameters)
+        cached = await asyncio.to_thread(self.cache.get, key)   # SQLite blockiert sonst die Event-Loop
+        if cached is not None:
+            return cached
+        response = await self.wrapped.request(messages, model_settings, model_request_parameters)
+        await asyncio.to_thread(self.cache.put, key, response)
+        return response
+
+    @asynccontextmanager
+    async def request_stream(self, messages: list[ModelMessage], model_settings: Optional[ModelSettings],
+                             model_request_parameters: ModelRequestParameters,
+                             run_context=None) -> AsyncIterator[StreamedResponse]:
+        """Same cache for streamed calls: hits are replayed as a stream, completed streams are stored."""
+        key = self._key(messages, model_settings, model_request_parameters)
+        cached = None if key is None else await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            yield CachedStreamedResponse(model_request_parameters, cached)
+            return
+        async with self.wrapped.request_stream(
+            messages, model_settings, model_request_parameters, run_context
+        ) as stream:
+            yield stream
+        if key is not None:              # der Agent liest den Stream vor dem Verlassen immer zu Ende
+            await asyncio.to_thread(self.cache.put, key, stream.get())
@@ -0,0 +1,108 @@
+"""Deterministische MCQ-Bewertung: Antwortbögen parsen und Kohorte vektorisiert benoten."""
+import os, re                            # Dateisystem, reguläre Ausdrücke
+from dataclasses import dataclass, field  # Ergebnis-Container
+from functools import lru_cache          # Musterlösung nur einmal parsen
+from pathlib import Path                 # Pfad-Objekte
+from typing import Optional              # Typ-Hinweise
+
+# "1. B", "Q2) c", "Question 3: (A) ...", "**4.** D", "5. Answer: C" → (Frage, Buchstabe);
+# ohne "Answer" nur, wenn nach dem Buchstaben Zeilenende oder ")", ".", ":" folgt –
+# "4. A for loop repeats ..." ist ein Fragestamm, keine Antwort
+_INLINE = re.compile(
+    r"^\s*(?:Q(?:uestion)?\s*)?(\d{1,3})\s*[.):\-]\s*"
+    r"(?:(?:Correct\s+)?Answer\s*[:\-]?\s*\(?([A-E])\b(?![\w'])|\(?([A-E])(?:\s*$|[).:]))",
+    re.IGNORECASE,
+)
+_HEADING = re.compile(r"^\s*(?:Q(?:uestion)?\s*(\d{1,3})\b|(\d{1,3})\s*[.):])", re.IGNORECASE)   # "Question 3", "Q3", "3."
+_ANSWER = re.compile(r"^\s*(?:Correct\s+)?Answer\s*[:\-]\s*\(?([A-E])\b", re.IGNORECASE)
+_LETTERS = "ABCDE"
+
+
+def parse_answer_sheet(text: str) -> dict[int, str]:
+    """Parse an answer sheet into {question number: option letter}."""
+    answers: dict[int, str] = {}
+    current = None                       # zuletzt gesehene Fragenummer (für "Answer: X"-Zeilen)
+    for line in text.replace("*", "").splitlines():
+        m = _INLINE.match(line)
+        if m:
+            current = int(m.group(1))    # eine folgende "Answer: X"-Zeile hat Vorrang
+            answers[current] = (m.group(2) or m.group(3)).upper()
+            continue
+        m = _HEADING.match(line)
+        if m:
+            current = int(m.group(1) or m.group(2))
+            continue
+        m = _ANSWER.match(line)
+        if m and current is not None:
+            answers[current] = m.group(1).upper()
+            current = None
+    return answers
+
+
+@lru_cache(maxsize=32)
+def _parse_file(path: str, mtime_ns: int) -> dict[int, str]:
+    return parse_answer_sheet(Path(path).read_text(encoding="utf-8"))
+
+
+def load_answer_sheet(path: str) -> dict[int, str]:
+    """Parse an answer file once per version (cached by path and mtime)."""
+    return _parse_file(str(path), os.stat(path).st_mtime_ns)
+
+
+@dataclass
+class GradeResult:
+    """Mark and per-question mistakes of one student."""
+    student: str
+    mark: int
+    total: int
+    mistakes: list[tuple[int, Optional[str], str]] = field(default_factory=list)  # (Frage, gegeben, korrekt)
+
+    def report(self) -> str:
+        """Human-readable mark and mistake list."""
+        lines = [f"{self.student}: {self.mark}/{self.total}"]
+        for question, given, expected in self.mistakes:
+            lines.append(f"  Q{question}: answered {given or '-'}, correct {expected}")
+        return "\n".join(lines)
+
+
+def grade_cohort(model_answers: dict[int, str], students: dict[str, dict[int, str]]) -> list[GradeResult]:
+    """Grade all students in one vectorized comparison (students × questions matrix)."""
+    import numpy as np                   # erst bei Bedarf laden
+
+    questions = sorted(model_answers)
+    names = list(students)
+    # Buchstaben als Codes 1..5, 0 = keine Antwort
+    key = np.array([_LETTERS.index(model_answers[q]) + 1 for q in questions], dtype=np.int8)
+    sheet = np.zeros((len(names), len(questions)), dtype=np.int8)
+    for row, name in enumerate(names):
+        answers = students[name]
+        for col, q in enumerate(questions):
+            if q in answers:
+                sheet[row, col] = _LETTERS.index(answers[q]) + 1
+
+    correct = sheet == key               # Vergleichsmatrix in einem Schritt
+    marks = correct.sum(axis=1)
+    results = []
+    for row, name in enumerate(names):
+        wrong = np.flatnonzero(~correct[row])
+        mistakes = [
+            (questions[c], _LETTERS[sheet[row, c] - 1] if sheet[row, c] else None, model_answers[questions[c]])
+            for c in wrong
+        ]
+        results.append(GradeResult(name, int(marks[row]), len(questions), mistakes))
+    return results
+
+
+def grade_files(model_answers_path: str, student_paths: list[str]) -> list[GradeResult]:
+    """Grade StudentN.txt files against model_answers.txt without any LLM call."""
+    model_answers = load_answer_sheet(model_answers_path)
+    students = {Path(p).stem: parse_answer_sheet(Path(p).read_text(encoding="utf-8")) for p in student_paths}
+    return grade_cohort(model_answers, students)
+
+
+def feedback_prompt(result: GradeResult) -> str:
+    """Prompt for an optional LLM step that only phrases feedback for a fixed grade."""
+    return (
+        "Write short, encouraging feedback for the student. Do not change the mark.\n"
+        f"{result.report()}"
+    )
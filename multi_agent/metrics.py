@@ -0,0 +1,337 @@
+"""Lokale Metriken statt Logfire-Vollmitschnitt: Latenz-Histogramme, Tokens, Retries, Time-to-first-token.
+
+Agent- und Tool-Läufe kommen über PydanticAIs OpenTelemetry-Instrumentierung mit einem lokalen
+Tracer (ohne SDK, ohne Export ins Netz), Modellaufrufe über ``MetricsModel`` in der Registry.
+Export als Prometheus-Text (``/metrics``) und/oder rotierende JSONL-Datei.
+"""
+import bisect, json, logging, logging.handlers, random, threading, time  # Histogramme, Export, Sperren
+from collections import defaultdict      # Zähler je Label-Kombination
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Optional  # Typ-Hinweise
+
+from opentelemetry import trace
+from opentelemetry.trace import INVALID_SPAN_CONTEXT, Span, StatusCode, Tracer, TracerProvider
+from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter, ModelResponse
+from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)  # Sekunden
+_RECORDED_SPANS = {"agent run", "running tool"}   # übrige PydanticAI-Spans kosten nichts (nicht aufzeichnend)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)   # letzter Bucket = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound below which a fraction q of the observations fall."""
+        target, seen = q * self.count, 0
+        for bound, n in zip((*BUCKETS, float("inf")), self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """Thread-safe in-process metrics with Prometheus text and JSONL event export."""
+
+    def __init__(self):
+        self.enabled = False             # aus = MetricsModel reicht nur durch
+        self.body_sample = 0.0           # Anteil der Modellaufrufe mit Body-Mitschnitt
+        self.body_max_bytes = 2048       # Obergrenze je mitgeschnittenem Body
+        self.histograms: dict[tuple, Histogram] = defaultdict(Histogram)
+        self.counters: dict[tuple, float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._events: Optional[logging.Logger] = None
+        self._server = None
+
+    # ---------- Erfassung ----------
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self.histograms[(name, tuple(sorted(labels.items())))].observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        if value:
+            with self._lock:
+                self.counters[(name, tuple(sorted(labels.items())))] += value
+
+    def event(self, kind: str, **fields) -> None:
+        """Append one JSON line to the event log (if a JSONL file is configured)."""
+        if self._events is not None:
+            self._events.info(json.dumps({"ts": time.time(), "type": kind, **fields}, default=str))
+
+    def record_model(self, model: str, agent: str, seconds: float, response: Optional[ModelResponse] = None,
+                     ttft: Optional[float] = None, error: Optional[str] = None) -> None:
+        self.observe("model_request_seconds", seconds, agent=agent, model=model)
+        if ttft is not None:
+            self.observe("model_ttft_seconds", ttft, agent=agent, model=model)
+        if error:
+            self.inc("model_errors_total", agent=agent, model=model, error=error)
+        usage = response.usage if response is not None else None
+        if usage is not None:
+            self.inc("model_tokens_total", usage.input_tokens, model=model, kind="input")
+            self.inc("model_tokens_total", usage.output_tokens, model=model, kind="output")
+        self.event("model_request", model=model, agent=agent, seconds=seconds, ttft=ttft, error=error,
+                   input_tokens=usage and usage.input_tokens, output_tokens=usage and usage.output_tokens)
+
+    def record_span(self, span: "_LocalSpan", seconds: float) -> None:
+        agent = span.agent or "unknown"
+        status = "error" if span.error else "ok"
+        if span.name == "agent run":
+            input_tokens = span.attributes.get("gen_ai.usage.input_tokens", 0)
+            output_tokens = span.attributes.get("gen_ai.usage.output_tokens", 0)
+            self.observe("agent_run_seconds", seconds, agent=agent)
+            self.inc("agent_runs_total", agent=agent, status=status)
+            self.inc("agent_tokens_total", input_tokens, agent=agent, kind="input")
+            self.inc("agent_tokens_total", output_tokens, agent=agent, kind="output")
+            self.event("agent_run", agent=agent, seconds=seconds, error=span.error,
+                       input_tokens=input_tokens, output_tokens=output_tokens)
+        else:
+            tool = span.attributes.get("gen_ai.tool.name", "unknown")
+            self.observe("tool_call_seconds", seconds, agent=agent, tool=tool)
+            if span.error == "ToolRetryError":   # ModelRetry/Validierungsfehler → Modell versucht es erneut
+                self.inc("tool_retries_total", agent=agent, tool=tool)
+            elif span.error:
+                self.inc("tool_errors_total", agent=agent, tool=tool, error=span.error)
+            self.event("tool_call", agent=agent, tool=tool, seconds=seconds, error=span.error)
+
+    def capture_body(self, model: str, agent: str, messages: list[ModelMessage],
+                     response: Optional[ModelResponse]) -> None:
+        """Log a sampled, size-capped copy of request and response."""
+        if self._events is None or random.random() >= self.body_sample:
+            return
+        cap = self.body_max_bytes
+        request = ModelMessagesTypeAdapter.dump_json(messages)
+        reply = ModelMessagesTypeAdapter.dump_json([response]) if response is not None else b""
+        self.event("body", model=model, agent=agent, request_bytes=len(request), response_bytes=len(reply),
+                   request=request[-cap:].decode(errors="ignore"),     # Ende = neueste Nachrichten
+                   response=reply[:cap].decode(errors="ignore"))
+
+    # ---------- Export ----------
+    def open_jsonl(self, path: str, max_bytes: int = 10 * 1024 * 1024, backups: int = 3) -> None:
+        """Write events to a size-rotated JSONL file."""
+        from pathlib import Path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        logger = logging.getLogger("multi_agent.metrics")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False         # nicht in die normale Log-Ausgabe
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                       encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.handlers = [handler]
+        self._events = logger
+
+    def prometheus(self) -> str:
+        """Current metrics in the Prometheus text exposition format."""
+        def fmt(labels, extra=()):
+            items = [*labels, *extra]
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}" if items else ""
+
+        lines = []
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+        for name in sorted({n for (n, _), _ in histograms}):
+            lines.append(f"# TYPE multi_agent_{name} histogram")
+            for (n, labels), h in histograms:
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip((*BUCKETS, "+Inf"), h.counts):
+                    cumulative += count
+                    lines.append(f"multi_agent_{name}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"multi_agent_{name}_sum{fmt(labels)} {h.sum}")
+                lines.append(f"multi_agent_{name}_count{fmt(labels)} {h.count}")
+        for name in sorted({n for (n, _), _ in counters}):
+            lines.append(f"# TYPE multi_agent_{name} counter")
+            lines += [f"multi_agent_{name}{fmt(labels)} {v}" for (n, labels), v in counters if n == name]
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """Serve /metrics for Prometheus in a background thread."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.prometheus().encode()
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("content-type", "text/plain; version=0.0.4")
+                self.send_header("content-length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def report(self) -> str:
+        """Short text summary (p50/p95 are bucket upper bounds)."""
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            counters = dict(self.counters)
+        lines = []
+        for (name, labels), h in histograms:
+            label = ",".join(v for _, v in labels)
+            lines.append(f"{name}[{label}]: n={h.count} mean={h.sum / h.count:.3f}s "
+                         f"p50<={h.quantile(0.5)}s p95<={h.quantile(0.95)}s")
+        for (name, labels), v in sorted(counters.items()):
+            lines.append(f"{name}[{','.join(v2 for _, v2 in labels)}]: {v:g}")
+        return "\n".join(lines) or "no metrics recorded"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+metrics = Metrics()                      # gemeinsam für alle Agenten/Modelle
+
+
+# ---------- Lokaler OpenTelemetry-Tracer für PydanticAI-Spans ----------
+class _LocalSpan(Span):
+    """Minimal span: only 'agent run' and 'running tool' are recorded, as metrics."""
+
+    def __init__(self, name: str, attributes: Optional[dict], parent: Span, sink: Metrics):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.agent = self.attributes.get("agent_name") or getattr(parent, "agent", None)   # vom Agentenlauf erben
+        self.error: Optional[str] = None
+        self._sink = sink
+        self._start = time.perf_counter()
+        self._ended = False
+
+    def is_recording(self) -> bool:
+        return self.name in _RECORDED_SPANS
+
+    def set_attribute(self, key: str, value) -> None:
+        if self.is_recording():
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict) -> None:
+        if self.is_recording():
+            # Nachrichten-Events nicht aufheben, nur Zahlen/Namen werden ausgewertet
+            self.attributes.update(
+                {k: v for k, v in attributes.items() if not k.startswith(("all_messages", "pydantic_ai.all"))}
+            )
+
+    def record_exception(self, exception: BaseException, attributes=None, timestamp=None, escaped=False) -> None:
+        self.error = type(exception).__name__
+
+    def set_status(self, status, description: Optional[str] = None) -> None:
+        code = getattr(status, "status_code", status)
+        if code == StatusCode.ERROR and self.error is None:
+            self.error = description or "error"
+
+    def add_event(self, name: str, attributes=None, timestamp=None) -> None:
+        pass
+
+    def update_name(self, name: str) -> None:
+        self.name = name
+
+    def get_span_context(self):
+        return INVALID_SPAN_CONTEXT
+
+    def end(self, end_time: Optional[int] = None) -> None:
+        if not self._ended:
+            self._ended = True
+            if self.is_recording():
+                self._sink.record_span(self, time.perf_counter() - self._start)
+
+
+class _LocalTracer(Tracer):
+    def __init__(self, sink: Metrics):
+        self._sink = sink
+
+    def start_span(self, name, context=None, kind=trace.SpanKind.INTERNAL, attributes=None, links=None,
+                   start_time=None, record_exception=True, set_status_on_exception=True) -> Span:
+        return _LocalSpan(name, attributes, trace.get_current_span(context), self._sink)
+
+    @contextmanager
+    def start_as_current_span(self, name, context=None, kind=trace.SpanKind.INTERNAL, attributes=None, links=None,
+                              start_time=None, record_exception=True, set_status_on_exception=True,
+                              end_on_exit=True):
+        span = self.start_span(name, context, kind, attributes)
+        with trace.use_span(span, end_on_exit=end_on_exit, record_exception=record_exception,
+                            set_status_on_exception=set_status_on_exception) as current:
+            yield current
+
+
+class LocalTracerProvider(TracerProvider):
+    """Tracer provider for InstrumentationSettings that turns spans into local metrics."""
+
+    def __init__(self, sink: Metrics = metrics):
+        self._tracer = _LocalTracer(sink)
+
+    def get_tracer(self, *args, **kwargs) -> Tracer:
+        return self._tracer
+
+
+def current_agent() -> str:
+    """Name of the agent whose run is active in this task (if instrumented)."""
+    return getattr(trace.get_current_span(), "agent", None) or "unknown"
+
+
+# ---------- Modellaufrufe ----------
+class MetricsModel(WrapperModel):
+    """Model wrapper recording latency, token usage, errors and time-to-first-token."""
+
+    def __init__(self, wrapped: Model, sink: Metrics = metrics):
+        super().__init__(wrapped)
+        self.sink = sink
+
+    async def request(self, messages: list[ModelMessage], model_settings: Optional[ModelSettings],
+                      model_request_parameters: ModelRequestParameters) -> ModelResponse:
+        if not self.sink.enabled:
+            return await self.wrapped.request(messages, model_settings, model_request_parameters)
+        agent, start = current_agent(), time.perf_counter()
+        try:
+            response = await self.wrapped.request(messages, model_settings, model_request_parameters)
+        except Exception as e:
+            self.sink.record_model(self.model_name, agent, time.perf_counter() - start, error=type(e).__name__)
+            raise
+        self.sink.record_model(self.model_name, agent, time.perf_counter() - start, response)
+        self.sink.capture_body(self.model_name, agent, messages, response)
+        return response
+
+    @asynccontextmanager
+    async def request_stream(self, messages: list[ModelMessage], model_settings: Optional[ModelSettings],
+                             model_request_parameters: ModelRequestParameters,
+                             run_context=None) -> AsyncIterator[StreamedResponse]:
+        if not self.sink.enabled:
+            async with self.wrapped.request_stream(
+                messages, model_settings, model_request_parameters, run_context
+            ) as stream:
+                yield stream
+            return
+        agent, start = current_agent(), time.perf_counter()
+        ttft, stream = None, None
+        try:
+            # das OpenAI-Modell wartet vor dem yield auf den ersten Chunk → Zeit bis hier = TTFT
+            async with self.wrapped.request_stream(
+                messages, model_settings, model_request_parameters, run_context
+            ) as stream:
+                ttft = time.perf_counter() - start
+                yield stream
+        except Exception as e:
+            self.sink.record_model(self.model_name, agent, time.perf_counter() - start, ttft=ttft,
+                                   error=type(e).__name__)
+            raise
+        response = stream.get()
+        self.sink.record_model(self.model_name, agent, time.perf_counter() - start, response, ttft=ttft)
+        self.sink.capture_body(self.model_name, agent, messages, response)
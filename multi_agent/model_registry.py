@@ -0,0 +1,239 @@
+"""Gemeinsamer Ollama-Provider, gepoolter HTTP-Client und lazy erzeugte Modelle."""
+import os, threading, time               # Umgebungsvariablen, Sperren, Zeitmessung
+from collections import defaultdict      # Zähler je Endpunkt
+from contextlib import AsyncExitStack, asynccontextmanager  # Stream-Aufbau wiederholen
+from typing import AsyncIterator, Callable, Optional    # Typ-Hinweise
+
+from pydantic_ai.messages import ModelMessage, ModelResponse
+from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.profiles import ModelProfile
+from pydantic_ai.settings import ModelSettings
+
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434/v1")
+MAX_CONNECTIONS = int(os.environ.get("OLLAMA_MAX_CONNECTIONS", 16))   # passend zur maximalen Parallelität
+REQUEST_TIMEOUT = float(os.environ.get("OLLAMA_TIMEOUT", 600))        # lange Generierungen lokaler Modelle
+
+
+class LazyModel(WrapperModel):
+    """Model placeholder that builds the real model on first use."""
+
+    def __init__(self, model_name: str, factory: Callable[[], Model],
+                 profile: Optional[Callable[[], ModelProfile]] = None):
+        Model.__init__(self)
+        self._model_name = model_name
+        self._factory = factory
+        self._profile_factory = profile
+        self._wrapped: Optional[Model] = None
+        self._build_lock = threading.Lock()
+
+    @property
+    def wrapped(self) -> Model:
+        if self._wrapped is None:
+            with self._build_lock:
+                if self._wrapped is None:
+                    self._wrapped = self._factory()
+        return self._wrapped
+
+    @property
+    def built(self) -> bool:
+        return self._wrapped is not None
+
+    @property
+    def profile(self) -> ModelProfile:
+        # Agent() liest das Profil schon beim Erstellen → ohne das Modell zu bauen beantworten
+        if self.built or self._profile_factory is None:
+            return self.wrapped.profile
+        return self._profile_factory()
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name          # ohne das Modell zu bauen
+
+    @property
+    def system(self) -> str:
+        return "openai"
+
+
+class ResilientModel(WrapperModel):
+    """Model wrapper that retries transient request failures through the shared policy."""
+
+    def __init__(self, wrapped, policy=None):
+        super().__init__(wrapped)
+        self.policy = policy or _resilience()
+
+    @property
+    def key(self) -> str:
+        return f"model:{self.model_name}"
+
+    async def request(self, messages: list[ModelMessage], model_settings: Optional[ModelSettings],
+                      model_request_parameters: ModelRequestParameters) -> ModelResponse:
+        return await self.policy.acall(
+            self.key, lambda: self.wrapped.request(messages, model_settings, model_request_parameters)
+        )
+
+    @asynccontextmanager
+    async def request_stream(self, messages: list[ModelMessage], model_settings: Optional[ModelSettings],
+                             model_request_parameters: ModelRequestParameters,
+                             run_context=None) -> AsyncIterator[StreamedResponse]:
+        async def open_stream():         # nur der Verbindungsaufbau wird wiederholt, nie ein laufender Stream
+            stack = AsyncExitStack()
+            try:
+                stream = await stack.enter_async_context(
+                    self.wrapped.request_stream(messages, model_settings, model_request_parameters, run_context)
+                )
+            except BaseException:
+                await stack.aclose()
+                raise
+            return stack, stream
+
+        stack, stream = await self.policy.acall(self.key, open_stream)
+        async with stack:
+            yield stream
+
+
+def _resilience():
+    from .resilience import resilience
+    return resilience
+
+
+def _openai_profile(model_name: str) -> ModelProfile:
+    from pydantic_ai.profiles.openai import OpenAIModelProfile, openai_model_profile
+    return OpenAIModelProfile.from_profile(openai_model_profile(model_name))
+
+
+class ConnectionStats:
+    """Per-endpoint request, latency and TCP-connect counters (via httpx hooks and httpcore trace)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints: dict[str, dict] = defaultdict(
+            lambda: {"requests": 0, "responses": 0, "errors": 0, "connects": 0, "seconds": 0.0}
+        )
+
+    def _count(self, host: str, key: str, value: float = 1) -> None:
+        with self._lock:
+            self.endpoints[host][key] += value
+
+    async def on_request(self, request) -> None:
+        host = request.url.netloc.decode()
+        request.extensions["stats_start"] = time.perf_counter()
+
+        async def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.complete":   # neue TCP-Verbindung statt Keep-Alive
+                self._count(host, "connects")
+
+        request.extensions["trace"] = trace
+        self._count(host, "requests")
+
+    async def on_response(self, response) -> None:
+        host = response.request.url.netloc.decode()
+        self._count(host, "responses")
+        self._count(host, "seconds", time.perf_counter() - response.request.extensions["stats_start"])
+        if response.status_code >= 400:
+            self._count(host, "errors")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {}
+            for host, s in self.endpoints.items():
+                result[host] = dict(s)
+                result[host]["reused"] = s["requests"] - s["connects"]
+                result[host]["avg_seconds"] = s["seconds"] / s["responses"] if s["responses"] else 0.0
+            return result
+
+
+class ModelRegistry:
+    """Builds models on first use and shares one tuned HTTP client across all agents."""
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, max_connections: int = MAX_CONNECTIONS,
+                 timeout: float = REQUEST_TIMEOUT):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.connection_stats = ConnectionStats()
+        self._models: dict[tuple, LazyModel] = {}
+        self._http_client = None
+        self._provider = None
+        self._lock = threading.Lock()
+
+    @property
+    def http_client(self):
+        """Shared httpx.AsyncClient with keep-alive, bounded pool and timeouts."""
+        if self._http_client is None:
+            import httpx                 # erst bei Bedarf laden
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=120,            # Verbindungen zwischen Agenten-Hops offen halten
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                event_hooks={
+                    "request": [self.connection_stats.on_request],
+                    "response": [self.connection_stats.on_response],
+                },
+            )
+        return self._http_client
+
+    @property
+    def provider(self):
+        """Single OpenAI-compatible provider for the local Ollama endpoint."""
+        if self._provider is None:
+            from openai import AsyncOpenAI
+            from pydantic_ai.providers.openai import OpenAIProvider
+            client = AsyncOpenAI(
+                base_url=self.base_url, api_key=os.environ.get("OPENAI_API_KEY", "api-key-not-set"),
+                http_client=self.http_client,
+                max_retries=0,           # Wiederholungen nur in ResilientModel (sonst vervielfachen sie sich)
+            )
+            self._provider = OpenAIProvider(openai_client=client)
+        return self._provider
+
+    def model(self, model_name: str, temperature: Optional[float] = None, cached: bool = False) -> LazyModel:
+        """Return a (shared) lazy model; it is only constructed when an agent first uses it."""
+        key = (model_name, temperature, cached)
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = LazyModel(
+                    model_name,
+                    lambda: self._build(model_name, temperature, cached),
+                    profile=lambda: _openai_profile(model_name),
+                )
+            return self._models[key]
+
+    def _build(self, model_name: str, temperature: Optional[float], cached: bool) -> Model:
+        from pydantic_ai.models.openai import OpenAIModel
+        from pydantic_ai.settings import ModelSettings
+        settings = ModelSettings(temperature=temperature) if temperature is not None else None
+        model: Model = OpenAIModel(model_name, settings=settings, provider=self.provider)
+        from .scheduler import ScheduledModel   # innen: Cache-Treffer brauchen kein geladenes Modell
+        model = ResilientModel(ScheduledModel(model))   # Backoff außerhalb des Slots: wartend kein Slot belegt
+        if cached:
+            from .llm_cache import CachingModel
+            model = CachingModel(model)
+        from .metrics import MetricsModel       # außen: misst, was der Agent sieht (auch Cache-Treffer)
+        return MetricsModel(model)
+
+    def build_all(self) -> list[str]:
+        """Construct every registered model now (long-running processes: no build cost on the first request)."""
+        with self._lock:
+            models = list(self._models.values())
+        for model in models:
+            model.wrapped
+        return sorted({m.model_name for m in models})
+
+    def stats(self) -> dict:
+        """Built models and per-endpoint connection statistics."""
+        return {
+            "models_built": sorted({m.model_name for m in self._models.values() if m.built}),
+            "models_registered": len(self._models),
+            "endpoints": self.connection_stats.snapshot(),
+        }
+
+    async def aclose(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+
+
+registry = ModelRegistry()               # gemeinsame Registry für alle Skripte
@@ -0,0 +1,55 @@
+"""Beobachtbarkeit – nur auf ausdrücklichen Wunsch (CLI/Skript), nie beim Import.
+
+Standard sind lokale Metriken (``multi_agent.metrics``); Logfire bleibt als Alternative.
+Gesteuert über Umgebungsvariablen:
+
+    OBSERVABILITY=metrics|logfire|off     Backend (Standard: metrics)
+    METRICS_JSONL=runs/metrics.jsonl      rotierende Event-Datei ("" = keine Datei)
+    METRICS_PORT=9464                     Prometheus-Endpunkt /metrics (Standard: aus)
+    METRICS_BODY_SAMPLE=0.01              Anteil der Modellaufrufe mit Body-Mitschnitt (Standard: 0)
+    METRICS_BODY_MAX_BYTES=2048           Obergrenze je mitgeschnittenem Body
+"""
+import os                                # Umgebungsvariablen
+
+OBSERVABILITY = os.environ.get("OBSERVABILITY", "metrics")
+METRICS_JSONL = os.environ.get("METRICS_JSONL", "runs/metrics.jsonl")
+METRICS_PORT = int(os.environ["METRICS_PORT"]) if os.environ.get("METRICS_PORT") else None
+METRICS_BODY_SAMPLE = float(os.environ.get("METRICS_BODY_SAMPLE", 0.0))
+METRICS_BODY_MAX_BYTES = int(os.environ.get("METRICS_BODY_MAX_BYTES", 2048))
+
+
+def configure_logfire(capture_httpx: bool = False) -> None:
+    """Configure Logfire and instrument PydanticAI (and optionally httpx)."""
+    import logfire                       # erst bei Bedarf laden
+    logfire.configure()                  # Logfire initialisieren
+    logfire.instrument_pydantic_ai()     # PydanticAI-Events mitschneiden
+    if capture_httpx:
+        logfire.instrument_httpx(capture_all=True)
+
+
+def configure_metrics(jsonl_path: str = METRICS_JSONL, port: int = METRICS_PORT,
+                      body_sample: float = METRICS_BODY_SAMPLE, body_max_bytes: int = METRICS_BODY_MAX_BYTES):
+    """Record agent/tool/model metrics locally; nothing leaves the machine."""
+    from pydantic_ai import Agent
+    from pydantic_ai.models.instrumented import InstrumentationSettings
+    from .metrics import LocalTracerProvider, metrics
+    metrics.enabled = True
+    metrics.body_sample = body_sample
+    metrics.body_max_bytes = body_max_bytes
+    if jsonl_path:
+        metrics.open_jsonl(jsonl_path)
+    if port:
+        metrics.serve(port)
+    # Agent-/Tool-Spans lokal auswerten; Prompts/Antworten nie in Span-Attribute schreiben
+    Agent.instrument_all(InstrumentationSettings(
+        tracer_provider=LocalTracerProvider(metrics), include_content=False, include_binary_content=False,
+    ))
+    return metrics
+
+
+def configure_observability(capture_httpx: bool = False) -> None:
+    """Set up the backend selected by $OBSERVABILITY."""
+    if OBSERVABILITY == "logfire":
+        configure_logfire(capture_httpx)  # capture_httpx: vollständige Bodies, nur für Logfire
+    elif OBSERVABILITY == "metrics":
+        configure_metrics()
@@ -0,0 +1,234 @@
+"""Seitengebundene PDF-Abschnitte mit lokalem BM25-Index (NumPy-Arrays, auf Platte persistiert).
+
+Agenten bekommen so nur die relevanten Passagen (mit Seitenzahl) statt des ganzen Dokuments.
+Geänderte PDFs werden beim nächsten Zugriff neu eingelesen; unveränderte nicht.
+"""
+import hashlib, json, os, re, threading, uuid  # Hashing, Persistenz, Tokenisierung, Sperren
+from collections import Counter          # Termfrequenzen je Abschnitt
+from dataclasses import dataclass        # Ergebnis-Container
+from pathlib import Path                 # Pfad-Objekte
+from typing import Iterable, Optional    # Typ-Hinweise
+
+from .pdf_text import pdf_text_cache     # vorab extrahierte oder seitenweise geparste Seiten
+
+INDEX_DIR = Path(os.environ.get("PDF_INDEX_DIR", "~/.cache/pdf_index")).expanduser()
+_TOKEN = re.compile(r"\w\w+", re.UNICODE)   # Wörter ab 2 Zeichen (auch Umlaute, Zahlen)
+_SPACE = re.compile(r"\s+")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def split_page(text: str, chunk_chars: int, overlap: int) -> list[str]:
+    """Split one page into overlapping chunks, cutting at whitespace where possible."""
+    text = text.strip()
+    chunks, start = [], 0
+    while start < len(text):
+        end = min(len(text), start + chunk_chars)
+        if end < len(text):
+            cut = max(text.rfind(c, start + chunk_chars // 2, end) for c in " \n")
+            end = cut if cut > 0 else end    # nicht mitten im Wort trennen
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        nxt = max(end - overlap, start + 1)
+        space = _SPACE.search(text, nxt, end)   # Überlappung an einer Wortgrenze beginnen
+        start = space.end() if space else nxt
+    return [c for c in chunks if c]
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class Passage:
+    path: str
+    page: int                            # 1-basiert
+    text: str
+    score: float
+
+    def cite(self) -> str:
+        return f"[{Path(self.path).name} p. {self.page}]"
+
+
+def format_passages(passages: list[Passage]) -> str:
+    """Passages as model context, each prefixed with its page citation."""
+    return "\n\n".join(f"{p.cite()}\n{p.text}" for p in passages) or "No matching passages."
+
+
+class PdfIndex:
+    """BM25 index over page-anchored chunks of one or more PDFs."""
+
+    def __init__(self, index_dir: Path = INDEX_DIR, chunk_chars: int = 800, overlap: int = 150,
+                 k1: float = 1.5, b: float = 0.75):
+        self.index_dir = Path(index_dir)
+        self.chunk_chars = chunk_chars
+        self.overlap = overlap
+        self.k1, self.b = k1, b
+        self.docs: dict[str, dict] = {}  # realpath → size, mtime_ns, sha256, chunks [(page, text)]
+        self._arrays: Optional[dict] = None   # term_ptr, post_chunk, post_tf, doc_len, idf, chunk_doc, chunk_page
+        self._vocab: dict[str, int] = {}
+        self._chunks: list[tuple[str, int, str]] = []   # (path, page, text) je Abschnitt
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    # ---------- Einlesen ----------
+    def add(self, path: str) -> bool:
+        """Index path if it is new or changed; returns whether the index was updated."""
+        with self._lock:
+            self._load()
+            key, st = os.path.realpath(path), os.stat(path)
+            doc = self.docs.get(key)
+            if doc and (doc["size"], doc["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+                return False             # unverändert → nichts zu tun
+            sha = _file_sha256(key)
+            if doc and doc["sha256"] == sha:   # nur Zeitstempel geändert (z. B. Kopie)
+                doc.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+                self._save_meta()
+                return False
+            chunks = [(page, chunk)
+                      for page, text in enumerate(pdf_text_cache.pages(key), 1)
+                      for chunk in split_page(text, self.chunk_chars, self.overlap)]
+            self.docs[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha, "chunks": chunks}
+            self._rebuild()
+            return True
+
+    def refresh(self, paths: Optional[Iterable[str]] = None) -> list[str]:
+        """Re-index changed PDFs and drop deleted ones; returns the updated paths."""
+        with self._lock:
+            self._load()
+            for key in [k for k in self.docs if not os.path.exists(k)]:
+                del self.docs[key]
+                self._rebuild()
+            return [p for p in (paths if paths is not None else list(self.docs)) if self.add(p)]
+
+    def remove(self, path: str) -> None:
+        with self._lock:
+            self._load()
+            if self.docs.pop(os.path.realpath(path), None) is not None:
+                self._rebuild()
+
+    def _rebuild(self) -> None:
+        """Rebuild the postings arrays from the stored chunks (no PDF parsing)."""
+        import numpy as np               # erst bei Bedarf laden
+        self._chunks = [(path, page, text) for path, doc in self.docs.items() for page, text in doc["chunks"]]
+        vocab: dict[str, int] = {}
+        terms, chunk_ids, tfs, lengths = [], [], [], []
+        for chunk_id, (_, _, text) in enumerate(self._chunks):
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            terms += [vocab.setdefault(term, len(vocab)) for term in counts]
+            chunk_ids += [chunk_id] * len(counts)
+            tfs += counts.values()
+        order = np.argsort(np.array(terms, dtype=np.int64), kind="stable")   # Postings nach Term gruppieren
+        df = np.bincount(np.array(terms, dtype=np.int64), minlength=len(vocab))
+        n = max(len(self._chunks), 1)
+        paths = list(self.docs)
+        self._vocab = vocab
+        self._arrays = {
+            "term_ptr": np.concatenate([[0], np.cumsum(df)]).astype(np.int64),
+            "post_chunk": np.array(chunk_ids, dtype=np.int32)[order],
+            "post_tf": np.array(tfs, dtype=np.float32)[order],
+            "doc_len": np.array(lengths, dtype=np.float32),
+            "idf": np.log(1 + (n - df + 0.5) / (df + 0.5)).astype(np.float32),
+            "chunk_doc": np.array([paths.index(p) for p, _, _ in self._chunks], dtype=np.int32),
+            "chunk_page": np.array([page for _, page, _ in self._chunks], dtype=np.int32),
+        }
+        self._save()
+
+    # ---------- Suche ----------
+    def search(self, query: str, k: int = 5, paths: Optional[Iterable[str]] = None) -> list[Passage]:
+        """Top-k passages for query (optionally only from the given PDFs)."""
+        import numpy as np
+        if k <= 0:                       # k kommt vom Modell (search_pdf)
+            return []
+        with self._lock:
+            self._load()
+            if paths is not None:
+                paths = list(paths)
+                for path in paths:
+                    self.add(path)       # neu/geändert → vor der Suche einlesen
+            a = self._arrays
+            if not self._chunks or a is None:
+                return []
+            scores = np.zeros(len(self._chunks), dtype=np.float32)
+            avg_len = float(a["doc_len"].mean()) or 1.0
+            for term in set(tokenize(query)):
+                t = self._vocab.get(term)
+                if t is None:
+                    continue
+                s, e = a["term_ptr"][t], a["term_ptr"][t + 1]
+                ids, tf = a["post_chunk"][s:e], a["post_tf"][s:e]   # Abschnitte mit diesem Term
+                norm = self.k1 * (1 - self.b + self.b * a["doc_len"][ids] / avg_len)
+                scores[ids] += a["idf"][t] * tf * (self.k1 + 1) / (tf + norm)
+            if paths is not None:
+                order = list(self.docs)
+                allowed = [order.index(os.path.realpath(p)) for p in paths]
+                scores[~np.isin(a["chunk_doc"], allowed)] = 0.0
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [Passage(*self._chunks[i][:2], self._chunks[i][2], float(scores[i])) for i in top if scores[i] > 0]
+
+    def spread(self, path: str, k: int = 5) -> list[Passage]:
+        """k chunks evenly spread over one document (overview when there is no query)."""
+        with self._lock:
+            self.add(path)
+            chunks = self.docs[os.path.realpath(path)]["chunks"]
+            step = max(len(chunks) / max(k, 1), 1)
+            picked = sorted({int(i * step) for i in range(min(k, len(chunks)))})
+            return [Passage(os.path.realpath(path), chunks[i][0], chunks[i][1], 0.0) for i in picked]
+
+    # ---------- Persistenz ----------
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        meta_path = self.index_dir / "index.json"
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return                       # noch kein Index
+        self.docs = {p: {**d, "chunks": [tuple(c) for c in d["chunks"]]} for p, d in meta["docs"].items()}
+        try:
+            import numpy as np
+            with np.load(self.index_dir / "postings.npz") as data:
+                if str(data["build_id"]) != meta["build_id"]:
+                    raise ValueError("stale postings")
+                self._arrays = {name: data[name] for name in data.files if name != "build_id"}
+            self._vocab = {term: i for i, term in enumerate(meta["vocab"])}
+            self._chunks = [(p, page, text) for p, d in self.docs.items() for page, text in d["chunks"]]
+        except (OSError, ValueError, KeyError):
+            self._rebuild()              # Arrays fehlen/veraltet → aus gespeicherten Abschnitten neu bauen
+
+    def _save(self) -> None:
+        import numpy as np
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        build_id = uuid.uuid4().hex      # verbindet Metadaten und Arrays derselben Version
+        tmp = self.index_dir / f"postings.{os.getpid()}.tmp.npz"
+        np.savez(tmp, build_id=np.array(build_id), **self._arrays)
+        os.replace(tmp, self.index_dir / "postings.npz")
+        self._save_meta(build_id)
+
+    def _save_meta(self, build_id: Optional[str] = None) -> None:
+        meta_path = self.index_dir / "index.json"
+        if build_id is None:
+            build_id = json.loads(meta_path.read_text(encoding="utf-8"))["build_id"]
+        vocab = sorted(self._vocab, key=self._vocab.get)
+        tmp = meta_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"build_id": build_id, "vocab": vocab, "docs": self.docs}), encoding="utf-8")
+        os.replace(tmp, meta_path)       # atomar ersetzen
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load()
+            return {"documents": len(self.docs), "chunks": len(self._chunks), "terms": len(self._vocab)}
+
+
+pdf_index = PdfIndex()                   # gemeinsamer Index (Standard: ~/.cache/pdf_index)
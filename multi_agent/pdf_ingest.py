@@ -0,0 +1,139 @@
+"""Stapel-Einlesen vieler PDFs: Seiten parallel in einem Prozess-Pool extrahieren und vorab speichern.
+
+Die Seiten jeder Datei werden in Blöcke aufgeteilt, damit auch ein einzelnes langes Skript alle
+Kerne auslastet. Der normalisierte Text landet in ``pdf_text_cache`` (Ordner ``ingested``), den
+``get_pdf_text`` und der BM25-Index lesen, statt zur Laufzeit zu parsen. Unveränderte Dateien
+werden übersprungen; Dateien, die sich nicht lesen lassen, stehen im Bericht und halten den Rest
+nicht auf.
+
+    PDF_INGEST_WORKERS=4          Prozesse (Standard: Anzahl der Kerne)
+    PDF_INGEST_PAGES_PER_TASK=8   Seiten je Auftrag an einen Prozess
+"""
+import os, time                          # Umgebungsvariablen, Zeitmessung
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait   # Prozess-Pool
+from dataclasses import dataclass, field  # Ergebnis-Container
+from pathlib import Path                 # Pfad-Objekte
+from typing import Iterable              # Typ-Hinweise
+
+from .metrics import metrics             # Seiten/Sekunde und Fehler zählen
+from .pdf_text import PdfTextCache, pdf_text_cache   # Ziel der vorab extrahierten Seiten
+
+PDF_INGEST_WORKERS = int(os.environ.get("PDF_INGEST_WORKERS", 0)) or os.cpu_count() or 1
+PDF_INGEST_PAGES_PER_TASK = int(os.environ.get("PDF_INGEST_PAGES_PER_TASK", 8))
+
+
+_readers: dict = {}                      # je Worker-Prozess: Pfad → geöffneter PdfReader (Aufträge derselben Datei)
+
+
+def _extract_pages(path: str, start: int, count: int) -> tuple[int, list[str]]:
+    """Page count of path and the normalized text of up to count pages from start (runs in a worker)."""
+    from pypdf import PdfReader          # im Worker-Prozess importieren
+    from .pdf_text import normalize_text
+    if path not in _readers:
+        if len(_readers) >= 4:
+            _readers.pop(next(iter(_readers)))   # älteste Datei schließen
+        _readers[path] = PdfReader(path)
+    pages = _readers[path].pages
+    return len(pages), [normalize_text(pages[i].extract_text() or "") for i in range(start, min(len(pages), start + count))]
+
+
+def find_pdfs(paths: Iterable[str]) -> list[str]:
+    """PDF files given directly or found (recursively) in the given directories, sorted."""
+    found = set()
+    for path in map(Path, paths):
+        if path.is_dir():
+            found.update(str(p) for p in path.rglob("*") if p.suffix.lower() == ".pdf" and p.is_file())
+        else:
+            found.add(str(path))         # fehlt sie, erscheint sie im Bericht als fehlgeschlagen
+    return sorted(found)
+
+
+@dataclass
+class IngestReport:
+    """Pages extracted per file, skipped (unchanged) and failed files, and wall-clock time."""
+    files: dict[str, int] = field(default_factory=dict)    # Pfad → Seiten
+    skipped: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)   # Pfad → Fehlermeldung
+    wall_seconds: float = 0.0
+
+    @property
+    def pages(self) -> int:
+        return sum(self.files.values())
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.wall_seconds if self.wall_seconds else 0.0
+
+    def summary(self) -> str:
+        lines = [f"files: {len(self.files)} ingested, {len(self.skipped)} unchanged, {len(self.failed)} failed",
+                 f"pages: {self.pages} in {self.wall_seconds:.2f}s ({self.pages_per_second:.1f} pages/s)"]
+        lines += [f"failed: {path}: {error}" for path, error in self.failed.items()]
+        return "\n".join(lines)
+
+
+def ingest(
+    paths: Iterable[str],
+    workers: int = PDF_INGEST_WORKERS,
+    pages_per_task: int = PDF_INGEST_PAGES_PER_TASK,
+    cache: PdfTextCache = pdf_text_cache,
+    force: bool = False,
+    index: bool = True,
+) -> IngestReport:
+    """Extract all pages of the given PDFs/directories in parallel and store them pre-extracted.
+
+    With ``index=True`` the documents are also added to the BM25 index (from the stored pages,
+    without parsing again).
+    """
+    report = IngestReport()
+    start = time.perf_counter()
+    todo = []
+    for path in find_pdfs(paths):
+        try:
+            if not force and cache.ingested(path) is not None:
+                report.skipped.append(path)
+                continue
+        except OSError as e:             # fehlt/unlesbar
+            report.failed[path] = f"{type(e).__name__}: {e}"
+            continue
+        todo.append(path)
+
+    if todo:
+        import multiprocessing
+        # spawn: keine geerbten Threads/Sockets aus dem Elternprozess (CLI, Server)
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(todo) * 4)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            # erster Block je Datei liefert auch die Seitenzahl, danach werden die übrigen Blöcke verteilt
+            jobs = {pool.submit(_extract_pages, path, 0, pages_per_task): (path, 0) for path in todo}
+            chunks: dict[str, dict[int, list[str]]] = {path: {} for path in todo}   # Pfad → erste Seite → Texte
+            while jobs:
+                done, _ = wait(jobs, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, first = jobs.pop(future)
+                    if path in report.failed:
+                        continue
+                    try:
+                        n, texts = future.result()
+                    except Exception as e:   # kaputte/verschlüsselte PDF oder defekte Seite → melden, Rest läuft weiter
+                        where = f" (pages from {first + 1})" if first else ""
+                        report.failed[path] = f"{type(e).__name__}{where}: {e}"
+                        continue
+                    chunks[path][first] = texts
+                    if first == 0:
+                        for nxt in range(pages_per_task, n, pages_per_task):
+                            jobs[pool.submit(_extract_pages, path, nxt, pages_per_task)] = (path, nxt)
+            for path, parts in chunks.items():
+                if path not in report.failed:
+                    pages = [text for first in sorted(parts) for text in parts[first]]
+                    cache.put_pages(path, pages)
+                    report.files[path] = len(pages)
+
+    report.wall_seconds = time.perf_counter() - start
+    if index:
+        from .pdf_index import pdf_index
+        for path in report.files:
+            pdf_index.add(path)          # liest die gespeicherten Seiten, parst nicht erneut
+    metrics.inc("pdf_ingest_pages_total", report.pages)
+    metrics.inc("pdf_ingest_failed_total", len(report.failed))
+    metrics.event("pdf_ingest", files=len(report.files), skipped=len(report.skipped), failed=len(report.failed),
+                  pages=report.pages, seconds=report.wall_seconds, pages_per_second=report.pages_per_second)
+    return report
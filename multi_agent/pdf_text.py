@@ -0,0 +1,142 @@
+"""Seitenweise PDF-Extraktion mit Zeichenbudget und persistentem Text-Cache.
+
+Mit ``python -m multi_agent ingest`` vorab extrahierter Text (``multi_agent/pdf_ingest.py``) liegt
+in ``CACHE_DIR/ingested`` und wird nicht verdrängt; ``get_text`` und ``pages`` lesen ihn zuerst.
+"""
+import hashlib, json, os, re, unicodedata  # Hashing, Serialisierung, Dateisystem, Normalisierung
+from pathlib import Path                 # Pfad-Objekte
+from typing import Iterator, Optional     # Typ-Hinweise
+
+# Cache-Ordner und Größenlimit (per Umgebungsvariable anpassbar)
+CACHE_DIR = Path(os.environ.get("PDF_TEXT_CACHE_DIR", "~/.cache/pdf_text")).expanduser()
+CACHE_MAX_BYTES = int(os.environ.get("PDF_TEXT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+PAGE_SEPARATOR = "\n\n"                  # zwischen Seiten (sonst verschmelzen Wörter an Seitengrenzen)
+TEXT_FORMAT = 2                          # Teil des Cache-Schlüssels: Einträge vor der Normalisierung gelten nicht mehr
+
+_HYPHEN_BREAK = re.compile(r"(\w)-\n(\w)")   # Silbentrennung am Zeilenende
+_CONTROL = re.compile(r"[\x00-\x08\x0b-\x1f\x7f]")
+_BLANKS = re.compile(r"[ \t\u00a0]+")
+_EMPTY_LINES = re.compile(r"\n\s*\n+")
+
+
+def normalize_text(text: str) -> str:
+    """Page text in a stable form: NFKC (ligatures), joined hyphenation, no control chars, single spaces."""
+    text = unicodedata.normalize("NFKC", text).replace("\r\n", "\n").replace("\r", "\n")
+    text = _CONTROL.sub("", _HYPHEN_BREAK.sub(r"\1\2", text))
+    lines = (_BLANKS.sub(" ", line).strip() for line in text.split("\n"))
+    return _EMPTY_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def iter_pdf_pages(path: str) -> Iterator[str]:
+    """Yield the normalized text of each PDF page lazily, one page at a time."""
+    from pypdf import PdfReader          # erst bei Bedarf laden (teurer Import)
+    reader = PdfReader(path)             # Seiten werden erst beim Zugriff geparst
+    for page in reader.pages:
+        yield normalize_text(page.extract_text() or "")
+
+
+def extract_pdf_text(path: str, max_chars: Optional[int] = None) -> tuple[str, bool]:
+    """Extract PDF text page by page and stop once max_chars is reached.
+
+    Returns the text and whether the whole document was read.
+    """
+    parts, total = [], 0
+    for text in iter_pdf_pages(path):
+        parts.append(text)
+        total += len(text) + len(PAGE_SEPARATOR)
+        if max_chars is not None and total >= max_chars:  # Budget erreicht → restliche Seiten nicht parsen
+            return PAGE_SEPARATOR.join(parts)[:max_chars], False
+    return PAGE_SEPARATOR.join(parts), True
+
+
+class PdfTextCache:
+    """On-disk cache of extracted PDF text keyed by path, size and mtime."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    @property
+    def ingested_dir(self) -> Path:
+        return self.cache_dir / "ingested"   # eigener Ordner: nicht von _evict/clear erfasst
+
+    def _entry_path(self, path: str, directory: Optional[Path] = None) -> Path:
+        st = os.stat(path)               # Größe + mtime ändern sich bei neuer Dateiversion
+        raw = f"{os.path.realpath(path)}|{st.st_size}|{st.st_mtime_ns}|{TEXT_FORMAT}"
+        return (directory or self.cache_dir) / f"{hashlib.sha256(raw.encode()).hexdigest()}.json"
+
+    def ingested(self, path: str) -> Optional[list[str]]:
+        """Pre-extracted pages of the current version of path, or None if it was not ingested."""
+        try:
+            return json.loads(self._entry_path(path, self.ingested_dir).read_text(encoding="utf-8"))["pages"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put_pages(self, path: str, pages: list[str]) -> None:
+        """Store the normalized pages of path as pre-extracted text (no eviction)."""
+        self.ingested_dir.mkdir(parents=True, exist_ok=True)
+        entry_path = self._entry_path(path, self.ingested_dir)
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"path": os.path.realpath(path), "pages": pages}), encoding="utf-8")
+        os.replace(tmp_path, entry_path)
+
+    def pages(self, path: str) -> list[str]:
+        """All normalized pages: pre-extracted if available, otherwise parsed now."""
+        pages = self.ingested(path)
+        return pages if pages is not None else list(iter_pdf_pages(path))
+
+    def get_text(self, path: str, max_chars: Optional[int] = None) -> str:
+        """Return the PDF text, served from pre-extracted pages or the cache whenever possible."""
+        pages = self.ingested(path)
+        if pages is not None:            # vorab extrahiert → kein Parsen zur Laufzeit
+            text = PAGE_SEPARATOR.join(pages)
+            return text if max_chars is None else text[:max_chars]
+        entry_path = self._entry_path(path)
+        try:
+            entry = json.loads(entry_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            entry = None                 # kein oder defekter Eintrag → neu extrahieren
+        if entry and (entry["complete"] or (max_chars is not None and len(entry["text"]) >= max_chars)):
+            os.utime(entry_path)         # Zugriffszeit für LRU-Verdrängung aktualisieren
+            text = entry["text"]
+            return text if max_chars is None else text[:max_chars]
+
+        text, complete = extract_pdf_text(path, max_chars)
+        self._store(entry_path, {"path": path, "text": text, "complete": complete})
+        return text
+
+    def _store(self, entry_path: Path, entry: dict) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(entry), encoding="utf-8")
+        os.replace(tmp_path, entry_path)  # atomar ersetzen (parallele Läufe sicher)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits into max_bytes."""
+        entries = []
+        for p in self.cache_dir.glob("*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue                 # bereits von anderem Prozess entfernt
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):   # älteste zuerst
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        for p in self.cache_dir.glob("*.json"):
+            p.unlink(missing_ok=True)
+
+
+pdf_text_cache = PdfTextCache()          # gemeinsamer Standard-Cache
+
+
+def read_pdf_text(path: str, max_chars: Optional[int] = None) -> str:
+    """Return PDF text via the shared cache, truncated to max_chars."""
+    return pdf_text_cache.get_text(path, max_chars)
@@ -0,0 +1,357 @@
+"""Einzelne Stufen des Supervisor-/Test-Workflows und die Gesamt-Pipeline."""
+import asyncio                           # Async-Ausführung
+from pathlib import Path                 # Pfad-Objekte
+from typing import Iterable              # Typ-Hinweise
+
+from . import settings                   # Pfade und Kohorten-Einstellungen
+
+# Agenten/PydanticAI werden erst in den Stufen importiert, damit z. B. "grade" ohne LLM-Stack startet
+
+# Welche Stufe auf den Nachrichtenverlauf welcher vorherigen Stufen aufbaut
+STAGE_HISTORY = {
+    "solve": ["extract"],
+    "search": ["extract", "solve"],
+}
+# Vorstufen, deren Ergebnis in den Checkpoint-Schlüssel eingeht (Verlauf, Fragenbank oder Antwortspeicher)
+STAGE_UPSTREAM = {**STAGE_HISTORY, "answer-key": ["test-gen"], "simulate": ["test-gen"],
+                  "grade": ["answer-key", "simulate"]}
+
+PROMPTS = {
+    "extract": "What is the Student task in the PDF",
+    "solve": "Solve and execute the code student task",
+    "search": "Search the web for resources for the main topic and return websites results",
+    "test-gen": "Get the PDF to generate a random 5 MCQ test on the content",
+    "answer-key": "Answer the test and submit the answers, stop once submitted",
+    "trick": "What does PDF mean?",
+}
+
+
+# ---------- Verlauf zwischen Stufen (für getrennte CLI-Aufrufe) ----------
+def save_history(stage: str, messages: list) -> Path:
+    """Persist the new messages of a stage in RUN_DIR."""
+    from pydantic_ai.messages import ModelMessagesTypeAdapter
+    settings.RUN_DIR.mkdir(parents=True, exist_ok=True)
+    path = settings.RUN_DIR / f"{stage}.messages.json"
+    path.write_bytes(ModelMessagesTypeAdapter.dump_json(messages))
+    return path
+
+
+def load_history(stage: str) -> list:
+    """Load the message history a stage depends on."""
+    from pydantic_ai.messages import ModelMessagesTypeAdapter
+    messages: list = []
+    for upstream in STAGE_HISTORY.get(stage, []):
+        path = settings.RUN_DIR / f"{upstream}.messages.json"
+        if not path.exists():
+            raise FileNotFoundError(f"Stage '{stage}' needs '{upstream}' first (missing {path})")
+        messages += ModelMessagesTypeAdapter.validate_json(path.read_bytes())
+    return messages
+
+
+async def _supervisor_stage(stage: str, prompt: str, deps: bool = False, history=None):
+    from .router import run_routed
+    result = await run_routed(                   # Vor-Router; streamt, wenn ein TokenStream aktiv ist
+        prompt,
+        deps=deps,
+        message_history=load_history(stage) if history is None else history,
+    )
+    save_history(stage, result.new_messages())
+    return result
+
+
+# ---------- Stufen ----------
+async def extract(history=None):
+    """Step 1: extract the student task from the PDF."""
+    return await _supervisor_stage("extract", PROMPTS["extract"], deps=False, history=history)
+
+
+async def solve(history=None):
+    """Step 2: solve and execute the student task."""
+    return await _supervisor_stage("solve", PROMPTS["solve"], history=history)
+
+
+async def search(history=None):
+    """Step 3: search the web for resources on the main topic."""
+    return await _supervisor_stage("search", PROMPTS["search"], history=history)
+
+
+async def generate_test():
+    """Assemble a 5 MCQ test from the question bank, generating questions from the PDF if needed."""
+    from .answer_store import answer_store, current_test
+    from .checkpoints import StageResult
+    from .tools import build_test
+    test = await build_test()            # Fragenbank: ohne Modellaufruf, sonst einmal strukturiert erzeugen
+    answer_store.put_test(current_test(), test.render())   # Test (ohne Lösungen) neben Abgaben ablegen
+    save_history("test-gen", [])         # Folgestufen lesen den Test aus dem Speicher, nicht aus dem Verlauf
+    return StageResult(test.render(), [])
+
+
+def _stored_test() -> str:
+    from .answer_store import answer_store, current_test
+    test = answer_store.test(current_test())
+    if test is None:
+        raise FileNotFoundError(f"No test for {current_test()} (run test-gen first)")
+    return test
+
+
+async def write_answer_key():
+    """Store model_answers for the current test: the bank's answer key, or a solver run for older tests."""
+    from .answer_store import answer_store, current_test
+    from .checkpoints import StageResult
+    from .question_bank import question_bank
+    test = question_bank.test(current_test())
+    if test is not None:                 # Lösungen stehen in der Fragenbank → kein Löser-Lauf
+        key = test.render_key()
+        answer_store.write(settings.model_answers_path(), key)
+        save_history("answer-key", [])
+        return StageResult(key, [])
+    from .agents import solver_agent     # Test ohne Fragenbank (älterer Lauf)
+    from .streaming import run_agent
+    result = await run_agent(
+        solver_agent,
+        f"{_stored_test()}\n\n{PROMPTS['answer-key']}",
+        "solver_agent",
+        deps=str(settings.model_answers_path()),          # Speichere Musterlösung
+    )
+    save_history("answer-key", result.new_messages())
+    return result
+
+
+async def simulate(cohort_size: int = None, concurrency: int = None, seed: int = None):
+    """Simulate a cohort of students answering the test concurrently (replaces the previous cohort's sheets)."""
+    from .agents import examiner_agent
+    from .answer_store import STUDENT, answer_store, current_test
+    from .student_simulation import run_cohort
+    answer_store.clear(current_test(), STUDENT)   # "grade" bewertet nur diese Kohorte
+    if settings.ANSWER_FILES:
+        settings.ANSWERS_DIR.mkdir(parents=True, exist_ok=True)
+    return await run_cohort(
+        examiner_agent,
+        [],                              # kein Transkript: der kompakte Test steht im Prompt
+        settings.ANSWERS_DIR,
+        test=_stored_test(),
+        cohort_size=cohort_size or settings.COHORT_SIZE,
+        default_concurrency=concurrency or settings.MODEL_CONCURRENCY,
+        seed=settings.COHORT_SEED if seed is None else seed,        # reproduzierbare Fehleranzahl
+    )
+
+
+async def grade(answer_paths: list[str] = None, feedback: bool = None) -> list:
+    """Grade the current test's submissions deterministically; optionally add LLM feedback.
+
+    Answers parsed at submission time come from the answer store; sheets only present as
+    StudentN.txt files (runs from before the answer store) are parsed from disk.
+    """
+    from .answer_store import answer_store, current_test
+    from .mcq_grading import feedback_prompt, grade_cohort, load_answer_sheet, parse_answer_sheet
+    test = current_test()
+    key = answer_store.get(test, settings.model_answers_path().stem)
+    if answer_paths is None:
+        students = {r.student: r.answers for r in answer_store.submissions(test)}
+        if not students and answer_store.test(test) is None:   # ältere Läufe: nur Dateien vorhanden
+            answer_paths = sorted(str(p) for p in settings.ANSWERS_DIR.glob("Student*.txt"))
+    if answer_paths is not None:
+        students = {}
+        for path in answer_paths:
+            record = answer_store.lookup(path)
+            if record is not None:
+                students[record.student] = record.answers
+            elif Path(path).exists():
+                students[Path(path).stem] = parse_answer_sheet(Path(path).read_text(encoding="utf-8"))
+    model_answers = key.answers if key else None
+    if model_answers is None and settings.model_answers_path().exists():
+        model_answers = load_answer_sheet(str(settings.model_answers_path()))
+    if model_answers is None or not students:
+        missing = settings.model_answers_path().name if model_answers is None else "student answers"
+        print(f"Grading skipped (missing: {missing})")
+        return []
+    grades = grade_cohort(model_answers, students)
+    for result in grades:
+        print(result.report())
+        if settings.GRADE_FEEDBACK if feedback is None else feedback:   # optional: nur Formulierung per LLM
+            from .agents import feedback_agent
+            print((await feedback_agent.run(feedback_prompt(result))).output)
+    return grades
+
+
+async def ask(prompts: list[str], deps: bool = False, max_concurrency: int = 8) -> list[str]:
+    """Multiplex many independent supervisor sessions on one event loop."""
+    from .router import run_routed
+    from .streaming import scope
+    semaphore = asyncio.Semaphore(max_concurrency)   # Obergrenze gleichzeitiger Sitzungen
+
+    async def session(n: int, prompt: str) -> str:
+        async with semaphore:
+            with scope(f"#{n}" if len(prompts) > 1 else ""):   # gestreamte Tokens je Sitzung unterscheidbar
+                result = await run_routed(prompt, deps=deps)
+            return result.output
+
+    return await asyncio.gather(*(session(n, p) for n, p in enumerate(prompts, 1)))
+
+
+# ---------- Checkpoints ----------
+_HISTORY_STAGES = {"extract", "solve", "search", "test-gen", "answer-key"}   # speichern einen Verlauf
+
+
+def stage_inputs(stage: str) -> dict:
+    """Everything besides upstream results that determines a stage's output (part of its checkpoint key)."""
+    from . import agents
+    from .answer_store import current_test
+    from .checkpoints import file_digest, model_fingerprint
+    stage_agents = {
+        "extract": (agents.supervisor_agent, agents.pdf_extractor_agent),
+        "solve": (agents.supervisor_agent, agents.coder_agent, agents.code_executer_agent),
+        "search": (agents.supervisor_agent, agents.web_searcher_agent),
+        "test-gen": (agents.test_generator_agent,),
+        "answer-key": (),                # Musterlösung kommt aus der Fragenbank
+        "simulate": (agents.examiner_agent,),
+        "grade": (agents.feedback_agent,) if settings.GRADE_FEEDBACK else (),
+        "trick": (agents.supervisor_agent,),
+    }[stage]
+    inputs = {"prompt": PROMPTS.get(stage), "models": model_fingerprint(*stage_agents)}
+    if stage in ("extract", "test-gen"):
+        inputs["pdf"] = file_digest(settings.PDF_PATH)     # Inhalt, nicht Pfad
+    if stage == "test-gen":
+        from .question_bank import QUESTION_BANK_REUSE
+        inputs["reuse"] = QUESTION_BANK_REUSE
+    if stage in ("answer-key", "simulate", "grade"):
+        inputs["test"] = current_test()
+    if stage == "simulate":
+        inputs.update(cohort_size=settings.COHORT_SIZE, seed=settings.COHORT_SEED)
+    if stage == "grade":
+        inputs["feedback"] = settings.GRADE_FEEDBACK
+    return inputs
+
+
+def _encode_cohort(cohort) -> dict:
+    from dataclasses import asdict
+    return {"students": [asdict(s) for s in cohort.students], "wall_seconds": cohort.wall_seconds}
+
+
+def _decode_cohort(data: dict):
+    from .student_simulation import CohortReport, StudentRun
+    return CohortReport([StudentRun(**s) for s in data["students"]], data["wall_seconds"])
+
+
+def _cohort_stored(data: dict) -> bool:
+    from .answer_store import answer_store
+    return all(answer_store.exists(s["answer_path"]) for s in data["students"] if s["error"] is None)
+
+
+def _encode_grades(grades: list) -> list:
+    from dataclasses import asdict
+    return [asdict(g) for g in grades]
+
+
+def _decode_grades(data: list) -> list:
+    from .mcq_grading import GradeResult
+    grades = [GradeResult(**g) for g in data]
+    for result in grades:
+        print(result.report())
+    return grades
+
+
+def _test_stored(output) -> bool:
+    from .answer_store import answer_store, current_test
+    return answer_store.test(current_test()) is not None
+
+
+def _key_stored(output) -> bool:
+    from .answer_store import answer_store
+    return answer_store.exists(settings.model_answers_path())
+
+
+_CODECS = {                              # encode, decode, valid (Standard: Ausgabe-Text + Verlauf)
+    "test-gen": {"valid": _test_stored},
+    "answer-key": {"valid": _key_stored},
+    "simulate": {"encode": _encode_cohort, "decode": _decode_cohort, "valid": _cohort_stored},
+    "grade": {"encode": _encode_grades, "decode": _decode_grades},
+}
+
+
+async def checkpointed(stage: str, compute, force: bool = False, **inputs):
+    """Run ``compute`` unless the stage's checkpoint still matches its inputs and upstream results."""
+    from .checkpoints import checkpoints
+    from .resilience import retry_budget
+    with retry_budget(stage):            # alle Modell-/Tool-Aufrufe der Stufe teilen ein Budget
+        return await checkpoints.run(
+            stage, compute, {**stage_inputs(stage), **inputs},
+            upstream=STAGE_UPSTREAM.get(stage, ()),
+            history=settings.RUN_DIR / f"{stage}.messages.json" if stage in _HISTORY_STAGES else None,
+            force=force,
+            **_CODECS.get(stage, {}),
+        )
+
+
+async def resume_stage(stage: str, force: bool = False, **kwargs):
+    """Run one stage from the CLI through its checkpoint (upstream histories come from RUN_DIR)."""
+    compute = {
+        "extract": extract, "solve": solve, "search": search, "test-gen": generate_test,
+        "answer-key": write_answer_key, "simulate": simulate, "grade": grade,
+    }[stage]
+    return await checkpointed(stage, lambda: compute(**kwargs), force=force, **kwargs)
+
+
+# ---------- Gesamt-Pipeline ----------
+async def run_pipeline(resume: bool = True, rerun: Iterable[str] = ()) -> dict:
+    """Run the whole workflow, overlapping independent stages.
+
+    With ``resume`` stages whose checkpoint still matches are skipped; ``rerun`` forces
+    single stages (their dependents are recomputed only if the result changed).
+    """
+    from .checkpoints import StageResult
+    from .streaming import is_streaming, scope
+    rerun = set(rerun)
+
+    async def step(stage: str, compute):
+        with scope(stage):               # beim Streamen: Zeilen-Präfix je Stufe (Stufen laufen überlappend)
+            return await checkpointed(stage, compute, force=not resume or stage in rerun)
+
+    def show(label: str, result) -> None:
+        if not is_streaming() or isinstance(result, StageResult):   # gestreamt steht der Text schon da
+            print(*([label] if label else []), result.output)
+
+    async def task_chain():
+        # Schritte 1–3 bauen über die Historie aufeinander auf → sequenziell
+        task_result = await step("extract", lambda: extract(history=[]))
+        show("Run 1:", task_result)
+        solver_result = await step("solve", lambda: solve(history=task_result.new_messages()))
+        show("Run 2:", solver_result)
+        search_result = await step(
+            "search", lambda: search(history=task_result.new_messages() + solver_result.new_messages())
+        )
+        show("Run 3:", search_result)
+        return task_result, solver_result, search_result
+
+    async def test_chain():
+        # Testgenerierung ist unabhängig von Schritt 1–3 und läuft parallel dazu
+        test_result = await step("test-gen", generate_test)
+        show("Supervisor result 1: ", test_result)
+        answer_key = await step("answer-key", write_answer_key)
+        show("", answer_key)
+        cohort = await step("simulate", simulate)
+        for student in cohort.students:
+            print(f"[Student{student.student}] wrote -> {student.answer_path} "
+                  f"({student.mistakes} mistakes, {student.answer_seconds:.1f}s)")
+            print(student.error or student.output)
+        print(cohort.summary())
+        grades = await step("grade", lambda: grade([s.answer_path for s in cohort.students]))
+        return test_result, cohort, grades
+
+    (task_result, solver_result, search_result), (test_result, cohort, grades) = await asyncio.gather(
+        task_chain(), test_chain()
+    )
+    from .router import run_routed
+    # Begriffsfrage → Supervisor ohne Tools
+    trick = await step("trick", lambda: run_routed(PROMPTS["trick"]))
+    show("", trick)
+    trick_pdf = trick.output
+    return {
+        "task": task_result,
+        "solution": solver_result,
+        "web_search": search_result,
+        "test": test_result,
+        "cohort": cohort,
+        "grades": grades,
+        "trick_pdf": trick_pdf,
+    }
@@ -0,0 +1,182 @@
+"""Fragenbank für MCQ-Tests: strukturierte Fragen je Quelldokument, dedupliziert, Lösung getrennt.
+
+``test_generator_agent`` liefert Fragen als Objekte (Stamm, Optionen, Lösungsbuchstabe). Sie
+landen je Quell-PDF (Schlüssel: Inhalts-Hash) in einer SQLite-Tabelle; dieselbe Frage (gleicher
+Stamm nach Normalisierung) wird nur einmal gespeichert. Neue Tests werden ohne Modellaufruf aus
+der Bank zusammengestellt. Prüfer-Agenten bekommen nur ``Test.render()`` (ohne Lösungen), die
+Musterlösung ist ``Test.render_key()`` – ein eigener Löser-Lauf ist nicht mehr nötig.
+
+    QUESTION_BANK=questions.sqlite   Datei der Bank (Standard: ~/.cache/question_bank.sqlite)
+    QUESTION_BANK_REUSE=0            für jeden Test neue Fragen erzeugen (landen trotzdem in der Bank)
+"""
+import hashlib, json, os, random, re, sqlite3, threading, time   # Schlüssel, SQLite, Auswahl
+from dataclasses import dataclass        # Test-Container
+from pathlib import Path                 # Pfad-Objekte
+from typing import Optional              # Typ-Hinweise
+
+from pydantic import BaseModel, Field, model_validator   # Ausgabeschema des Generators
+
+QUESTION_BANK = Path(os.environ.get("QUESTION_BANK", "~/.cache/question_bank.sqlite")).expanduser()
+QUESTION_BANK_REUSE = os.environ.get("QUESTION_BANK_REUSE", "1") != "0"
+TEST_QUESTIONS = 5                       # Fragen je Test
+
+_LETTERS = "ABCDE"
+_OPTION_PREFIX = re.compile(r"^\s*\(?[A-Ea-e]\s*[).:]\s+")   # "A) ", "(b) ", "C. " vor einer Option
+_NOT_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+# ---------- Ausgabeschema des Generators ----------
+class MCQuestion(BaseModel):
+    """One multiple-choice question with the letter of its correct option."""
+    stem: str = Field(description="The question text, without the options")
+    options: list[str] = Field(min_length=2, max_length=5, description="Answer options without letters")
+    answer: str = Field(description="Letter of the correct option (A for the first option)")
+
+    @model_validator(mode="after")
+    def _check(self) -> "MCQuestion":
+        self.options = [_OPTION_PREFIX.sub("", o).strip() for o in self.options]
+        self.answer = self.answer.strip().strip("()").upper()[:1]
+        if self.answer not in _LETTERS[:len(self.options)]:   # Validierungsfehler → Agent versucht es erneut
+            raise ValueError(f"answer must be one of {', '.join(_LETTERS[:len(self.options)])}")
+        return self
+
+
+class GeneratedTest(BaseModel):
+    """Output type of test_generator_agent."""
+    questions: list[MCQuestion] = Field(min_length=1)
+
+
+# ---------- Tests aus der Bank ----------
+@dataclass(frozen=True)
+class Question:
+    """A bank question as students see it (no answer)."""
+    id: str
+    stem: str
+    options: tuple[str, ...]
+
+
+@dataclass
+class Test:
+    """Questions handed to examiners plus the answer key, kept apart."""
+    test_id: str
+    source: str
+    questions: list[Question]
+    key: dict[int, str]                  # Fragenummer → Buchstabe
+
+    def render(self) -> str:
+        """Compact test text for examiner agents (no answers)."""
+        lines = [f"MCQ test ({len(self.questions)} questions). Answer each with the number and letter, e.g. '1. B'."]
+        for n, question in enumerate(self.questions, 1):
+            lines.append(f"{n}. {question.stem}")
+            lines += [f"   {letter}) {option}" for letter, option in zip(_LETTERS, question.options)]
+        return "\n".join(lines)
+
+    def render_key(self) -> str:
+        """Model answers in the answer sheet format mcq_grading parses."""
+        return "Model Answers\n" + "\n".join(f"{n}. {letter}" for n, letter in sorted(self.key.items()))
+
+
+def question_id(stem: str) -> str:
+    """Dedup key: the stem without case, punctuation and extra whitespace."""
+    return hashlib.sha256(_NOT_WORD.sub(" ", stem.lower()).strip().encode()).hexdigest()[:16]
+
+
+def source_id(path) -> str:
+    """Source document key: content hash, so copies and renames share their questions."""
+    from .checkpoints import file_digest
+    return file_digest(path) or str(Path(path).resolve())
+
+
+class QuestionBank:
+    """SQLite bank of generated questions indexed by source document, plus the assembled tests."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or QUESTION_BANK)
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.added = self.duplicates = 0
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS questions ("
+                " source TEXT NOT NULL, id TEXT NOT NULL, stem TEXT NOT NULL, options TEXT NOT NULL,"
+                " answer TEXT NOT NULL, document TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (source, id))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tests (test_id TEXT PRIMARY KEY, source TEXT NOT NULL,"
+                " questions TEXT NOT NULL, created REAL NOT NULL)"
+            )
+        return self._db
+
+    # ---------- Fragen ----------
+    def add(self, document, questions: list[MCQuestion]) -> list[str]:
+        """Store generated questions for a source PDF; returns their ids (duplicates keep the first version)."""
+        source, now = source_id(document), time.time()
+        rows = [(source, question_id(q.stem), q.stem.strip(), json.dumps(q.options), q.answer, str(document), now)
+                for q in questions]
+        with self._lock:
+            before = self.db.total_changes
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.executemany("INSERT OR IGNORE INTO questions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.db.execute("COMMIT")
+            added = self.db.total_changes - before
+        self.added += added
+        self.duplicates += len(rows) - added
+        return list(dict.fromkeys(row[1] for row in rows))   # Reihenfolge wie generiert, ohne Doppelte
+
+    def count(self, document) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM questions WHERE source = ?", (source_id(document),)).fetchone()[0]
+
+    def _questions(self, source: str, ids: Optional[list[str]] = None) -> dict[str, tuple[Question, str]]:
+        sql, params = "SELECT id, stem, options, answer FROM questions WHERE source = ?", (source,)
+        with self._lock:
+            rows = self.db.execute(sql, params).fetchall()
+        found = {i: (Question(i, stem, tuple(json.loads(options))), answer) for i, stem, options, answer in rows}
+        return found if ids is None else {i: found[i] for i in ids if i in found}
+
+    # ---------- Tests ----------
+    def assemble(self, test_id: str, document, n: int = TEST_QUESTIONS, ids: Optional[list[str]] = None,
+                 seed: Optional[int] = None) -> Optional[Test]:
+        """Build and store a test from the bank (given ids, or n random questions); None if the bank has too few."""
+        source = source_id(document)
+        found = self._questions(source, ids)
+        if ids is None:
+            if len(found) < n:
+                return None
+            found = {i: found[i] for i in random.Random(seed).sample(sorted(found), n)}
+        test = Test(test_id, source, [q for q, _ in found.values()],
+                    {number: answer for number, (_, answer) in enumerate(found.values(), 1)})
+        with self._lock:
+            self.db.execute("INSERT OR REPLACE INTO tests VALUES (?, ?, ?, ?)",
+                            (test_id, source, json.dumps(list(found)), time.time()))
+        return test
+
+    def test(self, test_id: str) -> Optional[Test]:
+        """A stored test with its answer key (None for tests that were never built from the bank)."""
+        with self._lock:
+            row = self.db.execute("SELECT source, questions FROM tests WHERE test_id = ?", (test_id,)).fetchone()
+        if row is None:
+            return None
+        found = self._questions(row[0], json.loads(row[1]))
+        return Test(test_id, row[0], [q for q, _ in found.values()],
+                    {number: answer for number, (_, answer) in enumerate(found.values(), 1)})
+
+    def stats(self) -> dict:
+        with self._lock:
+            questions, sources = self.db.execute("SELECT COUNT(*), COUNT(DISTINCT source) FROM questions").fetchone()
+        return {"questions": questions, "sources": sources, "added": self.added, "duplicates": self.duplicates}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+question_bank = QuestionBank()           # gemeinsame Bank (siehe $QUESTION_BANK)
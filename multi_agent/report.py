@@ -0,0 +1,32 @@
+"""Kennzahlen aller Komponenten an einer Stelle (``--stats`` der CLI, ``/stats`` des Servers)."""
+import json                              # eine Zeile je Komponente
+
+
+def stats() -> dict:
+    """Counters of caches, connections, scheduler, history compaction, fast path, question bank and retries."""
+    from .fast_path import coder_fast_path
+    from .history import history_compactor
+    from .llm_cache import llm_cache
+    from .model_registry import registry
+    from .question_bank import question_bank
+    from .resilience import resilience
+    from .scheduler import model_scheduler
+    return {
+        "llm_cache": llm_cache.stats(),
+        "registry": registry.stats(),
+        "scheduler": model_scheduler.stats(),
+        "history": history_compactor.stats(),
+        "coder_fast_path": coder_fast_path.stats(),
+        # Bank nur auswerten, wenn es sie gibt (sonst legte die Abfrage eine leere Datei an)
+        "question_bank": question_bank.stats() if question_bank.path.exists() else {},
+        "resilience": resilience.stats(),
+    }
+
+
+def report() -> str:
+    """stats() as one line per component, plus the metrics summary if metrics are recorded."""
+    from .metrics import metrics
+    lines = [f"{name}: {json.dumps(value, default=str)}" for name, value in stats().items()]
+    if metrics.enabled:
+        lines.append("metrics:\n" + metrics.report())
+    return "\n".join(lines)
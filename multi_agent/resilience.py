@@ -0,0 +1,305 @@
+"""Zentrale Fehlerbehandlung: Fehler einordnen, mit Backoff wiederholen, Budget je Anfrage, Circuit-Breaker.
+
+Bisher hatte jede Ebene eigene Wiederholungen (OpenAI-SDK, Executor-Schleife, Modell bei Tool-
+Fehlertexten); ein ausgefallenes Modell oder Such-Backend vervielfachte sich so zu Dutzenden
+nutzloser Aufrufe. Jetzt gilt für Modelle (``ResilientModel`` in der Registry), Websuche und
+Code-Executor dieselbe Regel:
+
+* nur transiente Fehler (Verbindung, Timeout, 429/5xx, abgestürzter Worker) werden wiederholt,
+  deterministische (4xx, Validierung, Codefehler) sofort weitergegeben;
+* Wartezeit exponentiell mit Jitter (``RETRY_BASE_DELAY`` · 2^n, höchstens ``RETRY_MAX_DELAY``);
+* alle Aufrufe einer Anfrage (Supervisor-Sitzung, Stufe, Studierende/r) teilen ein Budget von
+  ``RETRY_BUDGET`` Wiederholungen (``retry_budget()``);
+* je Modell/Backend ein Circuit-Breaker: nach ``BREAKER_THRESHOLD`` transienten Fehlern in Folge
+  schlagen Aufrufe ``BREAKER_RESET`` Sekunden lang sofort fehl, danach prüft ein einzelner Aufruf.
+
+Zeit in fehlgeschlagenen Versuchen und Wartezeiten steht in den Metriken (``retry_seconds`` je
+Ziel und Anfrage) und in ``resilience.stats()``.
+
+    RETRY_MAX_ATTEMPTS=3   Versuche je Aufruf
+    RETRY_BUDGET=6         Wiederholungen je Anfrage (alle Aufrufe zusammen)
+    RETRY_BASE_DELAY=0.5   Sekunden vor der ersten Wiederholung
+    RETRY_MAX_DELAY=8      Obergrenze der Wartezeit
+    BREAKER_THRESHOLD=5    transiente Fehler in Folge bis zum Öffnen (0 = kein Breaker)
+    BREAKER_RESET=30       Sekunden, die ein offener Breaker sofort ablehnt
+"""
+import asyncio, os, random, threading, time  # Wartezeiten, Umgebungsvariablen, Jitter, Sperren
+from collections import defaultdict      # Kennzahlen je Ziel
+from contextlib import contextmanager    # Budget-Bereich
+from contextvars import ContextVar       # Budget der laufenden Anfrage (auch in Tool-Threads)
+from dataclasses import dataclass        # Budget/Kennzahlen
+from typing import Any, Awaitable, Callable, Optional  # Typ-Hinweise
+
+from .metrics import metrics             # Wiederholungen, Wartezeit, Breaker-Zustand
+
+RETRY_MAX_ATTEMPTS = int(os.environ.get("RETRY_MAX_ATTEMPTS", 3))
+RETRY_BUDGET = int(os.environ.get("RETRY_BUDGET", 6))
+RETRY_BASE_DELAY = float(os.environ.get("RETRY_BASE_DELAY", 0.5))
+RETRY_MAX_DELAY = float(os.environ.get("RETRY_MAX_DELAY", 8))
+BREAKER_THRESHOLD = int(os.environ.get("BREAKER_THRESHOLD", 5))
+BREAKER_RESET = float(os.environ.get("BREAKER_RESET", 30))
+
+TRANSIENT_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+# Klassennamen statt Importe (openai, httpx, ddgs werden nur bei Bedarf geladen)
+_TRANSIENT_NAMES = {
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",   # openai
+    "TimeoutException", "NetworkError", "RemoteProtocolError", "PoolTimeout",           # httpx
+    "RatelimitException",                                                              # ddgs
+}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the target while its circuit breaker is open."""
+
+    def __init__(self, key: str, retry_in: float):
+        super().__init__(f"{key} is unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.key = key
+        self.retry_in = retry_in
+
+
+def classify(error: BaseException) -> str:
+    """'transient' if repeating the same call may succeed, otherwise 'deterministic'."""
+    if isinstance(error, CircuitOpenError):
+        return "deterministic"           # schnell scheitern, nicht erneut anklopfen
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return "transient" if status in TRANSIENT_STATUS else "deterministic"
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return "transient"
+    if any(cls.__name__ in _TRANSIENT_NAMES for cls in type(error).__mro__):
+        return "transient"
+    return "deterministic"
+
+
+@dataclass
+class RetryBudget:
+    """Retries left for one request, shared by all model/tool calls it makes."""
+    label: str
+    remaining: int
+    retries: int = 0
+    seconds: float = 0.0                 # Zeit in fehlgeschlagenen Versuchen + Backoff
+    exhausted: bool = False
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                self.exhausted = True
+                return False
+            self.remaining -= 1
+            self.retries += 1
+            return True
+
+    def spent(self, seconds: float) -> None:
+        with self._lock:
+            self.seconds += seconds
+
+
+_budget: ContextVar[Optional[RetryBudget]] = ContextVar("retry_budget", default=None)
+
+
+@contextmanager
+def retry_budget(label: str, retries: Optional[int] = None, separate: bool = False):
+    """Give the calls made inside this block one shared retry budget.
+
+    Nested blocks keep the outer budget unless ``separate`` (e.g. one budget per simulated student
+    instead of one for the whole cohort).
+    """
+    if _budget.get() is not None and not separate:
+        yield _budget.get()
+        return
+    budget = RetryBudget(label, RETRY_BUDGET if retries is None else retries)
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+        if budget.retries:
+            metrics.event("retry_budget", scope=label, retries=budget.retries, seconds=budget.seconds,
+                          exhausted=budget.exhausted)
+
+
+class CircuitBreaker:
+    """Closed → open after `threshold` transient failures in a row → half-open after `reset` seconds."""
+
+    def __init__(self, key: str, threshold: int = BREAKER_THRESHOLD, reset: float = BREAKER_RESET):
+        self.key = key
+        self.threshold = threshold
+        self.reset = reset
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.opens = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset else "open"
+
+    def before(self) -> None:
+        """Raise CircuitOpenError unless a call may go through (one probe at a time when half-open)."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited < self.reset or self._probing:
+                metrics.inc("breaker_rejected_total", target=self.key)
+                raise CircuitOpenError(self.key, max(0.0, self.reset - waited))
+            self._probing = True         # halb offen: genau ein Probeaufruf
+
+    def release(self) -> None:
+        """End a probe that neither succeeded nor failed (cancelled), so the next call may probe again."""
+        with self._lock:
+            self._probing = False
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.threshold and (self._probing or self.failures >= self.threshold):
+                if self.opened_at is None or self._probing:
+                    self.opens += 1
+                    metrics.inc("breaker_opened_total", target=self.key)
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class Resilience:
+    """Retry policy, per-request budgets and circuit breakers shared by models, search and executor."""
+
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY, threshold: int = BREAKER_THRESHOLD, reset: float = BREAKER_RESET):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.threshold = threshold
+        self.reset = reset
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.counters: dict[str, dict] = defaultdict(
+            lambda: {"calls": 0, "failures": 0, "retries": 0, "retry_seconds": 0.0, "budget_exhausted": 0}
+        )
+        self.scopes: dict[str, dict] = defaultdict(lambda: {"retries": 0, "retry_seconds": 0.0})
+        self._lock = threading.Lock()
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            if key not in self.breakers:
+                self.breakers[key] = CircuitBreaker(key, self.threshold, self.reset)
+            return self.breakers[key]
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before retry number `attempt` (1-based): exponential with equal jitter."""
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    def _count(self, key: str, field: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[key][field] += value
+
+    def _failed(self, key: str, error: Optional[BaseException], reason: str, seconds: float, attempt: int) -> Optional[float]:
+        """Book a failed attempt; returns the backoff delay if it should be retried, else None."""
+        transient = error is None or classify(error) == "transient"   # None: Ergebnis als transient gemeldet
+        self._count(key, "failures")
+        if transient:
+            self.breaker(key).failure()
+        else:                            # Ziel hat geantwortet (z. B. 400) → gilt als erreichbar
+            self.breaker(key).success()
+        budget = _budget.get()
+        scope = budget.label if budget else "-"
+        retry = transient and attempt < self.max_attempts and self.breaker(key).state == "closed"
+        if retry and budget is not None and not budget.take():
+            self._count(key, "budget_exhausted")
+            metrics.inc("retry_budget_exhausted_total", target=key, scope=scope)
+            retry = False
+        wait = self.delay(attempt) if retry else 0.0
+        spent = seconds + wait           # fehlgeschlagener Versuch + Wartezeit bis zum nächsten
+        if budget is not None:
+            budget.spent(spent)
+        with self._lock:
+            self.counters[key]["retry_seconds"] += spent
+            self.scopes[scope]["retry_seconds"] += spent
+            if retry:
+                self.counters[key]["retries"] += 1
+                self.scopes[scope]["retries"] += 1
+        metrics.observe("retry_seconds", spent, target=key, scope=scope)
+        if retry:
+            metrics.inc("retries_total", target=key, reason=reason)
+        return wait if retry else None
+
+    async def acall(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn() with retries for transient errors (backoff, shared budget, breaker for key)."""
+        breaker = self.breaker(key)
+        attempt = 0
+        while True:
+            attempt += 1
+            breaker.before()
+            self._count(key, "calls")
+            start = time.perf_counter()
+            try:
+                result = await fn()
+            except Exception as e:
+                wait = self._failed(key, e, type(e).__name__, time.perf_counter() - start, attempt)
+                if wait is None:
+                    raise
+                await asyncio.sleep(wait)
+                continue
+            except BaseException:        # abgebrochen (CancelledError, Timeout des Servers): Probe freigeben
+                breaker.release()
+                raise
+            breaker.success()
+            return result
+
+    def call(self, key: str, fn: Callable[[], Any], transient_result: Optional[Callable[[Any], Optional[str]]] = None) -> Any:
+        """Synchronous variant (threads); ``transient_result`` names a reason if a returned result is a transient failure."""
+        breaker = self.breaker(key)
+        attempt = 0
+        while True:
+            attempt += 1
+            breaker.before()
+            self._count(key, "calls")
+            start = time.perf_counter()
+            try:
+                result = fn()
+            except Exception as e:
+                wait = self._failed(key, e, type(e).__name__, time.perf_counter() - start, attempt)
+                if wait is None:
+                    raise
+                time.sleep(wait)
+                continue
+            except BaseException:        # z. B. KeyboardInterrupt: Probe freigeben
+                breaker.release()
+                raise
+            reason = transient_result(result) if transient_result else None
+            if reason is None:
+                breaker.success()
+                return result
+            wait = self._failed(key, None, reason, time.perf_counter() - start, attempt)
+            if wait is None:
+                return result            # letztes Ergebnis (z. B. "crashed") an den Aufrufer
+            time.sleep(wait)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "targets": {k: dict(v, breaker=self.breakers[k].state if k in self.breakers else "closed")
+                            for k, v in self.counters.items()},
+                "scopes": {k: dict(v) for k, v in self.scopes.items()},
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.scopes.clear()
+            self.breakers.clear()
+
+
+resilience = Resilience()                # gemeinsame Regeln, Breaker und Zähler (siehe $RETRY_*, $BREAKER_*)
@@ -0,0 +1,194 @@
+"""Deterministischer Vor-Router vor dem Supervisor-LLM.
+
+Eindeutige Anfragen gehen ohne Supervisor-Aufruf direkt an das passende Tool: erst Regeln
+(reguläre Ausdrücke), dann ein kleiner lokaler Naive-Bayes-Klassifikator mit Konfidenz.
+Nur unklare Fälle laufen über den Supervisor. Jede Entscheidung landet in ``metrics``
+(Zähler, Latenz je Weg, JSONL-Event), damit Zeitersparnis und Trefferquote messbar sind.
+
+    ROUTER=0                   immer den Supervisor fragen
+    ROUTER_THRESHOLD=0.8       Mindest-Konfidenz des Klassifikators für eine direkte Route
+"""
+import math, os, re, time                # Log-Wahrscheinlichkeiten, Umgebungsvariablen, Regeln, Zeitmessung
+from collections import Counter          # Wortzählungen je Klasse
+from dataclasses import dataclass        # Ergebnis-Container
+from typing import Optional              # Typ-Hinweise
+
+from .metrics import metrics             # Zähler/Histogramme/Events
+from .resilience import retry_budget     # Wiederholungsbudget je Anfrage
+
+ROUTER = os.environ.get("ROUTER", "1") != "0"
+ROUTER_THRESHOLD = float(os.environ.get("ROUTER_THRESHOLD", 0.8))
+CONTEXT_CHARS = 4000                     # Obergrenze für mitgegebenen Kontext aus früheren Stufen
+
+ANSWER = "answer"                        # kein Tool nötig (z. B. Begriffsfrage) → Supervisor ohne Tools
+SUPERVISOR = "supervisor"                # unklar → Supervisor-LLM entscheidet
+TOOLS = ("pdf_extractor_tool", "coder_tool", "web_search_tool")
+
+# Reihenfolge egal: widersprechen sich Tool-Regeln, entscheidet der Supervisor; Begriffsfragen haben Vorrang
+_RULES = [
+    (ANSWER, "definition", re.compile(
+        r"\bwhat\s+(does|do)\s+(an?\s+|the\s+)?[\w.+#-]+\s+(mean|stand\s+for)\b"
+        r"|\b(meaning|definition)\s+of\b|\bwas\s+(bedeutet|heißt)\b"
+        r"|^\s*what\s+is\s+(an?\s+)?[\w.+#-]+\s*\??\s*$", re.I)),
+    ("pdf_extractor_tool", "pdf", re.compile(r"\b(pdf|document|dokument)\b", re.I)),
+    ("web_search_tool", "web", re.compile(
+        r"\b(search|look\s+up|google|browse|suche?)\b.*\b(web|internet|online)\b"
+        r"|\bwebsites?\b|\bweb\s*search\b", re.I)),
+    ("coder_tool", "code", re.compile(
+        r"\b(solve|execute|run|write|implement|debug|fix|löse|schreibe)\b.*"
+        r"\b(code|python|program|script|function|task|aufgabe)\b|```", re.I)),
+]
+
+# Kleine Trainingsmenge für den Klassifikator (Fälle ohne Regeltreffer)
+_EXAMPLES = {
+    "pdf_extractor_tool": [
+        "what is in the file", "summarize the lecture notes", "read the worksheet",
+        "which exercise is given in the handout", "generate a quiz from the slides",
+        "what does the script say about loops", "extract the exercise from the file",
+    ],
+    "coder_tool": [
+        "print the numbers 0 to 4 with a loop", "how do I reverse a list in python",
+        "compute the factorial of 10", "sort this list of numbers", "fix this error in my loop",
+        "implement bubble sort", "calculate fibonacci numbers",
+    ],
+    "web_search_tool": [
+        "find tutorials about for loops", "latest news about python releases",
+        "recommend resources to learn programming", "find links about recursion",
+        "who won the world cup", "current weather in berlin", "find articles on machine learning",
+    ],
+    ANSWER: [
+        "hello", "thanks", "explain what an acronym is", "tell me a joke", "how are you",
+        "what is your name", "who are you",
+    ],
+}
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+class NaiveBayes:
+    """Multinomial naive Bayes over words (Laplace smoothing, uniform prior)."""
+
+    def __init__(self, examples: dict[str, list[str]]):
+        self.counts = {label: Counter(w for text in texts for w in _words(text)) for label, texts in examples.items()}
+        self.totals = {label: sum(c.values()) for label, c in self.counts.items()}
+        self.vocab = len(set().union(*self.counts.values()))
+
+    def predict(self, text: str) -> tuple[str, float]:
+        """Most likely label and its posterior probability."""
+        words = [w for w in _words(text) if any(w in c for c in self.counts.values())]   # unbekannte Wörter ignorieren
+        if not words:
+            return SUPERVISOR, 0.0
+        logp = {label: sum(math.log((c[w] + 1) / (self.totals[label] + self.vocab)) for w in words)
+                for label, c in self.counts.items()}
+        best = max(logp, key=logp.get)
+        norm = sum(math.exp(v - logp[best]) for v in logp.values())
+        return best, 1.0 / norm
+
+
+@dataclass
+class Route:
+    target: str                          # Tool-Name, ANSWER oder SUPERVISOR
+    confidence: float
+    reason: str                          # z. B. "rule:pdf", "classifier", "rules disagree"
+
+    @property
+    def direct(self) -> bool:
+        return self.target in TOOLS
+
+
+class Router:
+    """Rules first, then the classifier; below the threshold the supervisor decides."""
+
+    def __init__(self, threshold: float = ROUTER_THRESHOLD, enabled: bool = ROUTER):
+        self.threshold = threshold
+        self.enabled = enabled
+        self.classifier = NaiveBayes(_EXAMPLES)
+
+    def route(self, prompt: str) -> Route:
+        if not self.enabled:
+            return Route(SUPERVISOR, 0.0, "disabled")
+        hits = {target: name for target, name, pattern in _RULES if pattern.search(prompt)}
+        if ANSWER in hits:
+            return Route(ANSWER, 1.0, f"rule:{hits[ANSWER]}")
+        if len(hits) == 1:
+            (target, name), = hits.items()
+            return Route(target, 1.0, f"rule:{name}")
+        if len(hits) > 1:                # mehrere Tools denkbar → Supervisor plant die Reihenfolge
+            return Route(SUPERVISOR, 0.0, "rules disagree: " + ",".join(sorted(hits)))
+        label, confidence = self.classifier.predict(prompt)
+        if confidence >= self.threshold:
+            return Route(label, confidence, "classifier")
+        return Route(SUPERVISOR, confidence, f"low confidence ({label})")
+
+    def record(self, prompt: str, route: Route, seconds: float) -> None:
+        """Count the decision and its latency per path; log it as a JSONL event."""
+        metrics.inc("router_decisions_total", target=route.target, reason=route.reason.split(":")[0])
+        metrics.observe("router_path_seconds", seconds, target=route.target)
+        metrics.event("route", prompt=prompt[:120], target=route.target, confidence=round(route.confidence, 3),
+                      reason=route.reason, seconds=round(seconds, 4))
+
+    def evaluate(self, labelled: list[tuple[str, str]]) -> dict:
+        """Accuracy on (prompt, expected target) pairs; fallbacks to the supervisor are counted separately."""
+        routes = [(self.route(prompt), expected) for prompt, expected in labelled]
+        decided = [(r, e) for r, e in routes if r.target != SUPERVISOR]
+        return {
+            "n": len(routes),
+            "accuracy": sum(r.target == e for r, e in routes) / len(routes) if routes else 0.0,
+            "decided": len(decided),
+            "decided_accuracy": sum(r.target == e for r, e in decided) / len(decided) if decided else 0.0,
+            "fallbacks": len(routes) - len(decided),
+        }
+
+
+def _context(history: list) -> str:
+    """Last tool result or answer of the history (what "the task"/"the topic" in the prompt refers to)."""
+    from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, ToolReturnPart
+    for message in reversed(history or []):
+        parts = message.parts
+        if isinstance(message, ModelRequest):
+            texts = [p.model_response_str() for p in parts if isinstance(p, ToolReturnPart)]
+        elif isinstance(message, ModelResponse):
+            texts = [p.content for p in parts if isinstance(p, TextPart)]
+        else:
+            continue
+        if texts:
+            return "\n".join(texts)[:CONTEXT_CHARS]
+    return ""
+
+
+async def run_routed(prompt: str, deps: bool = False, message_history: Optional[list] = None):
+    """Supervisor run with the pre-router in front: clear cases call the tool directly."""
+    history = list(message_history or [])
+    route = router.route(prompt)
+    start = time.perf_counter()
+    with retry_budget("ask"):            # eine Anfrage = ein Wiederholungsbudget (in Stufen: das der Stufe)
+        result = await _run_route(route, prompt, deps, history)
+    router.record(prompt, route, time.perf_counter() - start)
+    return result
+
+
+async def _run_route(route: Route, prompt: str, deps: bool, history: list):
+    from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+    from .agents import supervisor_agent
+    from .streaming import PassThroughResult, run_supervisor
+    from .tools import DIRECT_TOOLS, PASS_THROUGH_TOOLS, supervisor_toolset
+    if route.direct:                     # kein Supervisor-Hop; Bezug auf frühere Stufen als Kontext mitgeben
+        context = _context(history)
+        argument = f"{prompt}\n\nContext:\n{context}" if context else prompt
+        output = await DIRECT_TOOLS[route.target](argument, deps)
+        messages = [*history, ModelRequest(parts=[UserPromptPart(prompt)]),
+                    ModelResponse(parts=[TextPart(output)], model_name="router")]
+        result = PassThroughResult(output, messages, len(history))
+    elif route.target == ANSWER:         # Begriffsfrage: ohne Tools, kann nicht fehlgeleitet werden
+        result = await run_supervisor(supervisor_agent, prompt, set(), deps=deps, message_history=history)
+    else:
+        result = await run_supervisor(
+            supervisor_agent, prompt, PASS_THROUGH_TOOLS,
+            deps=deps, toolsets=[supervisor_toolset], message_history=history,
+        )
+    return result
+
+
+router = Router()                        # gemeinsamer Router (siehe $ROUTER, $ROUTER_THRESHOLD)
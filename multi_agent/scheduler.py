@@ -0,0 +1,255 @@
+"""Modell-Affinität: Aufrufe an dasselbe Modell bündeln, damit Ollama seltener Modelle tauscht.
+
+Hält Ollama wegen knappem (V)RAM nur wenige Modelle gleichzeitig, kostet jeder Wechsel Sekunden.
+``ScheduledModel`` (in der Registry um jedes Modell gelegt) meldet jeden Aufruf hier an: Aufrufe an
+geladene Modelle laufen sofort, alle anderen warten, bis ein geladenes Modell nichts mehr zu tun hat,
+und werden dann gemeinsam bedient (das Modell mit den meisten Wartenden zuerst). Abhängigkeiten
+bleiben erhalten, weil jeder Aufruf erst angemeldet wird, wenn sein Aufrufer ihn wirklich braucht;
+gebündelt wird über gleichzeitige Sitzungen, Studierende und Stufen hinweg.
+
+    OLLAMA_MAX_LOADED_MODELS=1   gleichzeitig geladene Modelle (wie bei Ollama); ungesetzt = nicht bündeln
+    MODEL_KEEP_ALIVE=10m        keep_alive-Hinweis beim Laden/Vorwärmen (Ollama-API /api/generate)
+    MODEL_MAX_HOLD=30           Sekunden, die ein wartendes Modell höchstens zurückgestellt wird
+
+Unabhängig davon begrenzt ``set_limits`` die gleichzeitigen Aufrufe je Modell (z. B. im Server).
+"""
+import asyncio, os, time                 # Warteschlangen, Umgebungsvariablen, Zeitmessung
+from collections import OrderedDict, defaultdict, deque  # geladene Modelle (LRU), Wartende je Modell
+from contextlib import asynccontextmanager  # Slot als async-Kontextmanager
+from dataclasses import asdict, dataclass  # Kennzahlen je Modell
+from typing import AsyncIterator, Optional  # Typ-Hinweise
+
+from pydantic_ai.messages import ModelMessage, ModelResponse
+from pydantic_ai.models import ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+
+from .metrics import metrics             # Wechsel/Ladezeit auch als Metrik
+
+MAX_LOADED_MODELS = int(os.environ.get("OLLAMA_MAX_LOADED_MODELS") or 0)
+KEEP_ALIVE = os.environ.get("MODEL_KEEP_ALIVE", "10m")
+MAX_HOLD = float(os.environ.get("MODEL_MAX_HOLD", 30))
+
+
+@dataclass
+class ModelUsage:
+    calls: int = 0
+    loads: int = 0
+    load_seconds: float = 0.0            # von Ollama gemeldete load_duration
+    wait_seconds: float = 0.0            # Wartezeit im Scheduler
+
+
+class ModelScheduler:
+    """Admits model calls so that calls to already loaded models go first (see module docstring)."""
+
+    def __init__(self, max_loaded: int = MAX_LOADED_MODELS, keep_alive: str = KEEP_ALIVE,
+                 max_hold: float = MAX_HOLD):
+        self.max_loaded = max_loaded     # 0 = nur zählen, nicht bündeln
+        self.keep_alive = keep_alive
+        self.max_hold = max_hold
+        self.usage: dict[str, ModelUsage] = defaultdict(ModelUsage)
+        self.switches = 0
+        self._loaded: OrderedDict[str, None] = OrderedDict()   # älteste zuerst
+        self._loading: set[str] = set()
+        self._in_flight: dict[str, int] = defaultdict(int)
+        self._waiting: dict[str, deque] = defaultdict(deque)   # (Ankunft, Future) je Modell
+        self._last: Optional[str] = None # ohne Bündelung: Wechsel in Aufrufreihenfolge
+        self.limits: dict[str, int] = {}  # gleichzeitige Aufrufe je Modell (0/fehlend = unbegrenzt)
+        self.default_limit = 0
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def set_limits(self, default: int = 0, per_model: Optional[dict[str, int]] = None) -> None:
+        """Cap concurrent requests per model (default for all models, overrides per model name)."""
+        self.default_limit = default
+        self.limits = dict(per_model or {})
+        self._semaphores.clear()
+
+    def _semaphore(self, model: str) -> Optional[asyncio.Semaphore]:
+        limit = self.limits.get(model, self.default_limit)
+        if limit <= 0:
+            return None
+        if model not in self._semaphores:
+            self._semaphores[model] = asyncio.Semaphore(limit)
+        return self._semaphores[model]
+
+    # ---------- Anmeldung ----------
+    @asynccontextmanager
+    async def slot(self, model: str):
+        """Hold a model slot for one request (waits for the model's concurrency limit and for other models)."""
+        semaphore = self._semaphore(model)
+        if semaphore is None:
+            async with self._admit(model):
+                yield
+            return
+        start = time.perf_counter()
+        async with semaphore:            # erst das Limit, dann die Ladeplanung (in_flight = echte Aufrufe)
+            metrics.observe("model_limit_wait_seconds", time.perf_counter() - start, model=model)
+            async with self._admit(model):
+                yield
+
+    @asynccontextmanager
+    async def _admit(self, model: str):
+        start = time.perf_counter()
+        usage = self.usage[model]
+        usage.calls += 1
+        if self.max_loaded <= 0:
+            self._count_order(model)
+            yield
+            return
+        if self._admissible(model, start):
+            self._in_flight[model] += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            entry = (start, future)
+            self._waiting[model].append(entry)
+            self._dispatch()
+            try:
+                await future             # beim Freigeben wurde _in_flight schon erhöht
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release(model)
+                elif entry in self._waiting[model]:
+                    self._waiting[model].remove(entry)
+                raise
+        usage.wait_seconds += time.perf_counter() - start
+        try:
+            yield
+        finally:
+            self._release(model)
+
+    def _release(self, model: str) -> None:
+        self._in_flight[model] -= 1
+        if model in self._loaded:
+            self._loaded.move_to_end(model)  # zuletzt benutzt → zuletzt verdrängt
+        self._dispatch()
+
+    def _count_order(self, model: str) -> None:
+        if model != self._last:
+            if self._last is not None:
+                self.switches += 1
+                metrics.inc("model_switches_total", model=model)
+            self._last = model
+
+    def _starving(self, now: float) -> bool:
+        """Some unloaded model has waited longer than max_hold."""
+        return any(queue and now - queue[0][0] > self.max_hold
+                   for model, queue in self._waiting.items() if model not in self._loaded)
+
+    def _admissible(self, model: str, now: float) -> bool:
+        """Loaded and idle-able: run now. Unloaded models always go through _dispatch (load first)."""
+        if model not in self._loaded or model in self._loading:
+            return False
+        return not self._starving(now)   # sonst neue Aufrufe zurückhalten, damit das Modell frei wird
+
+    def _dispatch(self) -> None:
+        now = time.perf_counter()
+        starving = self._starving(now)
+        for model in list(self._loaded):     # Wartende geladener Modelle sofort bedienen
+            if model not in self._loading and not starving:
+                self._wake(model)
+        candidates = sorted(
+            (m for m, q in self._waiting.items() if q and m not in self._loaded),
+            key=lambda m: (-len(self._waiting[m]), self._waiting[m][0][0]),   # größter Stapel, dann ältester
+        )
+        for model in candidates:
+            if len(self._loaded) >= self.max_loaded:
+                idle = [m for m in self._loaded if self._in_flight[m] == 0 and m not in self._loading
+                        and (starving or not self._waiting[m])]
+                if not idle:
+                    return
+                del self._loaded[idle[0]]    # am längsten unbenutztes Modell verdrängen
+                self.switches += 1
+            self._loaded[model] = None
+            self._loading.add(model)
+            asyncio.get_running_loop().create_task(self._load(model))
+
+    def _wake(self, model: str) -> None:
+        queue = self._waiting[model]
+        while queue:
+            _, future = queue.popleft()
+            if not future.done():
+                self._in_flight[model] += 1
+                future.set_result(None)
+
+    async def _load(self, model: str) -> None:
+        try:
+            seconds = await self.warm(model)
+            usage = self.usage[model]
+            usage.loads += 1
+            metrics.inc("model_loads_total", model=model)
+            if seconds is not None:      # sonst lädt Ollama beim ersten Aufruf (Zeit steckt dann darin)
+                usage.load_seconds += seconds
+                metrics.observe("model_load_seconds", seconds, model=model)
+        finally:
+            self._loading.discard(model)
+            self._dispatch()
+
+    # ---------- Vorwärmen ----------
+    async def warm(self, model: str, keep_alive: Optional[str] = None) -> Optional[float]:
+        """Load a model via Ollama's /api/generate (empty prompt) with a keep-alive hint.
+
+        Returns Ollama's load_duration in seconds, or None if the endpoint does not report it.
+        """
+        from .model_registry import registry
+        url = registry.base_url.rstrip("/").removesuffix("/v1") + "/api/generate"
+        try:
+            response = await registry.http_client.post(
+                url, json={"model": model, "keep_alive": keep_alive or self.keep_alive}
+            )
+            response.raise_for_status()
+            return response.json().get("load_duration", 0) / 1e9
+        except Exception:                # kein Ollama-Endpunkt: lädt dann beim ersten Aufruf
+            return None
+
+    async def prewarm(self, models: list[str], keep_alive: Optional[str] = None) -> dict[str, Optional[float]]:
+        """Load models before the first call (e.g. the first stage's model) and mark them loaded."""
+        loaded = {}
+        for model in models[:self.max_loaded] if self.max_loaded else models:
+            loaded[model] = seconds = await self.warm(model, keep_alive)
+            self.usage[model].loads += 1
+            self.usage[model].load_seconds += seconds or 0.0
+            if self.max_loaded and len(self._loaded) < self.max_loaded:
+                self._loaded[model] = None
+        return loaded
+
+    # ---------- Auswertung ----------
+    def stats(self) -> dict:
+        return {
+            "max_loaded": self.max_loaded,
+            "limits": {"default": self.default_limit, **self.limits},
+            "switches": self.switches,
+            "load_seconds": round(sum(u.load_seconds for u in self.usage.values()), 3),
+            "wait_seconds": round(sum(u.wait_seconds for u in self.usage.values()), 3),
+            "models": {m: asdict(u) for m, u in self.usage.items()},
+        }
+
+    def reset(self) -> None:
+        self.usage.clear()
+        self.switches = 0
+        self._last = None
+
+
+class ScheduledModel(WrapperModel):
+    """Model wrapper that takes a scheduler slot for every request."""
+
+    def __init__(self, wrapped, scheduler: Optional[ModelScheduler] = None):
+        super().__init__(wrapped)
+        self.scheduler = scheduler or model_scheduler
+
+    async def request(self, messages: list[ModelMessage], model_settings: Optional[ModelSettings],
+                      model_request_parameters: ModelRequestParameters) -> ModelResponse:
+        async with self.scheduler.slot(self.model_name):
+            return await self.wrapped.request(messages, model_settings, model_request_parameters)
+
+    @asynccontextmanager
+    async def request_stream(self, messages: list[ModelMessage], model_settings: Optional[ModelSettings],
+                             model_request_parameters: ModelRequestParameters,
+                             run_context=None) -> AsyncIterator[StreamedResponse]:
+        async with self.scheduler.slot(self.model_name):   # Slot bis zum Ende des Streams halten
+            async with self.wrapped.request_stream(
+                messages, model_settings, model_request_parameters, run_context
+            ) as stream:
+                yield stream
+
+
+model_scheduler = ModelScheduler()       # gemeinsamer Scheduler (siehe $OLLAMA_MAX_LOADED_MODELS)
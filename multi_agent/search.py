@@ -0,0 +1,168 @@
+"""Websuche mit TTL-Cache, Ratenbegrenzung, Mehrfach-Abfragen und austauschbarem Backend."""
+import asyncio, os, re, threading, time  # Async, Umgebungsvariablen, Normalisierung, Sperren
+from collections import OrderedDict      # LRU-Reihenfolge des Caches
+from typing import Optional, Protocol    # Typ-Hinweise
+
+SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "ddgs")   # "ddgs" oder "stub" (offline)
+SEARCH_TTL = float(os.environ.get("SEARCH_TTL", 3600))      # Sekunden, die ein Ergebnis gültig bleibt
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a query: lower case, single spaces, no surrounding punctuation."""
+    return re.sub(r"\s+", " ", query).strip().strip("?!.").lower()
+
+
+class SearchBackend(Protocol):
+    name: str
+
+    def search(self, query: str, max_results: int) -> list[dict]:
+        """Return dicts with 'title', 'body' and 'href'."""
+        ...
+
+
+class DDGSBackend:
+    """DuckDuckGo via ddgs; one session per thread is reused across queries."""
+    name = "ddgs"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def search(self, query: str, max_results: int) -> list[dict]:
+        ddg = getattr(self._local, "ddg", None)
+        if ddg is None:
+            from ddgs import DDGS        # erst bei Bedarf laden
+            ddg = self._local.ddg = DDGS()
+        return list(ddg.text(query, max_results=max_results))
+
+
+class StubBackend:
+    """Offline backend with canned or generated results (for tests and benchmarks)."""
+    name = "stub"
+
+    def __init__(self, corpus: Optional[dict[str, list[dict]]] = None, latency: float = 0.0):
+        self.corpus = {normalize_query(q): r for q, r in (corpus or {}).items()}
+        self.latency = latency
+
+    def search(self, query: str, max_results: int) -> list[dict]:
+        if self.latency:
+            time.sleep(self.latency)     # simulierte Netzwerklatenz
+        key = normalize_query(query)
+        if key in self.corpus:
+            return self.corpus[key][:max_results]
+        slug = re.sub(r"[^a-z0-9]+", "-", key).strip("-")
+        return [
+            {"title": f"{query} ({i})", "body": f"Offline result {i} for '{query}'.",
+             "href": f"https://example.org/{slug}/{i}"}
+            for i in range(1, max_results + 1)
+        ]
+
+
+def make_backend(name: str = SEARCH_BACKEND) -> SearchBackend:
+    return StubBackend() if name == "stub" else DDGSBackend()
+
+
+class SearchService:
+    """Cached, rate-limited search over a pluggable backend."""
+
+    def __init__(self, backend: Optional[SearchBackend] = None, ttl: float = SEARCH_TTL, max_entries: int = 512,
+                 max_concurrency: int = 3, min_interval: float = 0.5, snippet_chars: int = 300):
+        self.backend = backend or make_backend()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.min_interval = min_interval           # Mindestabstand zwischen Backend-Aufrufen
+        self.snippet_chars = snippet_chars
+        self.hits = self.misses = self.errors = 0
+        self._cache: "OrderedDict[tuple, tuple[float, list[dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(max_concurrency)
+        self._next_call = 0.0
+
+    def _cached(self, key: tuple) -> Optional[list[dict]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._cache.pop(key, None)
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _store(self, key: tuple, results: list[dict]) -> None:
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.ttl, results)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _call_backend(self, query: str, max_results: int) -> list[dict]:
+        from .resilience import resilience   # transiente Fehler mit Backoff, Breaker je Backend
+        return resilience.call(f"search:{self.backend.name}", lambda: self._call_backend_once(query, max_results))
+
+    def _call_backend_once(self, query: str, max_results: int) -> list[dict]:
+        with self._slots:                # begrenzte Parallelität zum Backend
+            with self._lock:             # nächsten freien Zeitschlitz reservieren
+                now = time.monotonic()
+                wait = max(0.0, self._next_call - now)
+                self._next_call = max(now, self._next_call) + self.min_interval
+            if wait:
+                time.sleep(wait)
+            return self.backend.search(query, max_results)
+
+    def _clean(self, results: list[dict]) -> list[dict]:
+        """Drop duplicate links and bound snippet size."""
+        seen, cleaned = set(), []
+        for r in results:
+            href = r.get("href")
+            if href in seen:
+                continue
+            seen.add(href)
+            body = r.get("body") or ""
+            if len(body) > self.snippet_chars:
+                body = body[: self.snippet_chars].rsplit(" ", 1)[0] + " …"
+            cleaned.append({"title": r.get("title"), "body": body, "href": href})
+        return cleaned
+
+    def search(self, query: str, max_results: int = 5) -> list[dict]:
+        """Search one query (served from the TTL cache when possible)."""
+        key = (normalize_query(query), max_results)
+        results = self._cached(key)
+        if results is None:
+            try:
+                results = self._clean(self._call_backend(query, max_results))
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                raise
+            self._store(key, results)
+        return results
+
+    async def asearch(self, query: str, max_results: int = 5) -> list[dict]:
+        return await asyncio.to_thread(self.search, query, max_results)
+
+    async def search_many(self, queries: list[str], max_results: int = 5) -> list[dict]:
+        """Run several queries concurrently and merge the results, deduplicated by href."""
+        unique = list({normalize_query(q): q for q in reversed(queries)}.values())[::-1]  # gleiche Abfrage nur einmal
+        batches = await asyncio.gather(*(self.asearch(q, max_results) for q in unique), return_exceptions=True)
+        merged = [r for batch in batches if not isinstance(batch, Exception) for r in batch]
+        if merged or not batches:
+            return self._clean(merged)
+        raise next(b for b in batches if isinstance(b, Exception))   # alle Abfragen fehlgeschlagen
+
+    def stats(self) -> dict:
+        return {"backend": self.backend.name, "hits": self.hits, "misses": self.misses,
+                "errors": self.errors, "entries": len(self._cache)}
+
+
+def format_results(results: list[dict]) -> str:
+    """Short listing for the model: title, snippet, link."""
+    return "\n".join(f"- {r.get('title')}: {r.get('body')} ({r.get('href')})" for r in results)
+
+
+def search_unavailable(error: Exception) -> str:
+    """Tool text after a failed search (retries already ran): tells the model not to call the tool again."""
+    from .resilience import CircuitOpenError
+    reason = str(error) if isinstance(error, CircuitOpenError) else f"{type(error).__name__}: {error}"
+    return f"Search unavailable ({reason}). Do not retry the search; answer from what you know and say so."
+
+
+search_service = SearchService()         # gemeinsamer Such-Dienst (Cache über alle Agenten)
@@ -0,0 +1,332 @@
+"""Lokaler HTTP-Dienst für Supervisor und Test-/Bewertungs-Pipeline (ein Prozess, ein Event-Loop).
+
+Alle Anfragen laufen durch eine begrenzte Warteschlange (Admission): feste Anzahl Worker, bei
+voller Warteschlange sofort 503 mit Retry-After (Lastabwurf), wer zu lange gewartet hat, ebenfalls.
+Die Parallelität je Modell begrenzt der Modell-Scheduler. Modelle, HTTP-Verbindungen zu Ollama,
+PDF-Index und Caches bleiben zwischen Anfragen im Prozess warm.
+
+    python -m multi_agent serve --port 8765 --workers 8 --queue-size 64 --model-limit gpt-oss=2
+
+    POST /ask        {"prompt": "...", "deps": false}          → {"output": "..."}
+    POST /pipeline   {"stage": "test-gen", "resume": true}     → {"stage": ..., "output": ...}
+    GET  /health     Warteschlange, laufende Anfragen, Laufzeit
+    GET  /metrics    Prometheus-Text (Metriken des Pakets + Server)
+    GET  /stats      JSON: Server, Verbindungen, Caches, Scheduler
+
+Ohne zusätzliche Abhängigkeiten (asyncio-Streams, HTTP/1.1 mit Keep-Alive).
+"""
+import asyncio, json, os, time          # Event-Loop, Serialisierung, Umgebungsvariablen, Zeitmessung
+from dataclasses import dataclass, field  # Aufträge und Kennzahlen
+from typing import Optional              # Typ-Hinweise
+
+from . import settings                   # PDF-Pfad fürs Vorwärmen
+from .metrics import metrics             # Zähler/Histogramme, Prometheus-Text
+
+SERVER_HOST = os.environ.get("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("SERVER_PORT", 8765))
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", 8))          # gleichzeitig bearbeitete Anfragen
+SERVER_QUEUE_SIZE = int(os.environ.get("SERVER_QUEUE_SIZE", 64))   # Wartende darüber hinaus → 503
+SERVER_MAX_WAIT = float(os.environ.get("SERVER_MAX_WAIT", 30))     # Sekunden in der Warteschlange
+SERVER_TIMEOUT = float(os.environ.get("SERVER_TIMEOUT", 600))      # Sekunden je Anfrage
+MAX_BODY_BYTES = 1024 * 1024
+
+_ROUTES = {"/health", "/metrics", "/stats", "/ask", "/pipeline"}
+STAGES = ["extract", "solve", "search", "test-gen", "answer-key", "simulate", "grade", "pipeline"]
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+            504: "Gateway Timeout"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+@dataclass
+class Job:
+    endpoint: str
+    payload: dict
+    future: asyncio.Future
+    enqueued: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class ServerStats:
+    accepted: int = 0
+    completed: int = 0
+    failed: int = 0
+    shed: int = 0                        # abgewiesen: Warteschlange voll
+    expired: int = 0                     # abgewiesen: zu lange gewartet
+    timeouts: int = 0
+
+
+class AgentServer:
+    """Admission queue in front of a fixed set of workers that run supervisor sessions and stages."""
+
+    def __init__(self, host: str = SERVER_HOST, port: int = SERVER_PORT, workers: int = SERVER_WORKERS,
+                 queue_size: int = SERVER_QUEUE_SIZE, max_wait: float = SERVER_MAX_WAIT,
+                 timeout: float = SERVER_TIMEOUT):
+        self.host, self.port = host, port
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.stats = ServerStats()
+        self.in_flight = 0
+        self.started = time.time()
+        self._queue: Optional[asyncio.Queue] = None
+        self._pipeline_lock: Optional[asyncio.Lock] = None   # Stufen teilen RUN_DIR und Antwortspeicher
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: list[asyncio.Task] = []
+
+    # ---------- Lebenszyklus ----------
+    async def start(self, warm: Optional[list[str]] = None) -> "AgentServer":
+        """Warm up, start the workers and listen (port 0 picks a free port)."""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._pipeline_lock = asyncio.Lock()
+        await self.warm_up(warm or [])
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def warm_up(self, models: list[str]) -> None:
+        """Import the agent stack, build models, start executors, index the PDF and load models before the first request."""
+        from . import tools                  # noqa: F401  Agenten, Tools, Modelle registrieren
+        from .code_executor import executor_pool
+        from .model_registry import registry
+        from .pdf_index import pdf_index
+        registry.build_all()
+        executor_pool.start()
+        if os.path.exists(settings.PDF_PATH):
+            await asyncio.to_thread(pdf_index.add, settings.PDF_PATH)
+        if models:
+            from .scheduler import model_scheduler
+            await model_scheduler.prewarm(models)
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    # ---------- Admission ----------
+    async def submit(self, endpoint: str, payload: dict) -> dict:
+        """Queue a job and wait for its result; raises HTTPError(503) when shedding load."""
+        job = Job(endpoint, payload, asyncio.get_running_loop().create_future())
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats.shed += 1
+            metrics.inc("server_shed_total", endpoint=endpoint, reason="queue_full")
+            raise HTTPError(503, "queue full", {"Retry-After": str(max(1, int(self.max_wait / 2)))}) from None
+        self.stats.accepted += 1
+        try:
+            return await job.future
+        except asyncio.CancelledError:   # Client weg: Auftrag wird beim Abholen übersprungen
+            job.future.cancel()
+            raise
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.future.done():
+                    continue
+                waited = time.perf_counter() - job.enqueued
+                metrics.observe("server_queue_seconds", waited, endpoint=job.endpoint)
+                if waited > self.max_wait:   # Antwort käme ohnehin zu spät
+                    self.stats.expired += 1
+                    metrics.inc("server_shed_total", endpoint=job.endpoint, reason="expired")
+                    job.future.set_exception(HTTPError(503, "waited too long in queue", {"Retry-After": "5"}))
+                    continue
+                self.in_flight += 1
+                start = time.perf_counter()
+                try:
+                    result = await asyncio.wait_for(self._run(job), self.timeout)
+                    self.stats.completed += 1
+                    if not job.future.done():
+                        job.future.set_result(result)
+                except asyncio.TimeoutError:
+                    self.stats.timeouts += 1
+                    if not job.future.done():
+                        job.future.set_exception(HTTPError(504, f"no result after {self.timeout:.0f}s"))
+                except Exception as e:   # ein Fehler trifft nur diese Anfrage
+                    self.stats.failed += 1
+                    if not job.future.done():
+                        job.future.set_exception(e if isinstance(e, HTTPError) else HTTPError(500, repr(e)))
+                finally:
+                    self.in_flight -= 1
+                    metrics.observe("server_request_seconds", time.perf_counter() - start, endpoint=job.endpoint)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> dict:
+        from .history import history_savings
+        with history_savings(job.endpoint, separate=True) as saved:   # Ersparnis je Anfrage in der Antwort
+            if job.endpoint == "ask":
+                from .router import run_routed
+                result = await run_routed(job.payload["prompt"], deps=bool(job.payload.get("deps", False)))
+                response = {"output": result.output}
+            else:
+                async with self._pipeline_lock:   # Stufen nacheinander (gemeinsamer RUN_DIR/Antwortspeicher)
+                    response = await self._run_stage(job.payload)
+        return {**response, "history": saved.stats()}
+
+    async def _run_stage(self, payload: dict) -> dict:
+        from . import pipelines
+        stage, resume = payload["stage"], bool(payload.get("resume", True))
+        if stage == "pipeline":
+            results = await pipelines.run_pipeline(resume=resume)
+            return {"stage": stage, "output": {
+                "task": results["task"].output, "solution": results["solution"].output,
+                "web_search": results["web_search"].output, "test": results["test"].output,
+                "cohort": results["cohort"].summary(), "grades": [g.report() for g in results["grades"]],
+                "trick_pdf": results["trick_pdf"],
+            }}
+        kwargs = {k: payload[k] for k in ("cohort_size", "seed") if stage == "simulate" and k in payload}
+        result = await pipelines.resume_stage(stage, force=not resume, **kwargs)
+        if stage == "simulate":
+            return {"stage": stage, "output": result.summary()}
+        if stage == "grade":
+            return {"stage": stage, "output": [g.report() for g in result]}
+        return {"stage": stage, "output": result.output}
+
+    # ---------- HTTP ----------
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:                  # Keep-Alive: mehrere Anfragen je Verbindung
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:   # kaputte Anfrage: antworten und Verbindung schließen
+                    self._write_response(writer, e.status, {"error": str(e)}, e.headers, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, payload, extra = 200, await self._route(method, path, body), {}
+                except HTTPError as e:
+                    status, payload, extra = e.status, {"error": str(e)}, e.headers
+                except Exception as e:
+                    status, payload, extra = 500, {"error": repr(e)}, {}
+                route = path.split("?")[0].rstrip("/")
+                metrics.inc("server_requests_total", path=route if route in _ROUTES else "other", status=str(status))
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, extra, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[tuple]:
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, path, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "malformed request line") from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "invalid Content-Length") from None
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"body larger than {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path, headers, body
+
+    def _write_response(self, writer: asyncio.StreamWriter, status: int, payload, extra: dict,
+                        keep_alive: bool) -> None:
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload, ensure_ascii=False).encode(), "application/json"
+        head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{k}: {v}" for k, v in extra.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def _route(self, method: str, path: str, body: bytes):
+        path = path.split("?")[0].rstrip("/") or "/"
+        if method == "GET":
+            if path == "/health":
+                return self.health()
+            if path == "/metrics":
+                return metrics.prometheus() + self._prometheus()
+            if path == "/stats":
+                return self.snapshot()
+        elif method == "POST" and path in ("/ask", "/pipeline"):
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                raise HTTPError(400, "body must be JSON") from None
+            if path == "/ask":
+                if not isinstance(payload.get("prompt"), str) or not payload["prompt"].strip():
+                    raise HTTPError(400, "'prompt' is required")
+                return await self.submit("ask", payload)
+            if payload.get("stage", "pipeline") not in STAGES:
+                raise HTTPError(400, f"'stage' must be one of {', '.join(STAGES)}")
+            return await self.submit("pipeline", {"stage": "pipeline", **payload})
+        if path in _ROUTES:
+            raise HTTPError(405, f"{method} not allowed on {path}")
+        raise HTTPError(404, f"no route {path}")
+
+    # ---------- Auswertung ----------
+    def health(self) -> dict:
+        return {"status": "ok", "queue": self._queue.qsize(), "queue_size": self.queue_size,
+                "in_flight": self.in_flight, "workers": self.workers,
+                "uptime_s": round(time.time() - self.started, 1)}
+
+    def snapshot(self) -> dict:
+        from .report import stats
+        return {"server": {**self.health(), **self.stats.__dict__}, **stats()}
+
+    def _prometheus(self) -> str:
+        gauges = {"server_queue_depth": self._queue.qsize(), "server_in_flight": self.in_flight}
+        return "".join(f"# TYPE multi_agent_{k} gauge\nmulti_agent_{k} {v}\n" for k, v in gauges.items())
+
+
+def parse_limits(values: list[str]) -> dict[str, int]:
+    """'gpt-oss=2' → {'gpt-oss': 2} (CLI --model-limit)."""
+    limits = {}
+    for value in values:
+        model, _, limit = value.rpartition("=")
+        if not model or not limit.isdigit():
+            raise ValueError(f"expected MODEL=N, got {value!r}")
+        limits[model] = int(limit)
+    return limits
+
+
+async def serve(host: str = SERVER_HOST, port: int = SERVER_PORT, workers: int = SERVER_WORKERS,
+                queue_size: int = SERVER_QUEUE_SIZE, model_limit: int = 0,
+                model_limits: Optional[dict[str, int]] = None, warm: Optional[list[str]] = None) -> None:
+    """Run the service until interrupted."""
+    from .scheduler import model_scheduler
+    model_scheduler.set_limits(model_limit, model_limits)
+    server = await AgentServer(host, port, workers, queue_size).start(warm)
+    print(f"multi_agent serving on http://{server.host}:{server.port} "
+          f"(workers {workers}, queue {queue_size}, model limits {model_scheduler.stats()['limits']})", flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
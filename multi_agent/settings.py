@@ -0,0 +1,23 @@
+"""Pfade und Laufzeit-Einstellungen (per Umgebungsvariable oder CLI überschreibbar)."""
+import os                                # Umgebungsvariablen
+from pathlib import Path                 # Pfad-Objekte
+
+PDF_PATH = os.environ.get("PDF_PATH", "/home/student/myenv/For_Loop.pdf")   # Pfad zur Beispiel-PDF
+ANSWERS_DIR = Path(os.environ.get("ANSWERS_DIR", "/home/student/myenv/Text_Generator_Verzeichnis"))  # Student{i}.txt
+ANSWER_STORE = os.environ.get("ANSWER_STORE")   # SQLite-Datei der Antworten (Standard: ANSWERS_DIR/answers.sqlite)
+ANSWER_FILES = os.environ.get("ANSWER_FILES") == "1"   # zusätzlich Student{i}.txt schreiben (wie früher)
+RUN_DIR = Path(os.environ.get("RUN_DIR", "runs/latest"))   # Nachrichtenverläufe zwischen CLI-Stufen
+
+# Kohorten-Simulation: Größe, Parallelität je Modell-Endpunkt, Seed für die Fehleranzahl k
+COHORT_SIZE = int(os.environ.get("COHORT_SIZE", 3))
+MODEL_CONCURRENCY = int(os.environ.get("MODEL_CONCURRENCY", 4))
+COHORT_SEED = int(os.environ["COHORT_SEED"]) if "COHORT_SEED" in os.environ else None
+GRADE_FEEDBACK = os.environ.get("GRADE_FEEDBACK") == "1"   # LLM-Feedback zusätzlich zur Note
+
+
+def model_answers_path() -> Path:
+    return ANSWERS_DIR / "model_answers.txt"
+
+
+def answer_store_path() -> Path:
+    return Path(ANSWER_STORE) if ANSWER_STORE else ANSWERS_DIR / "answers.sqlite"
@@ -0,0 +1,168 @@
+"""Token-Streaming durch die Kette Supervisor → Tool → Sub-Agent.
+
+Ein ``TokenStream`` startet einen Workflow-Aufruf (z. B. eine Pipeline-Stufe) und liefert die
+Text-Deltas aller beteiligten Agenten, sobald sie ankommen. Ob gestreamt wird, hängt nur davon ab,
+ob ein ``TokenStream`` aktiv ist (ContextVar) – dieselben Tools und Stufen laufen sonst unverändert.
+Reicht der Supervisor nur Tool-Ergebnisse durch, wird seine Schlussantwort nicht neu generiert.
+"""
+import asyncio, contextvars, sys         # Event-Loop, Kontext je Task, Ausgabe
+from contextlib import contextmanager    # Scope-Präfix für parallele Sitzungen
+from dataclasses import dataclass        # Ergebnis-Container
+from typing import AsyncIterator, Awaitable, Optional  # Typ-Hinweise
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import (
+    ModelMessage, ModelRequest, ModelResponse, PartDeltaEvent, PartStartEvent, TextPart, TextPartDelta,
+    ToolReturnPart,
+)
+
+_sink: contextvars.ContextVar[Optional["TokenStream"]] = contextvars.ContextVar("token_stream", default=None)
+_scope: contextvars.ContextVar[str] = contextvars.ContextVar("token_stream_scope", default="")
+
+
+@dataclass
+class StreamChunk:
+    source: str                          # z. B. "coder_agent" oder "#2/supervisor"
+    text: str                            # Text-Delta
+
+
+class TokenStream:
+    """Run a workflow coroutine and iterate over the text deltas of every agent it calls.
+
+    ``result`` holds the coroutine's return value once iteration has finished.
+    """
+
+    def __init__(self, coro: Awaitable):
+        self._coro = coro
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self.result = None
+
+    def emit(self, source: str, text: str) -> None:
+        scope = _scope.get()
+        self._queue.put_nowait(StreamChunk(f"{scope}/{source}" if scope else source, text))
+
+    async def __aiter__(self) -> AsyncIterator[StreamChunk]:
+        token = _sink.set(self)          # Task erbt den Kontext → alle Agenten darin streamen hierher
+        try:
+            self._task = asyncio.ensure_future(self._coro)
+        finally:
+            _sink.reset(token)
+        self._task.add_done_callback(lambda _: self._queue.put_nowait(None))
+        try:
+            while (chunk := await self._queue.get()) is not None:
+                yield chunk
+        finally:
+            if not self._task.done():    # Abbruch durch den Aufrufer
+                self._task.cancel()
+        self.result = self._task.result()   # Fehler des Workflows hier weiterreichen
+
+
+def is_streaming() -> bool:
+    return _sink.get() is not None
+
+
+@contextmanager
+def scope(name: str):
+    """Prefix the sources of chunks emitted inside this block (e.g. one of several sessions)."""
+    token = _scope.set(name)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def _text_delta(event) -> str:
+    if isinstance(event, PartStartEvent) and isinstance(event.part, TextPart):
+        return event.part.content
+    if isinstance(event, PartDeltaEvent) and isinstance(event.delta, TextPartDelta):
+        return event.delta.content_delta
+    return ""
+
+
+async def _stream_node(node, run, sink: "TokenStream", source: str) -> None:
+    async with node.stream(run.ctx) as events:
+        async for event in events:
+            if text := _text_delta(event):
+                sink.emit(source, text)
+
+
+async def run_agent(agent: Agent, prompt: str, source: str, **kwargs):
+    """``agent.run`` that forwards text deltas to the active TokenStream (if any)."""
+    sink = _sink.get()
+    if sink is None:
+        return await agent.run(prompt, **kwargs)
+    # iter() statt run_stream(): der Lauf endet nicht beim ersten Text, Tool-Aufrufe danach funktionieren
+    async with agent.iter(prompt, **kwargs) as run:
+        async for node in run:
+            if Agent.is_model_request_node(node):
+                await _stream_node(node, run, sink, source)
+    return run.result
+
+
+@dataclass
+class PassThroughResult:
+    """Supervisor result whose answer is the unchanged output of its pass-through tools."""
+    output: str
+    messages: list[ModelMessage]
+    new_message_index: int
+
+    def all_messages(self) -> list[ModelMessage]:
+        return self.messages
+
+    def new_messages(self) -> list[ModelMessage]:
+        return self.messages[self.new_message_index:]
+
+
+def _pass_through_outputs(request: ModelRequest, pass_through: set[str]) -> Optional[list[str]]:
+    """Tool outputs if the request only returns results of pass-through tools."""
+    returns = [p for p in request.parts if isinstance(p, ToolReturnPart)]
+    if returns and len(returns) == len(request.parts) and all(p.tool_name in pass_through for p in returns):
+        return [p.model_response_str() for p in returns]
+    return None
+
+
+async def run_supervisor(agent: Agent, prompt: str, pass_through: set[str], source: str = "supervisor", **kwargs):
+    """Supervisor run; when streaming, pass-through tool results become the answer without another model call."""
+    sink = _sink.get()
+    if sink is None:
+        return await agent.run(prompt, **kwargs)
+    start = len(kwargs.get("message_history") or [])
+    async with agent.iter(prompt, **kwargs) as run:
+        async for node in run:
+            if not Agent.is_model_request_node(node):
+                continue
+            outputs = _pass_through_outputs(node.request, pass_through)
+            if outputs is not None:      # Sub-Agent-Text wurde schon gestreamt → nicht neu generieren lassen
+                answer = "\n\n".join(outputs)
+                response = ModelResponse(parts=[TextPart(answer)], model_name=run.ctx.deps.model.model_name)
+                return PassThroughResult(answer, [*run.ctx.state.message_history, node.request, response], start)
+            await _stream_node(node, run, sink, source)
+    return run.result
+
+
+async def print_stream(stream: TokenStream, by_line: bool = False, file=None):
+    """Print chunks as they arrive and return the stream's result.
+
+    ``by_line`` prefixes complete lines with their source (for interleaved concurrent agents);
+    otherwise a header is printed whenever the source changes.
+    """
+    file = file or sys.stdout
+    current, buffers = None, {}
+    async for chunk in stream:
+        if by_line:
+            lines = (buffers.pop(chunk.source, "") + chunk.text).split("\n")
+            for line in lines[:-1]:
+                print(f"[{chunk.source}] {line}", file=file, flush=True)
+            buffers[chunk.source] = lines[-1]
+        else:
+            if chunk.source != current:
+                print(f"\n[{chunk.source}]", file=file, flush=True)
+                current = chunk.source
+            print(chunk.text, end="", file=file, flush=True)
+    for source, rest in buffers.items():
+        if rest:
+            print(f"[{source}] {rest}", file=file, flush=True)
+    if not by_line:
+        print(file=file)
+    return stream.result
@@ -0,0 +1,173 @@
+"""Nebenläufige Simulation und Bewertung einer Studierenden-Kohorte."""
+import asyncio, random, statistics, time  # Async-Ausführung, Zufall, Kennzahlen
+from dataclasses import dataclass, field  # einfache Ergebnis-Container
+from pathlib import Path                 # Pfad-Objekte
+from typing import Optional              # Typ-Hinweise
+
+from pydantic_ai import Agent            # Kernklasse
+
+from .answer_store import answer_store   # Abgaben liegen im Antwortspeicher statt in Dateien
+from .resilience import retry_budget     # Wiederholungsbudget je Student
+
+
+@dataclass
+class StudentRun:
+    """Result and timings of one simulated student."""
+    student: int
+    mistakes: int
+    answer_path: str
+    answer_seconds: float = 0.0
+    grade_seconds: float = 0.0
+    output: str = ""
+    grade: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def latency(self) -> float:
+        return self.answer_seconds + self.grade_seconds
+
+
+@dataclass
+class CohortReport:
+    """Per-student results plus total wall-clock time of a cohort run."""
+    students: list[StudentRun] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    def summary(self) -> str:
+        """Return a short latency/throughput summary for capacity planning."""
+        done = [s for s in self.students if s.error is None]
+        lines = [f"students: {len(self.students)} ok: {len(done)} wall: {self.wall_seconds:.2f}s"]
+        for name, values in (
+            ("answer", [s.answer_seconds for s in done]),
+            ("grade", [s.grade_seconds for s in done if s.grade is not None]),
+            ("total", [s.latency for s in done]),
+        ):
+            if values:
+                lines.append(f"{name}: p50={_percentile(values, 50):.2f}s "
+                             f"p95={_percentile(values, 95):.2f}s max={max(values):.2f}s")
+        if self.wall_seconds:
+            lines.append(f"throughput: {len(done) / self.wall_seconds:.2f} students/s")
+        return "\n".join(lines)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1]
+
+
+def _model_key(agent: Agent) -> str:
+    """Name of the model endpoint an agent talks to (used for concurrency limits)."""
+    model = agent.model
+    return getattr(model, "model_name", None) or str(model)
+
+
+def student_prompt(student: int, mistakes: int, test: Optional[str] = None) -> str:
+    """Prompt for one simulated student (same wording as the original script), optionally after the test."""
+    return (
+        (f"{test}\n\n" if test else "")   # gleicher Test vorn → gemeinsames Präfix für alle Studierenden
+        + f"Start with: Student {student}"
+        f"Answer the test and submit the answers. "
+        f"Make {mistakes} random mistake{'s' if mistakes != 1 else ''} in the test, but don't mention which ones."
+    )
+
+
+async def run_cohort(
+    examiner_agent: Agent,
+    history: list,
+    base_dir: Path,
+    cohort_size: int = 3,
+    evaluator_agent: Optional[Agent] = None,
+    model_answers_path: Optional[Path] = None,
+    concurrency: Optional[dict[str, int]] = None,
+    default_concurrency: int = 4,
+    seed: Optional[int] = None,
+    max_pending_grades: Optional[int] = None,
+    test: Optional[str] = None,
+) -> CohortReport:
+    """Simulate and grade a cohort concurrently with per-model concurrency limits.
+
+    Answering and grading form a two-stage pipeline connected by a bounded queue,
+    so examiners slow down when graders fall behind (backpressure). ``test`` is the
+    compact test text put in front of every student prompt (instead of a transcript in ``history``).
+    """
+    rng = random.Random(seed)                        # reproduzierbare Fehleranzahl k je Student
+    runs = [
+        StudentRun(i, rng.randint(0, 5), str(Path(base_dir) / f"Student{i}.txt"))
+        for i in range(1, cohort_size + 1)
+    ]
+
+    # Ein Semaphor pro Modell-Endpunkt; Agenten mit gleichem Modell teilen sich das Limit
+    concurrency = concurrency or {}
+    limits: dict[str, asyncio.Semaphore] = {}
+    def limit(agent: Agent) -> asyncio.Semaphore:
+        key = _model_key(agent)
+        if key not in limits:
+            limits[key] = asyncio.Semaphore(concurrency.get(key, default_concurrency))
+        return limits[key]
+
+    grading = evaluator_agent is not None and model_answers_path is not None
+    pending: asyncio.Queue = asyncio.Queue(maxsize=max_pending_grades or default_concurrency * 2)
+    todo: asyncio.Queue = asyncio.Queue()
+    for run in runs:
+        todo.put_nowait(run)
+
+    async def answer_worker() -> None:
+        while True:
+            try:
+                run = todo.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                with retry_budget("student", separate=True):    # eigenes Budget je Student statt eines für die Kohorte
+                    async with limit(examiner_agent):
+                        start = time.perf_counter()          # Servicezeit ohne Wartezeit am Limit
+                        result = await examiner_agent.run(
+                            student_prompt(run.student, run.mistakes, test),
+                            deps=run.answer_path,            # Ziel-Datei (answers)
+                            message_history=history,         # Test-Kontext
+                        )
+                        run.answer_seconds = time.perf_counter() - start
+                run.output = result.output
+            except Exception as e:                           # ein Fehler stoppt nicht die Kohorte
+                run.error = f"answer: {e}"
+            if grading and run.error is None:
+                await pending.put(run)                       # blockiert bei voller Queue (Backpressure)
+
+    async def grade_worker() -> None:
+        while True:
+            run = await pending.get()
+            try:
+                if run is None:                              # Ende-Signal
+                    return
+                missing = [Path(p).name for p in (model_answers_path, run.answer_path) if not answer_store.exists(p)]
+                if missing:
+                    run.error = f"skipped (missing: {', '.join(missing)})"
+                    continue
+                try:
+                    with retry_budget("student", separate=True):
+                        async with limit(evaluator_agent):
+                            start = time.perf_counter()
+                            result = await evaluator_agent.run(
+                                "Evaluate student answers with model answers and give the student his mark",
+                                deps=(str(model_answers_path), run.answer_path),
+                            )
+                            run.grade_seconds = time.perf_counter() - start
+                    run.grade = result.output
+                except Exception as e:
+                    run.error = f"grade: {e}"
+            finally:
+                pending.task_done()
+
+    workers = max(1, min(cohort_size, concurrency.get(_model_key(examiner_agent), default_concurrency)))
+    graders = 0
+    if grading:
+        graders = max(1, min(cohort_size, concurrency.get(_model_key(evaluator_agent), default_concurrency)))
+
+    start = time.perf_counter()
+    grade_tasks = [asyncio.create_task(grade_worker()) for _ in range(graders)]
+    await asyncio.gather(*(answer_worker() for _ in range(workers)))
+    for _ in grade_tasks:
+        await pending.put(None)
+    await asyncio.gather(*grade_tasks)
+    return CohortReport(runs, time.perf_counter() - start)
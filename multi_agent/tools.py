@@ -0,0 +1,115 @@
+"""Tool-Wrapper des Supervisors (orchestrieren mehrere Sub-Agenten, async)."""
+from pydantic_ai import RunContext  # Laufkontext
+from pydantic_ai.toolsets import FunctionToolset  # Sammlung/Registrierung von Tools
+
+import asyncio                             # Executor-Aufruf im Thread (blockiert nicht den Event-Loop)
+from typing import Optional                # Typ-Hinweise
+
+from . import settings                     # PDF-Pfad (zur Laufzeit gelesen, per CLI änderbar)
+from .fast_path import coder_fast_path     # Code-Blöcke direkt ausführen, Prüfer nur bei Bedarf
+from .pdf_index import format_passages, pdf_index   # relevante Abschnitte statt ganzer PDF
+from .question_bank import QUESTION_BANK_REUSE, Test, question_bank   # Fragenbank je Quell-PDF
+from .streaming import is_streaming, run_agent   # Token-Weitergabe an einen aktiven TokenStream
+from .agents import (
+    code_executer_agent, coder_agent, pdf_extractor_agent, test_generator_agent, web_searcher_agent,
+)
+
+
+TEST_PASSAGES = 6                                     # Abschnitte als Grundlage für einen Test
+
+
+# ---------- Prompts und Fragenbank ----------
+def _pdf_prompt(question: str) -> str:
+    if question:                                      # Frage → nur die passenden Abschnitte (search_pdf)
+        return f"Answer from the PDF at this path: {settings.PDF_PATH}\nQuestion: {question}"
+    return f"What is the content of the PDF at this path: {settings.PDF_PATH}"
+
+
+def _test_prompt() -> str:
+    """Test generation from passages spread over the whole PDF (bounded context, all pages covered)."""
+    passages = pdf_index.spread(settings.PDF_PATH, k=TEST_PASSAGES)
+    return f"Generate a test on this content:\n{format_passages(passages)}"
+
+
+def _bank_test() -> Optional[Test]:
+    """A new test assembled from the question bank without a model call (None if it has too few questions)."""
+    from .answer_store import current_test
+    return question_bank.assemble(current_test(), settings.PDF_PATH) if QUESTION_BANK_REUSE else None
+
+
+def _store_test(generated) -> Test:
+    """Add freshly generated questions to the bank and make them the current test."""
+    from .answer_store import current_test
+    ids = question_bank.add(settings.PDF_PATH, generated.questions)
+    return question_bank.assemble(current_test(), settings.PDF_PATH, ids=ids)
+
+
+async def build_test() -> Test:
+    """Current test: from the bank if possible, otherwise generated once by test_generator_agent."""
+    test = _bank_test()
+    if test is None:
+        result = await run_agent(test_generator_agent, _test_prompt(), "test_generator_agent")
+        test = _store_test(result.output)
+    return test
+
+
+# ---------- Tool-Wrapper (Sub-Agenten mit agent.run, überlappend auf dem Event-Loop) ----------
+# Mit aktivem TokenStream werden die Sub-Agenten-Tokens sofort an den Aufrufer weitergereicht
+def _echo(label: str, output: str) -> None:
+    if not is_streaming():               # beim Streamen wurde der Text schon ausgegeben
+        print(f"{label}:\n", output)
+
+
+async def extract_pdf(deps: bool, question: str = "") -> str:
+    """PDF extraction (deps=False) or test generation (deps=True) without a RunContext."""
+    if deps:                                          # Abschnitte kommen aus dem Index → kein Extractor-Hop
+        test = await build_test()
+        return f"Test questions are:\n{test.render()}\n\nend of generated test questions"
+    result = await run_agent(pdf_extractor_agent, _pdf_prompt(question), "pdf_extractor_agent")
+    _echo("pdf_extractor_agent", result.output)
+    return f"PDF Content is:\n{result.output}"
+
+
+async def pdf_extractor_tool(ctx: RunContext[bool], question: str = "") -> str:
+    """Tool for extracting pdf content; pass the user's question to get only the relevant passages."""
+    return await extract_pdf(ctx.deps, question)
+
+
+async def coder_tool(task: str) -> str:
+    """Tool for solving and executing python codes tasks."""
+    result = await run_agent(coder_agent, f"Solve the task: {task}", "coder_agent")
+    _echo("Coder Agent", result.output)
+    execution = await asyncio.to_thread(coder_fast_path.run, result.output)   # Prüfer nur bei Fehlern/Unklarem
+    if execution is not None:
+        _echo("Executor (fast path)", execution.format())
+        return f"Coder Agent returned:\n{result.output}\n\nExecutor output:\n{execution.format()}"
+    result1 = await run_agent(
+        code_executer_agent,
+        "Extract python code from text and execute it and show the result",
+        "code_executer_agent",
+        message_history=result.new_messages()
+    )
+    _echo("Code Executer Agent", result1.output)
+    return f"Coder Agent returned:\n{result.output}\n\nExecutor output:\n{result1.output}"
+
+
+async def web_search_tool(query: str) -> str:
+    """Tool for searching the web with a given query."""
+    result = await run_agent(web_searcher_agent, f"Search for: {query}", "web_searcher_agent")
+    _echo("Web Searcher Agent", result.output)
+    return f"Web Search Results:\n{result.output}\nEnd of Results"
+
+# ---------- Toolset registrieren ----------
+# mehrere Tool-Aufrufe in einem Schritt laufen überlappend auf dem Event-Loop
+supervisor_toolset = FunctionToolset(
+    tools=[pdf_extractor_tool, coder_tool, web_search_tool]  # Tools, die der Supervisor aufrufen darf
+)
+# Ergebnisse dieser Tools gibt der Supervisor unverändert zurück ("Do not change other agents response")
+PASS_THROUGH_TOOLS = {"pdf_extractor_tool", "coder_tool", "web_search_tool"}
+
+# Direktaufruf durch den Vor-Router (ohne Supervisor): Tool-Name → (Argument, deps) → Ergebnis
+DIRECT_TOOLS = {
+    "pdf_extractor_tool": lambda argument, deps: extract_pdf(deps, argument),
+    "coder_tool": lambda argument, deps: coder_tool(argument),
+    "web_search_tool": lambda argument, deps: web_search_tool(argument),
+}
@@ -1,27 +1,39 @@
-from pydantic_ai import Agent
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openai import OpenAIProvider
-import logfire
+from pydantic_ai import Agent, ModelRetry
+from multi_agent.arithmetic import ExpressionError, evaluate, evaluate_many
+from multi_agent.model_registry import registry
 
-# Konfiguration des Loggings zur Analyse der Kommunikation zwischen Agent, Modell und Tool
-logfire.configure()
-logfire.instrument_pydantic_ai()
-
-# Ollama-Provider und Modell konfigurieren
-provider = OpenAIProvider(base_url="http://localhost:11434/v1")
-model = OpenAIModel("qwen3:8b", provider=provider)
+# Modell über die gemeinsame Ollama-Registry konfigurieren
+model = registry.model("qwen3:8b")
 
 # Agent mit Modell initialisieren
-agent = Agent(model=model, instructions="Use Tool evaluate_expression() for calculations")
+agent = Agent(
+    model=model,
+    instructions="Use Tool evaluate_expression() for a calculation. "
+                 "For several calculations use evaluate_expressions() once with all expressions",
+)
 
 @agent.tool_plain
 def evaluate_expression(expression: str) -> float:
-    """Evaluate a basic math expression"""
-    allowed_names = {"__builtins__": {}}  # Zugriff auf eingebaute Funktionen sperren
-     # eval() wertet den String-Ausdruck aus und liefert das numerische Ergebnis
-    return eval(expression, allowed_names) 
+    """Evaluate a basic math expression (+ - * / // % ** and functions like sqrt, log, round)"""
+    try:
+        return evaluate(expression)  # sicherer AST-Auswerter statt eval(), kompilierte Ausdrücke werden gecacht
+    except ExpressionError as e:
+        raise ModelRetry(str(e))  # Modell kann den Ausdruck korrigieren
+
+@agent.tool_plain
+def evaluate_expressions(expressions: list[str], variables: dict[str, float | list[float]] | None = None) -> str:
+    """Evaluate many math expressions in one call; variables may be numbers or lists (evaluated element-wise)"""
+    # Ein Tool-Aufruf statt einer Runde je Ausdruck; Fehler betreffen nur den jeweiligen Ausdruck
+    return "\n".join(
+        f"{r['expression']} = {r['result']}" if "result" in r else f"{r['expression']}: error: {r['error']}"
+        for r in evaluate_many(expressions, variables)
+    )
+
+if __name__ == "__main__":
+    from multi_agent.observability import configure_observability
+    configure_observability()
 
-# Beispielanfrage an den Agenten
-user_prompt = "What is 545.38*74.62/6.83?"
-result = agent.run_sync(user_prompt)
-print(result.output)
+    # Beispielanfrage an den Agenten
+    user_prompt = "What is 545.38*74.62/6.83?"
+    result = agent.run_sync(user_prompt)
+    print(result.output)
@@ -1,14 +1,8 @@
 from pydantic_ai import Agent, RunContext
 from pydantic_ai.toolsets import FunctionToolset
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openai import OpenAIProvider
-import logfire
+from multi_agent.model_registry import registry
 
-logfire.configure()  
-logfire.instrument_pydantic_ai()
-
-provider = OpenAIProvider(base_url="http://localhost:11434/v1")
-model = OpenAIModel("qwen3:8b", provider=provider)
+model = registry.model("qwen3:8b")
 
 def generate_file_txt(ctx: RunContext[str], text: str) -> str:
     """Write text file to the exact file path provided via deps."""
@@ -34,15 +28,19 @@ agent = Agent(
     )
 )
 
-result = agent.run_sync(
-    "Save to text File: Meeting at 20, bring slides.",
-    deps="/home/student/myenv/Text_Generator_Verzeichnis/Meeting.txt",
-)
-print(result.output)
+if __name__ == "__main__":
+    from multi_agent.observability import configure_observability
+    configure_observability()
 
-result1 = agent.run_sync(
-    "What is the content of the text file?",
-    deps="/home/student/myenv/Text_Generator_Verzeichnis/Meeting.txt",
+    result = agent.run_sync(
+        "Save to text File: Meeting at 20, bring slides.",
+        deps="/home/student/myenv/Text_Generator_Verzeichnis/Meeting.txt",
     )
+    print(result.output)
+
+    result1 = agent.run_sync(
+        "What is the content of the text file?",
+        deps="/home/student/myenv/Text_Generator_Verzeichnis/Meeting.txt",
+        )
 
-print(result1.output)
+    print(result1.output)
@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from multi_agent.answer_store import KEY, AnswerStore
+
+
+def test_group_commit_stores_every_submission(tmp_path):
+    store = AnswerStore(tmp_path / "answers.sqlite")
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda n: store.submit("t1", f"Student{n}", f"1. {'ABCD'[n % 4]}"), range(40)))
+    submissions = store.submissions("t1")
+    assert len(submissions) == 40
+    assert store.commits <= 40
+    assert {s.student: s.answers for s in submissions}["Student5"] == {1: "B"}
+
+
+def test_new_test_under_same_id_drops_old_submissions(tmp_path):
+    store = AnswerStore(tmp_path / "answers.sqlite")
+    store.put_test("t1", "old questions")
+    store.submit("t1", "model_answers", "1. A", KEY)
+    store.submit("t1", "Student1", "1. A")
+    store.put_test("t1", "old questions")         # gleicher Test → Abgaben bleiben
+    assert len(store.submissions("t1")) == 1
+    store.put_test("t1", "new questions")
+    assert store.submissions("t1") == []
+    assert store.submissions("t1", KEY) == []
+
+
+def test_clear_one_kind(tmp_path):
+    store = AnswerStore(tmp_path / "answers.sqlite")
+    store.submit("t1", "model_answers", "1. A", KEY)
+    store.submit("t1", "Student1", "1. B")
+    assert store.clear("t1", "student") == 1
+    assert len(store.submissions("t1", KEY)) == 1
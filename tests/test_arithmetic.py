@@ -0,0 +1,61 @@
+import math
+
+import pytest
+
+from multi_agent.arithmetic import ExpressionError, evaluate, evaluate_many
+
+
+def test_arithmetic_and_functions():
+    assert evaluate("2 + 3 * 4") == 14
+    assert evaluate("2^10") == 1024
+    assert evaluate("sqrt(16) + log(e)") == 5
+    assert evaluate("round(pi, 2)") == 3.14
+    assert evaluate("max(1, x, 3)", {"x": 7}) == 7
+
+
+@pytest.mark.parametrize("source", [
+    "().__class__",
+    "x.__class__.__bases__",
+    "[1, 2][0]",
+    "__import__('os')",
+    "open('f')",
+    "(lambda: 1)()",
+    "'a' * 3",
+    "True + 1",
+    "sqrt",
+    "1 if x else 2",
+    "x < 2",
+])
+def test_rejects_everything_but_arithmetic(source):
+    with pytest.raises(ExpressionError):
+        evaluate(source, {"x": 1})
+
+
+def test_rejects_oversized_expressions():
+    with pytest.raises(ExpressionError):
+        evaluate("1+" * 600 + "1")
+
+
+def test_runtime_errors_become_expression_errors():
+    for source in ("1/0", "log(-1)", "(-8)**0.5", "y + 1"):
+        with pytest.raises(ExpressionError):
+            evaluate(source)
+
+
+def test_evaluate_many_reports_each_expression():
+    results = evaluate_many(["x * 2", "1/0", "x.real", "y"], {"x": 3})
+    assert results[0] == {"expression": "x * 2", "result": 6}
+    assert all("error" in r for r in results[1:])
+
+
+def test_vectorized_variables():
+    results = evaluate_many(["x * 2", "1 / x", "pi"], {"x": [1, 2, 0]})
+    assert results[0]["result"] == [2, 4, 0]
+    assert results[1]["result"][:2] == [1, 0.5] and math.isinf(results[1]["result"][2])
+    assert results[2]["result"] == pytest.approx(math.pi)
+
+
+def test_unused_non_numeric_variable_does_not_break_the_batch():
+    results = evaluate_many(["x + 1", "y + 1"], {"x": [1, 2], "y": ["a", "b"]})
+    assert results[0]["result"] == [2, 3]
+    assert "error" in results[1]
@@ -0,0 +1,51 @@
+import asyncio
+from types import SimpleNamespace
+
+from multi_agent.checkpoints import CheckpointStore, StageResult
+
+
+def stage(store, name, output, inputs, upstream=(), **kwargs):
+    async def compute():
+        return SimpleNamespace(output=output)
+    return asyncio.run(store.run(name, compute, inputs, upstream, **kwargs))
+
+
+def test_unchanged_inputs_skip_the_stage(tmp_path):
+    store = CheckpointStore(tmp_path, enabled=True)
+    assert stage(store, "extract", "text", {"pdf": "a"}).output == "text"
+    result = stage(store, "extract", "other", {"pdf": "a"})
+    assert isinstance(result, StageResult)
+    assert result.output == "text"
+    assert (store.computed, store.skipped) == (["extract"], ["extract"])
+
+
+def test_changed_input_or_force_recomputes(tmp_path):
+    store = CheckpointStore(tmp_path, enabled=True)
+    stage(store, "extract", "text", {"pdf": "a"})
+    assert stage(store, "extract", "new", {"pdf": "b"}).output == "new"
+    assert stage(store, "extract", "forced", {"pdf": "b"}, force=True).output == "forced"
+    assert store.skipped == []
+
+
+def test_changed_upstream_output_invalidates_downstream(tmp_path):
+    store = CheckpointStore(tmp_path, enabled=True)
+    stage(store, "extract", "text", {"pdf": "a"})
+    stage(store, "solve", "answer", {}, upstream=["extract"])
+    assert stage(store, "solve", "x", {}, upstream=["extract"]).output == "answer"
+    stage(store, "extract", "changed text", {"pdf": "a"}, force=True)
+    assert stage(store, "solve", "new answer", {}, upstream=["extract"]).output == "new answer"
+    store.invalidate("extract")                   # fehlende Vorstufe ändert den Schlüssel ebenfalls
+    assert stage(store, "solve", "again", {}, upstream=["extract"]).output == "again"
+
+
+def test_failed_validity_check_recomputes(tmp_path):
+    store = CheckpointStore(tmp_path, enabled=True)
+    stage(store, "simulate", ["s1"], {})
+    assert stage(store, "simulate", ["s2"], {}, valid=lambda output: False).output == ["s2"]
+
+
+def test_disabled_store_always_computes(tmp_path):
+    store = CheckpointStore(tmp_path, enabled=False)
+    stage(store, "extract", "text", {})
+    assert stage(store, "extract", "again", {}).output == "again"
+    assert not list(tmp_path.iterdir())
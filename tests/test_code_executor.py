@@ -0,0 +1,82 @@
+import pytest
+
+import multi_agent.resilience as resilience_module
+from multi_agent.code_executor import ExecutorPool
+from multi_agent.resilience import Resilience
+
+
+@pytest.fixture
+def pool():
+    pool = ExecutorPool(size=1, timeout=5, cpu_seconds=5, memory_mb=256, max_output=1000)
+    yield pool
+    pool.shutdown()
+
+
+def test_ok_output(pool):
+    result = pool.run_once("print(sum(range(5)))")
+    assert result.ok
+    assert result.stdout == "10\n"
+    assert result.format() == "Tool output:\n10\n"
+
+
+def test_exception_is_a_deterministic_error(pool):
+    result = pool.run_once("print('before')\n1 / 0")
+    assert (result.status, result.error_type) == ("error", "ZeroDivisionError")
+    assert result.deterministic
+    assert result.stdout == "before\n"
+    assert "ZeroDivisionError" in result.traceback
+
+
+def test_large_status_does_not_block_the_worker(pool):
+    result = pool.run_once('raise ValueError("x" * 200000)')
+    assert (result.status, result.error_type) == ("error", "ValueError")
+    assert result.seconds < pool.timeout
+    assert len(result.traceback) < 10000     # im Worker gekürzt
+    assert "characters omitted" in result.traceback
+
+
+def test_unreadable_status_counts_as_crashed(pool):
+    result = pool.run_once('import os, sys\nos.write(int(sys.argv[3]), b"{bad")\nos._exit(0)')
+    assert result.status == "crashed"
+    assert not result.deterministic
+
+
+def test_wall_clock_timeout(pool):
+    result = pool.run_once("import time\ntime.sleep(30)", timeout=0.5)
+    assert result.status == "timeout"
+    assert result.deterministic
+    assert result.seconds < 5
+
+
+def test_cpu_rlimit():
+    pool = ExecutorPool(size=1, timeout=30, cpu_seconds=1)
+    try:
+        result = pool.run_once("while True: pass")
+    finally:
+        pool.shutdown()
+    assert result.status == "timeout"
+    assert result.seconds < 30               # SIGXCPU vor dem Wanduhr-Timeout
+
+
+def test_memory_rlimit(pool):
+    result = pool.run_once("x = bytearray(2 * 1024 ** 3)")
+    assert (result.status, result.error_type) == ("memory", "MemoryError")
+    assert result.deterministic
+
+
+def test_output_cap_kills_runaway_output(pool):
+    result = pool.run_once("while True: print('x' * 100)")
+    assert result.status == "output_limit"
+    assert result.truncated
+    assert len(result.stdout) <= pool.max_output
+    assert "(output truncated)" in result.format()
+
+
+def test_only_crashes_are_retried(pool, monkeypatch):
+    policy = Resilience(max_attempts=3, base_delay=0, threshold=0)
+    monkeypatch.setattr(resilience_module, "resilience", policy)
+    crash = pool.run("import os, signal\nos.kill(os.getpid(), signal.SIGKILL)")
+    assert crash.status == "crashed"
+    assert policy.stats()["targets"]["executor"]["calls"] == 3
+    assert pool.run("1 / 0").status == "error"
+    assert policy.stats()["targets"]["executor"]["calls"] == 4
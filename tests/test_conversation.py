@@ -0,0 +1,94 @@
+import pytest
+from pydantic_ai import Agent, RunContext
+from pydantic_ai.messages import ModelRequest, ModelResponse, SystemPromptPart, TextPart, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from multi_agent.conversation import ConversationStore
+
+
+def model(tool=None, text="ok", seen=None):
+    """Calls ``tool`` once, then answers ``text``; records the history it was given."""
+    def fn(messages, info: AgentInfo):
+        if seen is not None and len(seen) == 0:
+            seen.append(messages)
+        if tool and not isinstance(messages[-1].parts[-1], ToolReturnPart):
+            return ModelResponse(parts=[ToolCallPart(tool, {})])
+        return ModelResponse(parts=[TextPart(text)])
+    return FunctionModel(fn)
+
+
+def agents(seen):
+    greeter = Agent(model("get_user_birth_year", "Hi John"), name="greeter", deps_type=int,
+                    system_prompt="Be concise", instructions="greet")
+
+    @greeter.tool
+    def get_user_birth_year(ctx: RunContext[int]) -> int:
+        return ctx.deps
+
+    age = Agent(model("get_current_year", "You are 28"), name="age")
+
+    @age.tool_plain
+    def get_current_year() -> int:
+        return 2026
+
+    history = Agent(model(None, "1998: event", seen), name="history")
+    return greeter, age, history
+
+
+def parts(messages):
+    return [(type(p).__name__, getattr(p, "tool_name", None)) for m in messages for p in m.parts]
+
+
+def test_view_drops_other_agents_tool_chatter(tmp_path):
+    seen = []
+    greeter, age, history = agents(seen)
+    session = ConversationStore(tmp_path).session()
+    session.run_sync(greeter, "Hi I am John", deps=1998)
+    session.run_sync(age, "How old am I?")
+    session.run_sync(history, "Event in my birth year?")
+
+    assert len(session.messages()) == 10           # je 4 mit Tool-Aufruf, 2 ohne
+    shown = parts(seen[0])
+    assert ("ToolCallPart", "get_user_birth_year") not in shown
+    assert ("ToolReturnPart", "get_current_year") not in shown
+    assert ("SystemPromptPart", None) not in shown
+    assert all(m.instructions is None for m in seen[0] if isinstance(m, ModelRequest))
+    assert ("TextPart", None) in shown and ("UserPromptPart", None) in shown
+    assert session.stats()["dropped"] > 0
+
+
+def test_own_messages_stay_complete(tmp_path):
+    greeter, _, _ = agents([])
+    session = ConversationStore(tmp_path).session()
+    session.run_sync(greeter, "Hi I am John", deps=1998)
+    view = session.view("greeter")
+    assert view == session.messages()
+    assert any(isinstance(p, SystemPromptPart) for m in view for p in m.parts)
+
+
+def test_shared_tools_stay_visible(tmp_path):
+    greeter, age, _ = agents([])
+    session = ConversationStore(tmp_path).session()
+    session.run_sync(greeter, "Hi I am John", deps=1998)
+    session.run_sync(age, "How old am I?")
+    shown = parts(session.view("history", share_tools={"get_user_birth_year"}))
+    assert ("ToolCallPart", "get_user_birth_year") in shown
+    assert ("ToolReturnPart", "get_user_birth_year") in shown
+    assert ("ToolCallPart", "get_current_year") not in shown
+
+
+def test_reopening_an_id_continues_the_log(tmp_path):
+    greeter, age, _ = agents([])
+    store = ConversationStore(tmp_path)
+    session = store.session()
+    session.run_sync(greeter, "Hi I am John", deps=1998)
+    assert store.session(session.id) is session
+    reopened = ConversationStore(tmp_path).session(session.id)
+    assert reopened.messages() == session.messages()
+    reopened.run_sync(age, "How old am I?")
+    assert len(ConversationStore(tmp_path).session(session.id).messages()) == len(reopened.messages())
+
+
+def test_invalid_session_id(tmp_path):
+    with pytest.raises(ValueError):
+        ConversationStore(tmp_path).session("../etc")
@@ -0,0 +1,95 @@
+import pytest
+
+import multi_agent.fast_path as fast_path_module
+from multi_agent.code_executor import ExecutionResult
+from multi_agent.fast_path import CoderFastPath, extract_code_blocks
+from multi_agent.resilience import CircuitOpenError
+
+ANSWER = """Here is the solution:
+
+```python
+for i in range(3):
+    print(i)
+```
+
+Example session:
+
+```bash
+python loop.py
+```
+
+```
+print("done")
+```
+"""
+
+
+def test_extract_python_and_untagged_blocks_only():
+    assert extract_code_blocks(ANSWER) == ["for i in range(3):\n    print(i)\n", 'print("done")\n']
+    assert extract_code_blocks("no code here") == []
+    assert extract_code_blocks("```py\n\n```") == []
+
+
+@pytest.mark.parametrize("answer, reason", [
+    ("Just use a for loop.", "no_code"),
+    ("```python\n>>> print(1)\n```", "not_runnable"),
+    ("```python\nname = input('name? ')\n```", "not_runnable"),
+])
+def test_code_fallbacks(answer, reason):
+    fast = CoderFastPath(enabled=True)
+    assert fast.code(answer) is None
+    assert fast.stats()["fallbacks"] == {reason: 1}
+
+
+def test_blocks_are_joined_in_order():
+    assert CoderFastPath(enabled=True).code(ANSWER) == 'for i in range(3):\n    print(i)\n\n\nprint("done")\n'
+
+
+def test_disabled_always_falls_back():
+    fast = CoderFastPath(enabled=False)
+    assert fast.code(ANSWER) is None
+    assert fast.stats()["fallbacks"] == {"disabled": 1}
+
+
+@pytest.mark.parametrize("result, reason", [
+    (ExecutionResult("error", error_type="NameError"), "exec_error"),
+    (ExecutionResult("ok", stdout="  \n"), "no_output"),
+    (ExecutionResult("ok", stdout="0\n1\n", truncated=True), "truncated"),
+])
+def test_judge_fallbacks(result, reason):
+    fast = CoderFastPath(enabled=True)
+    assert not fast.judge(result)
+    assert fast.stats() == {"taken": 0, "fallbacks": {reason: 1}, "rate": 0.0}
+
+
+def test_stats_count_taken_and_fallbacks():
+    fast = CoderFastPath(enabled=True)
+    assert fast.judge(ExecutionResult("ok", stdout="0\n"))
+    assert fast.judge(ExecutionResult("ok", stdout="1\n"))
+    fast.code("no code")
+    assert fast.stats() == {"taken": 2, "fallbacks": {"no_code": 1}, "rate": 2 / 3}
+    fast.reset()
+    assert fast.stats() == {"taken": 0, "fallbacks": {}, "rate": 0.0}
+
+
+def test_run_executes_the_blocks(monkeypatch):
+    calls = []
+
+    def run(code):
+        calls.append(code)
+        return ExecutionResult("ok", stdout="0\n1\n2\ndone\n")
+
+    monkeypatch.setattr(fast_path_module.executor_pool, "run", run)
+    fast = CoderFastPath(enabled=True)
+    assert fast.run(ANSWER).stdout == "0\n1\n2\ndone\n"
+    assert calls == [fast.code(ANSWER)]
+
+
+def test_open_executor_breaker_falls_back(monkeypatch):
+    def run(code):
+        raise CircuitOpenError("executor", 30)
+
+    monkeypatch.setattr(fast_path_module.executor_pool, "run", run)
+    fast = CoderFastPath(enabled=True)
+    assert fast.run(ANSWER) is None
+    assert fast.stats()["fallbacks"] == {"executor_unavailable": 1}
@@ -0,0 +1,76 @@
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, ToolCallPart, ToolReturnPart, UserPromptPart
+
+from multi_agent.history import HistoryCompactor, estimate_tokens, history_savings
+
+PDF = "Exercise: print the numbers 0 to 4 with a for loop. " * 40    # ~2000 Zeichen
+
+
+def tool_round(n, content):
+    return [ModelResponse(parts=[ToolCallPart("pdf_extractor_tool", {}, f"call-{n}")]),
+            ModelRequest(parts=[ToolReturnPart("pdf_extractor_tool", content, f"call-{n}")])]
+
+
+def conversation(rounds=3, content=PDF):
+    messages = [ModelRequest(parts=[UserPromptPart("Extract the exercise")])]
+    for n in range(rounds):
+        messages += tool_round(n, content)
+        messages.append(ModelResponse(parts=[TextPart(f"Answer {n}: " + "x" * 1000)]))
+    return messages
+
+
+def returns(messages):
+    return [p.content for m in messages for p in m.parts if isinstance(p, ToolReturnPart)]
+
+
+def test_identical_tool_returns_keep_only_the_latest_copy():
+    compacted = HistoryCompactor(max_tokens=100_000)(conversation())
+    assert returns(compacted)[:2] == ["[same pdf_extractor_tool result as later in this conversation]"] * 2
+    assert returns(compacted)[2] == PDF
+
+
+def test_short_duplicates_are_kept():
+    compacted = HistoryCompactor(max_tokens=100_000)(conversation(content="42"))
+    assert returns(compacted) == ["42", "42", "42"]
+
+
+def test_within_budget_only_duplicates_change():
+    messages = conversation(rounds=1)
+    assert HistoryCompactor(max_tokens=100_000)(messages) == messages
+
+
+def test_old_messages_collapse_to_the_budget_recent_ones_stay():
+    messages = conversation(rounds=4, content="")
+    for n, message in enumerate(messages):   # verschiedene Inhalte: nichts zu deduplizieren
+        if isinstance(message, ModelRequest) and isinstance(message.parts[0], ToolReturnPart):
+            messages[n] = ModelRequest(parts=[ToolReturnPart("pdf_extractor_tool", f"{n} " + PDF, f"call-{n}")])
+    compactor = HistoryCompactor(max_tokens=estimate_tokens(messages) - 600, keep_recent=4, summary_chars=100)
+    compacted = compactor(messages)
+    assert len(compacted) == len(messages)   # Paare aus Aufruf und Ergebnis bleiben erhalten
+    assert compacted[-4:] == messages[-4:]
+    assert estimate_tokens(compacted) <= compactor.max_tokens
+    assert "chars omitted" in returns(compacted)[0]
+    assert compacted[4:] == messages[4:]     # Budget nach der ersten Runde erreicht → Rest unverändert
+
+
+def test_input_messages_are_not_modified():
+    messages = conversation()
+    snapshot = [m.parts[:] for m in messages]
+    HistoryCompactor(max_tokens=500, keep_recent=2)(messages)
+    assert [m.parts for m in messages] == snapshot
+
+
+def test_savings_per_run_and_totals():
+    compactor = HistoryCompactor(max_tokens=100_000)
+    with history_savings("pipeline") as run:
+        compactor(conversation())
+        with history_savings("stage") as nested:
+            compactor(conversation())
+        with history_savings("request", separate=True) as own:
+            compactor(conversation(rounds=1))
+    assert nested is run
+    assert run.calls == 2 and run.tokens_saved > 0
+    assert own.calls == 1 and own.tokens_saved == 0
+    assert compactor.stats()["calls"] == 3
+    assert compactor.stats()["tokens_saved"] == run.tokens_saved
+    compactor(conversation())                # außerhalb eines Laufs: nur die Summen
+    assert run.calls == 2
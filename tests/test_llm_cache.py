@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, ToolReturnPart, UserPromptPart
+from pydantic_ai.models import ModelRequestParameters
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+import multi_agent.llm_cache as llm_cache_module
+from multi_agent.llm_cache import CachingModel, LLMCache, cache_key
+
+PARAMS = ModelRequestParameters()
+
+
+def history(tool_call_id="call-1", year=2024, content="42"):
+    stamp = datetime(year, 1, 1, tzinfo=timezone.utc)
+    return [ModelRequest(parts=[UserPromptPart("What is 6 * 7?", timestamp=stamp)]),
+            ModelRequest(parts=[ToolReturnPart("calc", content, tool_call_id, timestamp=stamp)])]
+
+
+def test_cache_key_ignores_volatile_fields():
+    key = cache_key("qwen3:8b", {"temperature": 0.0}, history(), PARAMS)
+    assert cache_key("qwen3:8b", {"temperature": 0.0}, history("call-2", 2025), PARAMS) == key
+    assert cache_key("qwen3:8b", {"temperature": 0.0}, history(content="41"), PARAMS) != key
+    assert cache_key("qwen3:14b", {"temperature": 0.0}, history(), PARAMS) != key
+    assert cache_key("qwen3:8b", {"temperature": 0.0, "max_tokens": 10}, history(), PARAMS) != key
+
+
+def test_lru_eviction_by_size(tmp_path, monkeypatch):
+    clock = iter(range(1, 100))
+    monkeypatch.setattr(llm_cache_module, "time", SimpleNamespace(time=lambda: next(clock)))
+    response = ModelResponse(parts=[TextPart("x" * 100)])
+    size = len(llm_cache_module.ModelMessagesTypeAdapter.dump_json([response]))
+    cache = LLMCache(tmp_path / "cache.sqlite", max_bytes=2 * size)
+    cache.put("a", response)
+    cache.put("b", response)
+    assert cache.get("a") is not None    # a zuletzt benutzt → b ist am längsten ungenutzt
+    cache.put("c", response)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats() == {"hits": 3, "misses": 1, "bypassed": 0, "hit_rate": 0.75}
+
+
+def counting_model(calls):
+    def request(messages, info: AgentInfo):
+        calls.append("request")
+        return ModelResponse(parts=[TextPart("forty two")])
+
+    async def stream(messages, info: AgentInfo):
+        calls.append("stream")
+        for chunk in ("forty ", "two"):
+            yield chunk
+    return FunctionModel(request, stream_function=stream)
+
+
+def agent(calls, tmp_path, temperature):
+    cache = LLMCache(tmp_path / "cache.sqlite")
+    model = CachingModel(counting_model(calls), cache=cache, enabled=True)
+    return Agent(model, model_settings={"temperature": temperature}), cache
+
+
+def test_temperature_zero_is_replayed(tmp_path):
+    calls = []
+    cached_agent, cache = agent(calls, tmp_path, 0.0)
+    assert cached_agent.run_sync("What is 6 * 7?").output == "forty two"
+    assert cached_agent.run_sync("What is 6 * 7?").output == "forty two"
+    assert calls == ["request"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_non_zero_temperature_bypasses_the_cache(tmp_path):
+    calls = []
+    sampled_agent, cache = agent(calls, tmp_path, 0.7)
+    sampled_agent.run_sync("What is 6 * 7?")
+    sampled_agent.run_sync("What is 6 * 7?")
+    assert calls == ["request", "request"]
+    assert cache.stats() == {"hits": 0, "misses": 0, "bypassed": 2, "hit_rate": 0.0}
+
+
+def test_streamed_calls_use_the_cache(tmp_path):
+    calls = []
+    streamed_agent, cache = agent(calls, tmp_path, 0.0)
+
+    async def run():
+        async with streamed_agent.run_stream("What is 6 * 7?") as result:
+            return [chunk async for chunk in result.stream_text(delta=True)]
+
+    assert "".join(asyncio.run(run())) == "forty two"
+    assert "".join(asyncio.run(run())) == "forty two"   # aus dem Cache als Stream
+    assert calls == ["stream"]
+    assert (cache.stats()["misses"], cache.stats()["hits"]) == (1, 1)
+    assert streamed_agent.run_sync("What is 6 * 7?").output == "forty two"   # gleicher Eintrag ohne Stream
+    assert calls == ["stream"]
@@ -0,0 +1,36 @@
+from multi_agent.mcq_grading import grade_cohort, parse_answer_sheet
+
+
+def test_inline_answers():
+    sheet = "Model Answers\n1. B\nQ2) c\nQuestion 3: (A) a loop\n**4.** D\n5. Answer: E\n6. A) for loops repeat code"
+    assert parse_answer_sheet(sheet) == {1: "B", 2: "C", 3: "A", 4: "D", 5: "E", 6: "A"}
+
+
+def test_question_stems_are_not_answers():
+    sheet = "1. B\n2. C\n3. D\n4. A for loop repeats code for each item"
+    assert parse_answer_sheet(sheet) == {1: "B", 2: "C", 3: "D"}
+
+
+def test_answer_line_after_stem():
+    sheet = "Question 5: A variable stores a value\nA) yes\nB) no\nC) maybe\nAnswer: C"
+    assert parse_answer_sheet(sheet) == {5: "C"}
+
+
+def test_numbered_stem_with_answer_line():
+    assert parse_answer_sheet("4. A for loop repeats code\nCorrect answer: (B)") == {4: "B"}
+
+
+def test_answer_line_overrides_inline_match():
+    assert parse_answer_sheet("Question 5: A. A variable stores a value\nAnswer: C") == {5: "C"}
+
+
+def test_answer_line_without_question_is_ignored():
+    assert parse_answer_sheet("Answer: C\nSome text") == {}
+
+
+def test_grade_cohort():
+    key = {1: "A", 2: "B", 3: "C"}
+    results = {r.student: r for r in grade_cohort(key, {"s1": {1: "A", 2: "B", 3: "C"}, "s2": {1: "B", 3: "C"}})}
+    assert (results["s1"].mark, results["s1"].total, results["s1"].mistakes) == (3, 3, [])
+    assert results["s2"].mark == 1
+    assert results["s2"].mistakes == [(1, "B", "A"), (2, None, "B")]
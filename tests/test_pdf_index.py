@@ -0,0 +1,42 @@
+import pytest
+
+import multi_agent.pdf_index as pdf_index_module
+from multi_agent.pdf_index import PdfIndex
+from multi_agent.pdf_text import PdfTextCache
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    cache = PdfTextCache(tmp_path / "text")
+    monkeypatch.setattr(pdf_index_module, "pdf_text_cache", cache)
+    pdf = tmp_path / "course.pdf"
+    pdf.write_bytes(b"%PDF-1.4 fixture")   # Text kommt vorab extrahiert aus dem Cache
+    cache.put_pages(pdf, [
+        "A for loop repeats the indented block for each item in a sequence.",
+        "Variables store values. A variable name refers to an object.",
+        "While loops repeat while a condition is true. Loop, loop, loop.",
+    ])
+    index = PdfIndex(tmp_path / "index", chunk_chars=200, overlap=20)
+    index.add(str(pdf))
+    return index, str(pdf)
+
+
+def test_bm25_ranks_matching_pages_first(index):
+    index, pdf = index
+    passages = index.search("variable name", k=3, paths=[pdf])
+    assert passages[0].page == 2
+    assert all(p.score > 0 for p in passages)
+    assert [p.page for p in index.search("loop repeats", k=3)] == [1, 3]   # beide Begriffe vor einem
+    assert [p.page for p in index.search("loop", k=3)] == [3, 1]           # höhere Termfrequenz zuerst
+
+
+def test_k_is_clamped(index):
+    index, pdf = index
+    assert index.search("loop", k=0) == []
+    assert index.search("loop", k=-3) == []
+    assert len(index.search("loop", k=100)) == 2   # nur Abschnitte mit Treffer
+
+
+def test_unknown_terms_find_nothing(index):
+    index, _ = index
+    assert index.search("quantum chromodynamics", k=5) == []
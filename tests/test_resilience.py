@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from multi_agent.resilience import CircuitOpenError, Resilience, classify, retry_budget
+
+
+class Status(Exception):
+    def __init__(self, status_code):
+        super().__init__(status_code)
+        self.status_code = status_code
+
+
+def failing(error):
+    def fn():
+        raise error
+    return fn
+
+
+def test_classify():
+    assert classify(ConnectionError()) == "transient"
+    assert classify(TimeoutError()) == "transient"
+    assert classify(Status(503)) == "transient"
+    assert classify(Status(429)) == "transient"
+    assert classify(Status(400)) == "deterministic"
+    assert classify(ValueError()) == "deterministic"
+    assert classify(CircuitOpenError("model:x", 1)) == "deterministic"
+
+
+def test_transient_errors_are_retried_deterministic_ones_are_not():
+    policy = Resilience(max_attempts=3, base_delay=0, threshold=0)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("down")
+        return "ok"
+
+    assert policy.call("backend", flaky) == "ok"
+    assert len(calls) == 3
+    with pytest.raises(Status):
+        policy.call("other", failing(Status(400)))
+    assert policy.stats()["targets"]["other"]["calls"] == 1
+
+
+def test_transient_result_returns_last_result_when_attempts_run_out():
+    policy = Resilience(max_attempts=2, base_delay=0, threshold=0)
+    assert policy.call("executor", lambda: "crashed", transient_result=lambda r: "crashed") == "crashed"
+    assert policy.stats()["targets"]["executor"]["calls"] == 2
+
+
+def test_budget_is_shared_within_a_scope():
+    policy = Resilience(max_attempts=5, base_delay=0, threshold=0)
+    with retry_budget("stage", retries=2) as budget:
+        with pytest.raises(ConnectionError):
+            policy.call("a", failing(ConnectionError()))
+        with pytest.raises(ConnectionError):
+            policy.call("b", failing(ConnectionError()))
+    assert budget.retries == 2
+    assert budget.exhausted
+    assert policy.stats()["targets"]["b"]["calls"] == 1   # Budget schon verbraucht
+    assert policy.stats()["scopes"]["stage"]["retries"] == 2
+
+
+def test_nested_budget_keeps_outer_unless_separate():
+    with retry_budget("outer", retries=1) as outer:
+        with retry_budget("inner") as inner:
+            assert inner is outer
+        with retry_budget("student", separate=True) as own:
+            assert own is not outer
+
+
+def test_breaker_opens_and_rejects_until_reset():
+    policy = Resilience(max_attempts=1, base_delay=0, threshold=2, reset=60)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            policy.call("search:ddgs", failing(ConnectionError()))
+    assert policy.breaker("search:ddgs").state == "open"
+    with pytest.raises(CircuitOpenError):
+        policy.call("search:ddgs", lambda: "never called")
+
+
+def test_half_open_probe_closes_or_reopens():
+    policy = Resilience(max_attempts=1, base_delay=0, threshold=1, reset=0)
+    with pytest.raises(ConnectionError):
+        policy.call("model:m", failing(ConnectionError()))
+    assert policy.breaker("model:m").state == "half-open"
+    with pytest.raises(ConnectionError):
+        policy.call("model:m", failing(ConnectionError()))   # Probe scheitert → wieder offen
+    assert policy.breaker("model:m").opens == 2
+    assert policy.call("model:m", lambda: "ok") == "ok"
+    assert policy.breaker("model:m").state == "closed"
+
+
+def test_cancelled_half_open_probe_releases_the_breaker():
+    policy = Resilience(max_attempts=1, base_delay=0, threshold=1, reset=0)
+
+    async def down():
+        raise ConnectionError("down")
+
+    async def ok():
+        return "ok"
+
+    async def scenario():
+        with pytest.raises(ConnectionError):
+            await policy.acall("model:m", down)
+        probe = asyncio.create_task(policy.acall("model:m", lambda: asyncio.sleep(60)))
+        await asyncio.sleep(0.01)        # Probe läuft (halb offen)
+        with pytest.raises(CircuitOpenError):
+            await policy.acall("model:m", ok)   # zweite Probe gleichzeitig abgelehnt
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        return await policy.acall("model:m", ok)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert policy.breaker("model:m").state == "closed"
+
+
+def test_failed_search_tells_the_model_not_to_retry():
+    from multi_agent.search import search_unavailable
+    text = search_unavailable(CircuitOpenError("search:ddgs", 30))
+    assert text.startswith("Search unavailable (") and "Do not retry" in text
+    assert "ConnectionError: down" in search_unavailable(ConnectionError("down"))
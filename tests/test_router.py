@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, ToolReturnPart, UserPromptPart
+
+from multi_agent import tools
+from multi_agent.router import ANSWER, SUPERVISOR, NaiveBayes, Router, _context, run_routed
+
+
+@pytest.mark.parametrize("prompt, target, reason", [
+    ("What does PDF stand for?", ANSWER, "rule:definition"),
+    ("What is recursion?", ANSWER, "rule:definition"),
+    ("Extract the exercise from the PDF", "pdf_extractor_tool", "rule:pdf"),
+    ("Search the web for loop tutorials", "web_search_tool", "rule:web"),
+    ("Solve the task in Python", "coder_tool", "rule:code"),
+])
+def test_rules(prompt, target, reason):
+    route = Router().route(prompt)
+    assert (route.target, route.reason) == (target, reason)
+    assert route.direct == (target != ANSWER)
+
+
+def test_conflicting_rules_go_to_the_supervisor():
+    route = Router().route("Read the PDF and search the web for tutorials")
+    assert route.target == SUPERVISOR
+    assert route.reason == "rules disagree: pdf_extractor_tool,web_search_tool"
+    assert not route.direct
+
+
+def test_classifier_below_threshold_falls_back():
+    assert Router(threshold=0.8).route("compute the factorial of 10").target == "coder_tool"
+    route = Router(threshold=0.99).route("compute the factorial of 10")
+    assert route.target == SUPERVISOR
+    assert route.reason == "low confidence (coder_tool)"
+    assert Router().route("xyzzy plugh").target == SUPERVISOR   # nur unbekannte Wörter
+
+
+def test_disabled_router_always_asks_the_supervisor():
+    assert Router(enabled=False).route("Solve the task in Python").reason == "disabled"
+
+
+def test_naive_bayes_posterior():
+    nb = NaiveBayes({"a": ["red apple", "green apple"], "b": ["blue sky"]})
+    label, confidence = nb.predict("apple")
+    assert label == "a"
+    assert 0.5 < confidence <= 1.0
+    assert nb.predict("unknown") == (SUPERVISOR, 0.0)
+
+
+def test_evaluate_counts_fallbacks_separately():
+    result = Router().evaluate([
+        ("Solve the task in Python", "coder_tool"),
+        ("Read the PDF and search the web for tutorials", "pdf_extractor_tool"),
+    ])
+    assert result == {"n": 2, "accuracy": 0.5, "decided": 1, "decided_accuracy": 1.0, "fallbacks": 1}
+
+
+def test_direct_route_passes_the_last_result_as_context(monkeypatch):
+    calls = []
+
+    async def coder(argument, deps):
+        calls.append(argument)
+        return "0 1 2 3 4"
+
+    monkeypatch.setitem(tools.DIRECT_TOOLS, "coder_tool", coder)
+    history = [ModelRequest(parts=[UserPromptPart("Extract the exercise")]),
+               ModelRequest(parts=[ToolReturnPart("pdf_extractor_tool", "Print 0 to 4 with a loop.", "call-1")])]
+    result = asyncio.run(run_routed("Solve the task in Python", message_history=history))
+    assert result.output == "0 1 2 3 4"
+    assert calls == ["Solve the task in Python\n\nContext:\nPrint 0 to 4 with a loop."]
+    assert result.all_messages()[:2] == history
+    assert isinstance(result.all_messages()[-1], ModelResponse)
+
+
+def test_context_takes_the_latest_text():
+    history = [ModelResponse(parts=[TextPart("first")]), ModelRequest(parts=[UserPromptPart("next")]),
+               ModelResponse(parts=[TextPart("second")])]
+    assert _context(history) == "second"
+    assert _context([]) == ""
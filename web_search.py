@@ -1,36 +1,31 @@
 from pydantic_ai import Agent
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openai import OpenAIProvider
-from ddgs import DDGS
-import logfire
+from multi_agent.model_registry import registry
+from multi_agent.search import format_results, search_service, search_unavailable
 
-logfire.configure()  
-logfire.instrument_pydantic_ai()
-
-provider = OpenAIProvider(base_url="http://localhost:11434/v1")
-model = OpenAIModel("gpt-oss", provider=provider)
+model = registry.model("gpt-oss")
 
 agent = Agent(
     model=model,
     instructions="You are a web search assistant. Use the web_search tool to fetch and summarize internet results."
 )
 
-# Diese Funktion durchsucht das Web mithilfe von DuckDuckGo (DDGS).
+# Diese Funktion durchsucht das Web (DuckDuckGo bzw. $SEARCH_BACKEND) über den gemeinsamen Such-Dienst.
 @agent.tool_plain
 def web_search(query: str, max_results: int = 5) -> str:
     """Search the web with a given query"""
     # query: Suchbegriff(e), max_results: Anzahl gewünschter Treffer
     try:
-        # DDGS-Session öffnen und Textsuche ausführen
-        with DDGS() as ddg:
-            results = list(ddg.text(query, max_results=max_results))
-        # Treffer zusammenfassen: Titel, Snippet und Link
-        summary = "\n".join([f"- {r['title']}: {r['body']} ({r['href']})" for r in results])
+        # gecachte, ratenbegrenzte Suche; doppelte Links entfernt, Snippets gekürzt
+        summary = format_results(search_service.search(query, max_results))
         # Formatiertes Ergebnis zurückgeben oder „No results.“
         return f"Results for '{query}':\n{summary}" if summary else "No results."
     except Exception as e:
-        return f"Error: {str(e)}" # Fehlerfall (z. B. Netzwerk/Ratelimit) als String zurückgeben
+        return search_unavailable(e) # Wiederholungen sind schon gelaufen → Modell soll nicht erneut suchen
+
+if __name__ == "__main__":
+    from multi_agent.observability import configure_observability
+    configure_observability()
 
-user_prompt = "Search the web for: What is Pydantic AI"
-result = agent.run_sync(user_prompt)
-print(result.output)
+    user_prompt = "Search the web for: What is Pydantic AI"
+    result = agent.run_sync(user_prompt)
+    print(result.output)